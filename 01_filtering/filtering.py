@@ -5,29 +5,72 @@
 # Fitur unik: Script ini menerapkan multiple filter (Gaussian, Median, Sobel) pada semua gambar.
 
 import cv2
-import numpy as np
-from skimage import data
 import os
+import sys
+import functools
 import pandas as pd
 
-def process_and_filter_image(image, image_name, output_dir):
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.cli import add_raster_arguments, apply_common_args, build_parser, load_input_rasters
+from common.compact import skip_write
+from common.gradients import get_gradients
+from common.image_source import PERSONAL_IMAGE_NAME, load_personal_image, load_standard_images
+from common.magnitude import MAGNITUDE_DTYPES, get_magnitude_kernel
+from common.median import check_median, median_blur
+from common.run_cache import map_images_cached
+from common.sweep import DEFAULT_SWEEP, get_sweep
+from common.trace import span
+from common.tiling import DEFAULT_TILE_SIZE, open_output, tiled_gaussian, tiled_median, tiled_sobel_filtering
+
+# Backend median filter yang tersedia
+MEDIAN_BACKENDS = ("opencv", "histogram")
+
+# Ukuran kernel bawaan (dapat diganti lewat file sweep, lihat common/sweep.py)
+GAUSSIAN_KSIZES = DEFAULT_SWEEP["filtering"]["gaussian_ksizes"]
+MEDIAN_KSIZES = DEFAULT_SWEEP["filtering"]["median_ksizes"]
+
+def process_and_filter_image(image, image_name, output_dir, writer=None, magnitude_dtype="float32",
+                             median_backend="opencv",
+                             median_ksizes=MEDIAN_KSIZES, gaussian_ksizes=GAUSSIAN_KSIZES, render=True):
     """
     Menerapkan beberapa filter ke gambar, menyimpan hasilnya, 
     dan mengembalikan parameter yang digunakan dalam bentuk DataFrame.
+
+    magnitude_dtype: dtype gradien untuk normalisasi Sobel ("float32",
+    "int16", atau "float64"); hasilnya sama, yang berbeda hanya memori.
+    median_backend: "opencv" (cv2.medianBlur, default) atau "histogram"
+    (common.median.median_blur: uint8 tetap lewat cv2.medianBlur, engine
+    sendiri hanya untuk uint16 dengan kernel > 5).
+    median_ksizes: daftar ukuran kernel median (ganjil), misalnya 15-51 untuk dokumen.
+    gaussian_ksizes: daftar ukuran kernel Gaussian (ganjil).
+    render: jika False (mode statistik), filter tetap dihitung tetapi tidak
+    ada PNG yang ditulis; hasil filter adalah gambar itu sendiri, jadi tidak
+    ada array ringkas yang disimpan.
     """
     # Pastikan direktori output ada, jika tidak, buat direktori tersebut
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    # Gunakan writer asinkron jika tersedia, jika tidak tulis langsung
+    imwrite = writer.write if writer is not None else cv2.imwrite
+    if not render:
+        imwrite = skip_write
+
     # Simpan gambar asli untuk perbandingan
-    cv2.imwrite(os.path.join(output_dir, f"{image_name}_original.png"), image)
+    imwrite(os.path.join(output_dir, f"{image_name}_original.png"), image)
     
     # --- 1. Gaussian Filter dengan berbagai kernel size ---
     gaussian_params = []
-    for kernel_size in [(3, 3), (5, 5), (7, 7)]:
-        gaussian_filtered = cv2.GaussianBlur(image, kernel_size, 0)
+    kernel_sizes = [(ksize, ksize) for ksize in gaussian_ksizes]
+    with span("gaussian", ksizes=list(gaussian_ksizes)):
+        gaussian_results = [cv2.GaussianBlur(image, kernel_size, 0) for kernel_size in kernel_sizes]
+    for kernel_size, gaussian_filtered in zip(kernel_sizes, gaussian_results):
         filename = f"{image_name}_gaussian_{kernel_size[0]}x{kernel_size[1]}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), gaussian_filtered)
+        imwrite(os.path.join(output_dir, filename), gaussian_filtered)
         gaussian_params.append({
             'Image Source': image_name,
             'Filter Type': 'Gaussian Blur',
@@ -37,10 +80,12 @@ def process_and_filter_image(image, image_name, output_dir):
 
     # --- 2. Median Filter dengan berbagai kernel size ---
     median_params = []
-    for kernel_size in [3, 5, 7]:
-        median_filtered = cv2.medianBlur(image, kernel_size)
+    median_func = median_blur if median_backend == "histogram" else cv2.medianBlur
+    for kernel_size in median_ksizes:
+        with span("median", backend=median_backend, ksize=kernel_size):
+            median_filtered = median_func(image, kernel_size)
         filename = f"{image_name}_median_{kernel_size}x{kernel_size}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), median_filtered)
+        imwrite(os.path.join(output_dir, filename), median_filtered)
         median_params.append({
             'Image Source': image_name,
             'Filter Type': 'Median Blur',
@@ -50,12 +95,17 @@ def process_and_filter_image(image, image_name, output_dir):
 
     # --- 3. Sobel Filter (untuk edge detection) ---
     sobel_params = []
+    # Gradien X dan Y diambil dari cache bersama (dipakai ulang oleh modul edge),
+    # lalu dinormalisasi oleh kernel magnitude dengan buffer yang dipakai ulang
+    magnitude_kernel = get_magnitude_kernel(magnitude_dtype)
+    with span("sobel_gradients", ksize=3, dtype=magnitude_dtype):
+        sobel_x, sobel_y = get_gradients(image, ksize=3, ddepth=magnitude_kernel.ddepth)
+
     # Sobel X
-    sobel_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_x_abs = np.absolute(sobel_x)
-    sobel_x_normalized = np.uint8(255 * sobel_x_abs / np.max(sobel_x_abs))
+    with span("sobel_normalize", output="x"):
+        sobel_x_normalized = magnitude_kernel.abs_to_uint8(sobel_x)
     filename_x = f"{image_name}_sobel_x.png"
-    cv2.imwrite(os.path.join(output_dir, filename_x), sobel_x_normalized)
+    imwrite(os.path.join(output_dir, filename_x), sobel_x_normalized)
     sobel_params.append({
         'Image Source': image_name,
         'Filter Type': 'Sobel X',
@@ -64,11 +114,10 @@ def process_and_filter_image(image, image_name, output_dir):
     })
 
     # Sobel Y
-    sobel_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
-    sobel_y_abs = np.absolute(sobel_y)
-    sobel_y_normalized = np.uint8(255 * sobel_y_abs / np.max(sobel_y_abs))
+    with span("sobel_normalize", output="y"):
+        sobel_y_normalized = magnitude_kernel.abs_to_uint8(sobel_y)
     filename_y = f"{image_name}_sobel_y.png"
-    cv2.imwrite(os.path.join(output_dir, filename_y), sobel_y_normalized)
+    imwrite(os.path.join(output_dir, filename_y), sobel_y_normalized)
     sobel_params.append({
         'Image Source': image_name,
         'Filter Type': 'Sobel Y',
@@ -77,10 +126,10 @@ def process_and_filter_image(image, image_name, output_dir):
     })
 
     # Sobel Magnitude
-    sobel_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
-    sobel_mag_normalized = np.uint8(255 * sobel_magnitude / np.max(sobel_magnitude))
+    with span("sobel_magnitude", dtype=magnitude_dtype):
+        sobel_mag_normalized = magnitude_kernel.magnitude_to_uint8(sobel_x, sobel_y)
     filename_mag = f"{image_name}_sobel_magnitude.png"
-    cv2.imwrite(os.path.join(output_dir, filename_mag), sobel_mag_normalized)
+    imwrite(os.path.join(output_dir, filename_mag), sobel_mag_normalized)
     sobel_params.append({
         'Image Source': image_name,
         'Filter Type': 'Sobel Magnitude',
@@ -95,45 +144,128 @@ def process_and_filter_image(image, image_name, output_dir):
     print(f"Filtering selesai untuk gambar: {image_name}")
     return df_params
 
-def main():
+def process_large_image(image, image_name, output_dir, writer=None, tile_size=DEFAULT_TILE_SIZE,
+                        median_ksizes=MEDIAN_KSIZES, gaussian_ksizes=GAUSSIAN_KSIZES):
+    """
+    Versi tiled dari process_and_filter_image untuk gambar yang sangat besar.
+    Setiap filter dijalankan per tile (dengan halo) dan hasilnya ditulis
+    langsung ke file .npy ter-memory-map, sehingga memori puncak dibatasi
+    ukuran tile. Hasil piksel identik dengan versi frame penuh.
+
+    Output Gaussian dan median memakai dtype gambar input (misalnya raster
+    uint16); output Sobel selalu uint8 karena sudah dinormalisasi. Dtype
+    yang tidak didukung median_blur ditolak sebelum ada output yang ditulis.
+
+    writer tidak dipakai (output bukan PNG), hanya untuk kompatibilitas map_images.
+    """
+    for ksize in median_ksizes:
+        check_median(image.dtype, ksize)
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    def output(filename, dtype=image.dtype):
+        return open_output(os.path.join(output_dir, filename), image.shape[:2], dtype)
+
+    all_params = []
+
+    # --- 1. Gaussian Filter ---
+    for ksize in gaussian_ksizes:
+        filename = f"{image_name}_gaussian_{ksize}x{ksize}.npy"
+        with span("gaussian", backend="tiled", ksize=ksize):
+            tiled_gaussian(image, ksize, output(filename), tile_size).flush()
+        all_params.append({
+            'Image Source': image_name,
+            'Filter Type': 'Gaussian Blur',
+            'Parameters': f'Kernel Size = {(ksize, ksize)}, Sigma = 0 (auto)',
+            'Output Filename': filename
+        })
+
+    # --- 2. Median Filter ---
+    for ksize in median_ksizes:
+        filename = f"{image_name}_median_{ksize}x{ksize}.npy"
+        with span("median", backend="tiled", ksize=ksize):
+            tiled_median(image, ksize, output(filename), tile_size).flush()
+        all_params.append({
+            'Image Source': image_name,
+            'Filter Type': 'Median Blur',
+            'Parameters': f'Kernel Size = {ksize}x{ksize}',
+            'Output Filename': filename
+        })
+
+    # --- 3. Sobel Filter (normalisasi global dua pass) ---
+    sobel_outputs = [
+        ('Sobel X', 'ksize = 3, dx = 1, dy = 0', f"{image_name}_sobel_x.npy"),
+        ('Sobel Y', 'ksize = 3, dx = 0, dy = 1', f"{image_name}_sobel_y.npy"),
+        ('Sobel Magnitude', 'Magnitude of X and Y gradients', f"{image_name}_sobel_magnitude.npy"),
+    ]
+    with span("sobel_magnitude", backend="tiled"):
+        outputs = tiled_sobel_filtering(image, *[output(filename, "uint8") for _, _, filename in sobel_outputs],
+                                        ksize=3, tile_size=tile_size)
+        for out in outputs:
+            out.flush()
+    for filter_type, parameters, filename in sobel_outputs:
+        all_params.append({
+            'Image Source': image_name,
+            'Filter Type': filter_type,
+            'Parameters': parameters,
+            'Output Filename': filename
+        })
+
+    df_params = pd.DataFrame(all_params)
+    print(f"Filtering tiled selesai untuk gambar: {image_name}")
+    return df_params
+
+def main(workers=1, tile_size=None, inputs=None, magnitude_dtype="float32",
+         median_backend="opencv", median_ksizes=None, render=True):
     """
     Fungsi utama untuk menjalankan pipeline filtering pada semua gambar standar.
+
+    workers: jumlah proses paralel (lihat common.parallel.map_images).
+    tile_size: jika diisi, gambar diproses per tile dan output ditulis sebagai .npy.
+    inputs: daftar (nama, raster) opsional (lihat common.image_source.load_raster)
+            sebagai pengganti gambar standar. Raster ini selalu diproses per
+            tile agar hanya bagian yang sedang diproses yang dibaca dari disk.
+    magnitude_dtype: dtype gradien untuk normalisasi Sobel (frame penuh).
+    median_backend: backend median filter (frame penuh), lihat MEDIAN_BACKENDS.
+    median_ksizes: daftar ukuran kernel median (default dari file sweep).
+    render: jika False, PNG tidak ditulis (frame penuh, lihat process_and_filter_image).
+    Ukuran kernel Gaussian diambil dari file sweep aktif (common.sweep).
     """
     output_dir_filtering = "01_filtering/output"
-    all_params_list = []
-
-    # --- Memproses Semua Gambar Standar ---
-    standard_images = [
-        ("cameraman", data.camera()),
-        ("coins", data.coins()),
-        ("checkerboard", data.checkerboard()),
-        ("astronaut", cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2GRAY))
-    ]
+    sweep = get_sweep("filtering")
+    median_ksizes = tuple(median_ksizes or sweep["median_ksizes"])
+    gaussian_ksizes = sweep["gaussian_ksizes"]
 
-    for img_name, img_data in standard_images:
-        print(f"Memproses gambar standar '{img_name}'...")
-        params = process_and_filter_image(img_data, img_name, output_dir_filtering)
-        all_params_list.append(params)
-    
-    # --- Memproses Gambar Pribadi ---
-    personal_image_path = 'my_photo.jpg' 
-    if os.path.exists(personal_image_path):
-        print(f"Memproses gambar pribadi '{personal_image_path}'...")
-        img_personal = cv2.imread(personal_image_path, cv2.IMREAD_GRAYSCALE)
-        
-        if img_personal is not None:
-            params_personal = process_and_filter_image(img_personal, "personal_image", output_dir_filtering)
-            all_params_list.append(params_personal)
-        else:
-            print(f"Error: Gagal memuat gambar dari '{personal_image_path}'")
+    if inputs is not None:
+        # --- Memproses Raster Input (memory-mapped) ---
+        images = list(inputs)
+        tile_size = tile_size or DEFAULT_TILE_SIZE
     else:
-        print(f"Peringatan: File gambar pribadi '{personal_image_path}' tidak ditemukan. Langkah ini dilewati.")
+        # --- Memproses Semua Gambar Standar ---
+        images = load_standard_images(lazy=True)
+
+        # --- Memproses Gambar Pribadi ---
+        personal_image_path = 'my_photo.jpg'
+        img_personal = load_personal_image(personal_image_path, lazy=True)
+        if img_personal is not None:
+            images.append((PERSONAL_IMAGE_NAME, img_personal))
+
+    # Proses semua gambar (berurutan atau paralel), urutan hasil tetap stabil
+    process_func = functools.partial(process_and_filter_image, magnitude_dtype=magnitude_dtype,
+                                     median_backend=median_backend, median_ksizes=median_ksizes,
+                                     gaussian_ksizes=gaussian_ksizes, render=render)
+    if tile_size:
+        process_func = functools.partial(process_large_image, tile_size=tile_size,
+                                         median_ksizes=median_ksizes, gaussian_ksizes=gaussian_ksizes)
+    all_params_list = map_images_cached(process_func, images, output_dir_filtering, workers)
 
     # Gabungkan semua DataFrame parameter dan simpan ke file CSV
     if all_params_list:
         final_params_df = pd.concat(all_params_list, ignore_index=True)
         csv_path = os.path.join(output_dir_filtering, "tabel_parameter_filtering.csv")
-        final_params_df.to_csv(csv_path, index=False)
+        with span("csv", category="io", file=os.path.basename(csv_path)):
+            final_params_df.to_csv(csv_path, index=False)
         print(f"\nProses filtering selesai. Semua hasil disimpan di direktori: '{output_dir_filtering}'")
         print(f"Tabel parameter disimpan di: '{csv_path}'")
         print(f"Total gambar diproses: {len(all_params_list)}")
@@ -142,4 +274,19 @@ def main():
         print("Tidak ada gambar yang diproses.")
 
 if __name__ == "__main__":
-    main()
+    parser = build_parser("Pipeline filtering gambar")
+    parser.add_argument("--tile-size", type=int, default=None,
+                        help="Proses gambar per tile berukuran N piksel (untuk gambar sangat besar)")
+    parser.add_argument("--magnitude-dtype", choices=list(MAGNITUDE_DTYPES), default="float32",
+                        help="Dtype gradien untuk normalisasi Sobel (default float32)")
+    parser.add_argument("--median-backend", choices=MEDIAN_BACKENDS, default="opencv",
+                        help="Backend median filter: opencv (default) atau histogram "
+                             "(untuk uint16 dengan kernel > 5; uint8 tetap memakai OpenCV)")
+    parser.add_argument("--median-ksizes", type=int, nargs="+", default=None,
+                        help="Ukuran kernel median (ganjil), default dari file sweep (3 5 7)")
+    add_raster_arguments(parser)
+    args = parser.parse_args()
+    apply_common_args(args)
+    main(workers=args.workers, tile_size=args.tile_size, inputs=load_input_rasters(args),
+         magnitude_dtype=args.magnitude_dtype, median_backend=args.median_backend, median_ksizes=args.median_ksizes,
+         render=not args.no_render)
@@ -6,33 +6,107 @@
 
 import cv2
 import numpy as np
-from skimage import data
 import os
+import sys
+import functools
 import pandas as pd
 
-def detect_edges(image, image_name, output_dir):
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.cli import add_raster_arguments, apply_common_args, build_parser, load_input_rasters
+from common.canny import CannySweep
+from common.compact import CompactStore
+from common.gradients import canny, get_gradients
+from common.image_source import (PERSONAL_IMAGE_NAME, ImageRef, decode_scale, load_personal_image,
+                                 load_standard_images, reduced_decode_scale, resolve_images)
+from common.magnitude import MAGNITUDE_DTYPES, get_magnitude_kernel
+from common.parallel import map_images
+from common.pyramid import FUSE_METHODS, EdgePyramid
+from common.run_cache import map_images_cached
+from common.sweep import DEFAULT_SWEEP, get_sweep
+from common.trace import span
+from common.tiling import (DEFAULT_TILE_SIZE, open_output, tiled_canny, tiled_downsample2, tiled_sobel_minmax,
+                           to_uint8, uint8_tiles)
+
+# Parameter sweep bawaan (dapat diganti lewat file sweep, lihat common/sweep.py)
+SOBEL_KSIZES = DEFAULT_SWEEP["edge"]["sobel_ksizes"]
+CANNY_THRESHOLDS = DEFAULT_SWEEP["edge"]["canny_thresholds"]
+
+# Stage deteksi tepi beserta resolusi yang dibutuhkan (skala 1 = penuh, 2 = 1/2)
+STAGE_SCALES = {"sobel": 1, "canny": 1, "sampling": 2}
+
+def detect_edges(image, image_name, output_dir, writer=None, magnitude_dtype="float32",
+                 pyramid_levels=None, pyramid_fuse=None, early_exit_fraction=None,
+                 stages=None, image_scales=None, sobel_ksizes=SOBEL_KSIZES,
+                 canny_thresholds=CANNY_THRESHOLDS, render=True):
     """
     Mendeteksi tepi menggunakan Sobel dan Canny dengan berbagai parameter,
     menyimpan hasilnya, dan mengembalikan parameter dalam DataFrame.
+
+    writer: AsyncImageWriter opsional untuk menulis gambar di latar belakang.
+    magnitude_dtype: dtype gradien untuk magnitude Sobel ("float32", "int16",
+    atau "float64"); hasilnya sama, yang berbeda hanya memori.
+    pyramid_levels: jika diisi (N >= 1), analisis sampling memakai piramida N
+    level (1/2, 1/4, ...) yang dibangun sekali; level 1 identik dengan
+    downsample tunggal. pyramid_fuse: "max" atau "mean" untuk menggabungkan
+    edge map semua level (termasuk resolusi penuh) ke resolusi penuh.
+    early_exit_fraction: jika diisi bersama pyramid_levels dan level paling
+    kasar memiliki proporsi piksel tepi di bawah nilai ini, Canny pada level
+    yang lebih halus dilewati dan edge map-nya ditulis kosong.
+    stages: subset dari STAGE_SCALES yang dijalankan (default semua).
+    image_scales: dict {nama gambar: skala} untuk gambar yang sudah didekode
+    pada resolusi tereduksi (lihat common.image_source.load_image); gambar
+    seperti ini hanya bisa dipakai stage yang skalanya kelipatan skala itu.
+    sobel_ksizes, canny_thresholds: daftar ksize Sobel dan (low, high, label)
+    Canny dari file sweep.
+    render: jika False (mode statistik), tidak ada PNG yang ditulis. Semua
+    peta tepi biner (Canny, downsample, level piramida) disimpan bit-packed
+    ke {image_name}_edges.npz dengan kunci nama PNG-nya, dan bisa ditulis
+    belakangan dengan render_stored_edges. Peta non-biner (magnitude Sobel,
+    fusion mean) tidak disimpan.
     """
+    stages = tuple(stages or STAGE_SCALES)
+    image_scale = (image_scales or {}).get(image_name, 1)
+    for stage in stages:
+        if STAGE_SCALES[stage] % image_scale:
+            raise ValueError(f"Stage '{stage}' membutuhkan skala {STAGE_SCALES[stage]}, "
+                             f"gambar '{image_name}' didekode pada skala {image_scale}")
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Pastikan gambar dalam format 8-bit grayscale
-    if image.dtype != np.uint8:
-        image = image.astype(np.uint8)
+    # Gunakan writer asinkron jika tersedia, jika tidak tulis langsung
+    imwrite = writer.write if writer is not None else cv2.imwrite
+    store = None if render else CompactStore()
+    if store is not None:
+        imwrite = store.write
+
+    # Pastikan gambar dalam format 8-bit grayscale (uint16 diskalakan, bukan dipotong)
+    image = to_uint8(image)
 
     all_params = []
 
+    # Piramida dibangun sekali; level paling kasar dipakai untuk early exit
+    pyramid, early_exit = None, False
+    if pyramid_levels and "sampling" in stages:
+        with span("pyramid", levels=pyramid_levels):
+            pyramid = EdgePyramid(image, pyramid_levels, base_level=image_scale.bit_length() - 1)
+            early_exit = early_exit_fraction is not None and pyramid.is_empty(50, 150, early_exit_fraction)
+    early_exit_note = ', early exit' if early_exit else ''
+
     # --- 1. Sobel Edge Detection dengan berbagai kernel size ---
-    for ksize in [3, 5]:
-        sobel_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=ksize)
-        sobel_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=ksize)
-        sobel_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
-        sobel_output = cv2.normalize(sobel_magnitude, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    magnitude_kernel = get_magnitude_kernel(magnitude_dtype)
+    for ksize in (sobel_ksizes if "sobel" in stages else []):
+        with span("sobel", ksize=ksize, dtype=magnitude_dtype):
+            sobel_x, sobel_y = get_gradients(image, ksize=ksize, ddepth=magnitude_kernel.ddepth)
+            # Magnitude dan normalisasi min-max ke uint8 dalam buffer yang dipakai ulang
+            sobel_output = magnitude_kernel.magnitude_minmax_uint8(sobel_x, sobel_y)
         
         filename = f"{image_name}_sobel_k{ksize}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), sobel_output)
+        imwrite(os.path.join(output_dir, filename), sobel_output)
         
         all_params.append({
             'Image Source': image_name,
@@ -42,17 +116,169 @@ def detect_edges(image, image_name, output_dir):
         })
 
     # --- 2. Canny Edge Detection dengan berbagai threshold ---
-    threshold_combinations = [
-        (50, 150, "low"),
-        (100, 200, "medium"),
-        (150, 250, "high")
-    ]
-    
-    for low_thresh, high_thresh, label in threshold_combinations:
-        canny_output = cv2.Canny(image, low_thresh, high_thresh)
+    threshold_combinations = list(canny_thresholds) if "canny" in stages else []
+    thresholds = [(low_thresh, high_thresh) for low_thresh, high_thresh, _ in threshold_combinations]
+
+    # Fusion piramida memakai Canny 50/150 resolusi penuh; ikut dihitung jika tidak ada di sweep
+    fuse_full = pyramid is not None and pyramid_fuse is not None and "canny" in stages
+    if fuse_full and (50, 150) not in thresholds:
+        thresholds.append((50, 150))
+
+    # Gradien dan NMS dihitung sekali, hanya hysteresis yang diulang per threshold
+    if early_exit:
+        canny_outputs = [np.zeros_like(image) for _ in thresholds]
+    elif thresholds:
+        with span("canny", thresholds=len(thresholds)):
+            canny_outputs = CannySweep(image).sweep(thresholds)
+    else:
+        canny_outputs = []
+    full_edges = canny_outputs[thresholds.index((50, 150))] if fuse_full else None
+
+    for (low_thresh, high_thresh, label), canny_output in zip(threshold_combinations, canny_outputs):
         filename = f"{image_name}_canny_{label}_{low_thresh}_{high_thresh}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), canny_output)
+        imwrite(os.path.join(output_dir, filename), canny_output)
         
+        all_params.append({
+            'Image Source': image_name,
+            'Edge Detection Method': 'Canny',
+            'Parameters': f'low_threshold = {low_thresh}, high_threshold = {high_thresh}'
+                          + early_exit_note,
+            'Output Filename': filename
+        })
+
+    # --- 3. Analisis Sampling dengan Downsampling ---
+    if pyramid is not None:
+        # Piramida multi-skala: level 1 identik dengan downsample tunggal di bawah
+        with span("sampling", mode="pyramid", levels=pyramid_levels):
+            all_params.extend(_pyramid_edges(pyramid, image_name, output_dir, imwrite, full_edges,
+                                             pyramid_fuse, early_exit_fraction))
+    elif "sampling" in stages:
+        # Downsample dengan faktor 2 (tidak perlu jika gambar sudah didekode pada 1/2)
+        with span("sampling", mode="downsample", scale=image_scale):
+            if image_scale == 2:
+                downsampled = image
+            else:
+                downsampled = cv2.resize(image, (image.shape[1]//2, image.shape[0]//2), interpolation=cv2.INTER_AREA)
+            canny_downsampled = canny(downsampled, 50, 150)
+        filename_downsampled = f"{image_name}_canny_downsampled.png"
+        imwrite(os.path.join(output_dir, filename_downsampled), canny_downsampled)
+
+        all_params.append({
+            'Image Source': image_name,
+            'Edge Detection Method': 'Canny Downsampled',
+            'Parameters': 'low_threshold = 50, high_threshold = 150, scale = 0.5',
+            'Output Filename': filename_downsampled
+        })
+
+    if store is not None:
+        store.save(os.path.join(output_dir, f"{image_name}_edges.npz"))
+
+    df_params = pd.DataFrame(all_params)
+    print(f"Deteksi tepi selesai untuk gambar: {image_name}")
+    return df_params
+
+def render_stored_edges(image, image_name, output_dir, writer=None):
+    """
+    Menulis PNG peta tepi biner dari {image_name}_edges.npz hasil mode
+    --no-render (image tidak dipakai, hanya untuk kompatibilitas map_images).
+    Mengembalikan jumlah PNG yang ditulis (0 jika file tidak ada).
+    """
+    store_path = os.path.join(output_dir, f"{image_name}_edges.npz")
+    if not os.path.exists(store_path):
+        print(f"Peringatan: '{store_path}' tidak ditemukan, gambar '{image_name}' dilewati")
+        return 0
+    store = CompactStore.load(store_path)
+
+    imwrite = writer.write if writer is not None else cv2.imwrite
+    for filename in store.keys("mask"):
+        imwrite(os.path.join(output_dir, filename), store.mask(filename))
+    return len(store.keys("mask"))
+
+def _pyramid_edges(pyramid, image_name, output_dir, imwrite, full_edges, fuse_method, early_exit_fraction):
+    """
+    Canny 50/150 pada setiap level piramida (level 1 ditulis dengan nama file
+    downsample yang sama seperti mode tunggal) dan fusion opsional.
+    full_edges adalah Canny 50/150 resolusi penuh yang sudah dihitung (None
+    jika stage canny tidak dijalankan; fusion hanya memakai level piramida).
+    """
+    params = []
+    maps, early_exit = pyramid.detect([(50, 150)], early_exit_fraction=early_exit_fraction)
+    coarsest = pyramid.num_levels - 1
+    level_maps = {level: maps[level][0] if level in maps else np.zeros_like(pyramid.images[level])
+                  for level in range(1, pyramid.num_levels)}
+
+    for level, edge_map in level_maps.items():
+        if level == 1:
+            filename = f"{image_name}_canny_downsampled.png"
+            method = 'Canny Downsampled'
+        else:
+            filename = f"{image_name}_canny_pyramid_L{level}.png"
+            method = 'Canny Pyramid'
+        imwrite(os.path.join(output_dir, filename), edge_map)
+        note = ', early exit' if early_exit and level != coarsest else ''
+        params.append({
+            'Image Source': image_name,
+            'Edge Detection Method': method,
+            'Parameters': f'low_threshold = 50, high_threshold = 150, scale = {0.5 ** level:g}' + note,
+            'Output Filename': filename
+        })
+
+    if fuse_method:
+        full_maps = [full_edges] if full_edges is not None else []
+        fused = pyramid.fuse(full_maps + list(level_maps.values()), fuse_method)
+        filename = f"{image_name}_canny_pyramid_fused.png"
+        imwrite(os.path.join(output_dir, filename), fused)
+        params.append({
+            'Image Source': image_name,
+            'Edge Detection Method': 'Canny Pyramid Fused',
+            'Parameters': f'low_threshold = 50, high_threshold = 150, levels = {pyramid.num_levels}, '
+                          f'fuse = {fuse_method}',
+            'Output Filename': filename
+        })
+    return params
+
+def detect_edges_tiled(image, image_name, output_dir, writer=None, tile_size=DEFAULT_TILE_SIZE,
+                       sobel_ksizes=SOBEL_KSIZES, canny_thresholds=CANNY_THRESHOLDS):
+    """
+    Versi tiled dari detect_edges untuk gambar yang sangat besar. Sobel dan
+    Canny dijalankan per tile dengan halo, normalisasi memakai min/max global
+    (dua pass), dan hasilnya ditulis langsung ke file .npy ter-memory-map.
+
+    writer tidak dipakai (output bukan PNG), hanya untuk kompatibilitas map_images.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # Raster uint16 dikonversi ke 8-bit per tile, bukan seluruhnya di memori
+    image = uint8_tiles(image)
+
+    def output(filename, shape):
+        return open_output(os.path.join(output_dir, filename), shape)
+
+    # Peta status hysteresis Canny juga di-memory-map agar tidak memakan RAM
+    state_path = os.path.join(output_dir, f".{image_name}_canny_state.npy")
+    state = output(os.path.basename(state_path), image.shape[:2])
+
+    all_params = []
+
+    # --- 1. Sobel Edge Detection ---
+    for ksize in sobel_ksizes:
+        filename = f"{image_name}_sobel_k{ksize}.npy"
+        with span("sobel", backend="tiled", ksize=ksize):
+            tiled_sobel_minmax(image, ksize, output(filename, image.shape[:2]), tile_size).flush()
+        all_params.append({
+            'Image Source': image_name,
+            'Edge Detection Method': 'Sobel',
+            'Parameters': f'ksize = {ksize}',
+            'Output Filename': filename
+        })
+
+    # --- 2. Canny Edge Detection ---
+    for low_thresh, high_thresh, label in canny_thresholds:
+        filename = f"{image_name}_canny_{label}_{low_thresh}_{high_thresh}.npy"
+        with span("canny", backend="tiled", low=low_thresh, high=high_thresh):
+            tiled_canny(image, low_thresh, high_thresh, output(filename, image.shape[:2]),
+                        tile_size, state).flush()
         all_params.append({
             'Image Source': image_name,
             'Edge Detection Method': 'Canny',
@@ -61,12 +287,12 @@ def detect_edges(image, image_name, output_dir):
         })
 
     # --- 3. Analisis Sampling dengan Downsampling ---
-    # Downsample dengan faktor 2
-    downsampled = cv2.resize(image, (image.shape[1]//2, image.shape[0]//2), interpolation=cv2.INTER_AREA)
-    canny_downsampled = cv2.Canny(downsampled, 50, 150)
-    filename_downsampled = f"{image_name}_canny_downsampled.png"
-    cv2.imwrite(os.path.join(output_dir, filename_downsampled), canny_downsampled)
-    
+    half_shape = (image.shape[0] // 2, image.shape[1] // 2)
+    filename_downsampled = f"{image_name}_canny_downsampled.npy"
+    with span("sampling", backend="tiled"):
+        downsampled = tiled_downsample2(image, output(f".{image_name}_downsampled.npy", half_shape), tile_size)
+        tiled_canny(downsampled, 50, 150, output(filename_downsampled, half_shape),
+                    tile_size, state[:half_shape[0], :half_shape[1]]).flush()
     all_params.append({
         'Image Source': image_name,
         'Edge Detection Method': 'Canny Downsampled',
@@ -74,47 +300,84 @@ def detect_edges(image, image_name, output_dir):
         'Output Filename': filename_downsampled
     })
 
+    # Hapus file sementara
+    del state, downsampled
+    os.remove(state_path)
+    os.remove(os.path.join(output_dir, f".{image_name}_downsampled.npy"))
+
     df_params = pd.DataFrame(all_params)
-    print(f"Deteksi tepi selesai untuk gambar: {image_name}")
+    print(f"Deteksi tepi tiled selesai untuk gambar: {image_name}")
     return df_params
 
-def main():
+def main(workers=1, tile_size=None, inputs=None, magnitude_dtype="float32",
+         pyramid_levels=None, pyramid_fuse=None, early_exit_fraction=None, stages=None, render=True,
+         render_only=False):
     """
     Fungsi utama untuk menjalankan pipeline deteksi tepi pada semua gambar standar.
+
+    workers: jumlah proses paralel (lihat common.parallel.map_images).
+    tile_size: jika diisi, gambar diproses per tile dan output ditulis sebagai .npy.
+    inputs: daftar (nama, raster) opsional (lihat common.image_source.load_raster)
+            sebagai pengganti gambar standar. Raster ini selalu diproses per
+            tile agar hanya bagian yang sedang diproses yang dibaca dari disk.
+    magnitude_dtype: dtype gradien untuk magnitude Sobel (frame penuh).
+    pyramid_levels, pyramid_fuse, early_exit_fraction: mode piramida (frame
+    penuh), lihat detect_edges.
+    stages: subset stage yang dijalankan (frame penuh). Jika semua stage
+    cukup dengan resolusi tereduksi, gambar pribadi JPEG langsung didekode
+    pada resolusi tersebut.
+    render: jika False, hanya statistik dan peta tepi biner ringkas yang
+    disimpan (frame penuh, lihat detect_edges).
+    render_only: jika True, deteksi tidak dijalankan; PNG peta tepi ditulis
+    dari file .npz hasil run --no-render sebelumnya.
     """
     output_dir_edge = "02_edge/output"
-    all_params_list = []
-
-    # --- Memproses Semua Gambar Standar ---
-    standard_images = [
-        ("cameraman", data.camera()),
-        ("coins", data.coins()),
-        ("checkerboard", data.checkerboard() * 255),
-        ("astronaut", cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2GRAY))
-    ]
-
-    for img_name, img_data in standard_images:
-        print(f"Memproses gambar standar '{img_name}'...")
-        params = detect_edges(img_data, img_name, output_dir_edge)
-        all_params_list.append(params)
-    
-    # --- Memproses Gambar Pribadi ---
-    personal_image_path = 'my_photo.jpg'
-    if os.path.exists(personal_image_path):
-        print(f"Memproses gambar pribadi '{personal_image_path}'...")
-        img_personal = cv2.imread(personal_image_path, cv2.IMREAD_GRAYSCALE)
-        if img_personal is not None:
-            params_personal = detect_edges(img_personal, "personal_image", output_dir_edge)
-            all_params_list.append(params_personal)
-        else:
-            print(f"Error: Gagal memuat gambar dari '{personal_image_path}'")
+    sweep = get_sweep("edge")
+    stages = tuple(stages or STAGE_SCALES)
+    image_scales = {}
+
+    if inputs is not None:
+        # --- Memproses Raster Input (memory-mapped) ---
+        images = list(inputs)
+        tile_size = tile_size or DEFAULT_TILE_SIZE
     else:
-        print(f"Peringatan: File gambar pribadi '{personal_image_path}' tidak ditemukan. Langkah ini dilewati.")
+        # --- Memproses Semua Gambar Standar ---
+        # Modul edge mengalikan checkerboard dengan 255 seperti versi awal modul ini
+        images = [(name, ImageRef(name, multiplier=255) if name == "checkerboard" else ref)
+                  for name, ref in load_standard_images(lazy=True)]
+
+        # --- Memproses Gambar Pribadi ---
+        # Decode termurah yang masih mencukupi semua stage yang dijalankan
+        personal_image_path = 'my_photo.jpg'
+        scale = decode_scale(STAGE_SCALES[stage] for stage in stages)
+        img_personal = load_personal_image(personal_image_path, scale=scale, lazy=True)
+        if img_personal is not None:
+            images.append((PERSONAL_IMAGE_NAME, img_personal))
+            image_scales[PERSONAL_IMAGE_NAME] = reduced_decode_scale(personal_image_path, scale)
+
+    if render_only:
+        counts = map_images(render_stored_edges, resolve_images(images), output_dir_edge, workers)
+        print(f"\nRender selesai: {sum(counts)} peta tepi ditulis ke '{output_dir_edge}'")
+        return
+
+    # Proses semua gambar (berurutan atau paralel), urutan hasil tetap stabil
+    process_func = functools.partial(detect_edges, magnitude_dtype=magnitude_dtype,
+                                     pyramid_levels=pyramid_levels, pyramid_fuse=pyramid_fuse,
+                                     early_exit_fraction=early_exit_fraction,
+                                     stages=stages, image_scales=image_scales,
+                                     sobel_ksizes=sweep["sobel_ksizes"],
+                                     canny_thresholds=sweep["canny_thresholds"], render=render)
+    if tile_size:
+        process_func = functools.partial(detect_edges_tiled, tile_size=tile_size,
+                                         sobel_ksizes=sweep["sobel_ksizes"],
+                                         canny_thresholds=sweep["canny_thresholds"])
+    all_params_list = map_images_cached(process_func, images, output_dir_edge, workers)
 
     if all_params_list:
         final_params_df = pd.concat(all_params_list, ignore_index=True)
         csv_path = os.path.join(output_dir_edge, "tabel_parameter_edge.csv")
-        final_params_df.to_csv(csv_path, index=False)
+        with span("csv", category="io", file=os.path.basename(csv_path)):
+            final_params_df.to_csv(csv_path, index=False)
         print(f"\nProses deteksi tepi selesai. Hasil disimpan di: '{output_dir_edge}'")
         print(f"Tabel parameter disimpan di: '{csv_path}'")
         print(f"Total gambar diproses: {len(all_params_list)}")
@@ -123,4 +386,25 @@ def main():
         print("Tidak ada gambar yang diproses.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = build_parser("Pipeline deteksi tepi")
+    parser.add_argument("--tile-size", type=int, default=None,
+                        help="Proses gambar per tile berukuran N piksel (untuk gambar sangat besar)")
+    parser.add_argument("--magnitude-dtype", choices=list(MAGNITUDE_DTYPES), default="float32",
+                        help="Dtype gradien untuk magnitude Sobel (default float32)")
+    parser.add_argument("--pyramid-levels", type=int, default=None,
+                        help="Jumlah level piramida untuk analisis multi-skala (default: satu downsample 0.5x)")
+    parser.add_argument("--pyramid-fuse", choices=FUSE_METHODS, default=None,
+                        help="Gabungkan edge map semua level ke resolusi penuh (max atau mean)")
+    parser.add_argument("--early-exit-fraction", type=float, default=None,
+                        help="Lewati Canny resolusi penuh jika proporsi tepi level terkasar di bawah nilai ini")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGE_SCALES), default=None,
+                        help="Stage yang dijalankan (default semua); 'sampling' saja cukup dengan decode 1/2")
+    parser.add_argument("--render-only", action="store_true",
+                        help="Tulis PNG peta tepi dari file .npz hasil run --no-render tanpa deteksi ulang")
+    add_raster_arguments(parser)
+    args = parser.parse_args()
+    apply_common_args(args)
+    main(workers=args.workers, tile_size=args.tile_size, inputs=load_input_rasters(args),
+         magnitude_dtype=args.magnitude_dtype, pyramid_levels=args.pyramid_levels,
+         pyramid_fuse=args.pyramid_fuse, early_exit_fraction=args.early_exit_fraction,
+         stages=args.stages, render=not args.no_render, render_only=args.render_only)
@@ -5,49 +5,104 @@
 # Fitur unik: Script ini mendeteksi feature points menggunakan Harris, SIFT, dan FAST pada semua gambar.
 import cv2
 import numpy as np
-from skimage import data
 import os
+import sys
+import functools
+import time
 import pandas as pd
 
-def find_and_draw_features(image, image_name, output_dir):
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.cli import apply_common_args, build_parser
+from common.compact import CompactStore, records_to_keypoints
+from common.fast import MultiThresholdFAST, to_cv_keypoints
+from common.feature_store import FeatureStore, fast_records
+from common.harris import HarrisEngine
+from common.image_source import PERSONAL_IMAGE_NAME, load_personal_image, load_standard_images, resolve_images
+from common.matching import DEFAULT_RATIO, MATCH_METHODS, match_descriptors, to_dmatches
+from common.parallel import map_images
+from common.run_cache import map_images_cached
+from common.sweep import DEFAULT_SWEEP, get_sweep
+from common.trace import span
+
+# Parameter sweep bawaan (dapat diganti lewat file sweep, lihat common/sweep.py)
+HARRIS_PARAMS = DEFAULT_SWEEP["featurepoints"]["harris"]
+FAST_THRESHOLDS = DEFAULT_SWEEP["featurepoints"]["fast_thresholds"]
+
+def _to_gray(image):
+    # Pastikan gambar adalah 8-bit grayscale
+    if len(image.shape) > 2:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image.copy()
+
+def draw_corner_mask(image_to_draw_on, corner_mask):
+    """
+    Overlay corner Harris: piksel mask diwarnai merah pada salinan gambar.
+    """
+    harris_image = image_to_draw_on.copy()
+    harris_image[corner_mask] = [0, 0, 255]  # Merah
+    return harris_image
+
+def draw_rich_keypoints(image_to_draw_on, keypoints):
+    """
+    Overlay keypoint (lingkaran ukuran dan orientasi) pada salinan gambar.
+    """
+    keypoint_image = image_to_draw_on.copy()
+    cv2.drawKeypoints(keypoint_image, keypoints, keypoint_image,
+                      flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+    return keypoint_image
+
+def find_and_draw_features(image, image_name, output_dir, writer=None, harris_params=HARRIS_PARAMS,
+                           fast_thresholds=FAST_THRESHOLDS, render=True, feature_store=None):
     """
     Mendeteksi, menggambar, dan menghitung feature points (Harris, SIFT, FAST).
+
+    writer: AsyncImageWriter opsional untuk menulis gambar di latar belakang.
+    harris_params: daftar (blockSize, ksize, k, label) Harris.
+    fast_thresholds: daftar threshold FAST.
+    render: jika False (mode statistik), overlay tidak digambar dan tidak ada
+    PNG yang ditulis. Mask corner Harris dan keypoint SIFT/FAST disimpan ke
+    {image_name}_features.npz (common.compact.CompactStore) dengan kunci nama
+    PNG pada kolom 'Output Filename', yang bisa dibuat belakangan dengan
+    render_stored_features.
+    feature_store: folder common.feature_store.FeatureStore opsional. Jika
+    diisi, keypoint dan descriptor SIFT serta keypoint FAST (threshold
+    terendah) ditambahkan ke store untuk matching tanpa deteksi ulang.
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Pastikan gambar adalah 8-bit grayscale
-    if len(image.shape) > 2:
-        gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    else:
-        gray_image = image.copy()
+    # Gunakan writer asinkron jika tersedia, jika tidak tulis langsung
+    imwrite = writer.write if writer is not None else cv2.imwrite
+
+    gray_image = _to_gray(image)
 
     # Buat versi berwarna dari gambar grayscale untuk menggambar fitur
-    image_to_draw_on = cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR)
+    image_to_draw_on = cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR) if render else None
+    store = None if render else CompactStore()
 
     all_stats = []
 
     # --- 1. Harris Corner Detection dengan berbagai parameter ---
-    gray_float = np.float32(gray_image)
-    
-    # Parameter Harris yang berbeda
-    harris_params = [
-        (2, 3, 0.04, "default"),
-        (3, 3, 0.04, "larger_block"),
-        (2, 5, 0.04, "larger_kernel"),
-        (2, 3, 0.06, "higher_k")
-    ]
-    
-    for blockSize, ksize, k, label in harris_params:
-        harris_response = cv2.cornerHarris(gray_float, blockSize, ksize, k)
+    # Setara cv2.cornerHarris(np.float32(gray_image), ...), tetapi produk gradien
+    # dan jumlah berjendela dipakai ulang antar kombinasi parameter
+    with span("harris", params=len(harris_params)):
+        harris_responses = HarrisEngine(gray_image).sweep(
+            [(blockSize, ksize, k) for blockSize, ksize, k, _ in harris_params])
+
+    for (blockSize, ksize, k, label), harris_response in zip(harris_params, harris_responses):
         threshold = 0.01 * harris_response.max()
+        corner_mask = harris_response > threshold
         
-        harris_image = image_to_draw_on.copy()
-        harris_image[harris_response > threshold] = [0, 0, 255]  # Merah
-        
-        num_corners = np.sum(harris_response > threshold)
+        num_corners = np.sum(corner_mask)
         filename = f"{image_name}_harris_{label}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), harris_image)
+        if render:
+            imwrite(os.path.join(output_dir, filename), draw_corner_mask(image_to_draw_on, corner_mask))
+        else:
+            store.add_mask(filename, corner_mask)
         
         all_stats.append({
             'Image Source': image_name,
@@ -58,15 +113,15 @@ def find_and_draw_features(image, image_name, output_dir):
         })
 
     # --- 2. SIFT Feature Detection ---
-    sift = cv2.SIFT_create()
-    keypoints_sift, descriptors = sift.detectAndCompute(gray_image, None)
-    
-    sift_image = image_to_draw_on.copy()
-    cv2.drawKeypoints(sift_image, keypoints_sift, sift_image, 
-                     flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+    with span("sift"):
+        sift = cv2.SIFT_create()
+        keypoints_sift, descriptors = sift.detectAndCompute(gray_image, None)
     
     filename = f"{image_name}_sift_features.png"
-    cv2.imwrite(os.path.join(output_dir, filename), sift_image)
+    if render:
+        imwrite(os.path.join(output_dir, filename), draw_rich_keypoints(image_to_draw_on, keypoints_sift))
+    else:
+        store.add_points(filename, keypoints_sift)
     
     all_stats.append({
         'Image Source': image_name,
@@ -77,18 +132,25 @@ def find_and_draw_features(image, image_name, output_dir):
     })
 
     # --- 3. FAST Feature Detection dengan berbagai threshold ---
-    fast_thresholds = [10, 20, 30]
-    
+    # Deteksi sekali pada threshold terendah, threshold lain cukup difilter dari skornya
+    with span("fast", threshold=min(fast_thresholds)):
+        fast_engine = MultiThresholdFAST(gray_image, min(fast_thresholds))
+
+    if feature_store is not None:
+        with span("feature_store", category="io", keypoints=len(keypoints_sift) + len(fast_engine.points)):
+            features = FeatureStore(feature_store)
+            features.append("sift", image_name, keypoints_sift, descriptors)
+            features.append("fast", image_name, fast_records(fast_engine.points))
+
     for threshold in fast_thresholds:
-        fast = cv2.FastFeatureDetector_create(threshold=threshold)
-        keypoints_fast = fast.detect(gray_image, None)
-        
-        fast_image = image_to_draw_on.copy()
-        cv2.drawKeypoints(fast_image, keypoints_fast, fast_image, 
-                         flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
-        
         filename = f"{image_name}_fast_thresh_{threshold}.png"
-        cv2.imwrite(os.path.join(output_dir, filename), fast_image)
+        if render:
+            keypoints_fast = fast_engine.cv_keypoints_for(threshold)
+            imwrite(os.path.join(output_dir, filename), draw_rich_keypoints(image_to_draw_on, keypoints_fast))
+        else:
+            # Array ringkas (x, y, response) tanpa membuat objek cv2.KeyPoint
+            keypoints_fast = fast_engine.detect(threshold)
+            store.add_points(filename, keypoints_fast)
         
         all_stats.append({
             'Image Source': image_name,
@@ -98,47 +160,128 @@ def find_and_draw_features(image, image_name, output_dir):
             'Output Filename': filename
         })
 
+    if store is not None:
+        store.save(os.path.join(output_dir, f"{image_name}_features.npz"))
+
     df_stats = pd.DataFrame(all_stats)
     print(f"Deteksi fitur selesai untuk gambar: {image_name}")
     return df_stats
 
-def main():
+def render_stored_features(image, image_name, output_dir, writer=None):
+    """
+    Menggambar overlay dari {image_name}_features.npz hasil mode --no-render
+    tanpa menjalankan detektor lagi. Hasilnya identik dengan mode render
+    biasa. Mengembalikan jumlah PNG yang ditulis (0 jika file tidak ada).
+    """
+    store_path = os.path.join(output_dir, f"{image_name}_features.npz")
+    if not os.path.exists(store_path):
+        print(f"Peringatan: '{store_path}' tidak ditemukan, gambar '{image_name}' dilewati")
+        return 0
+    store = CompactStore.load(store_path)
+
+    imwrite = writer.write if writer is not None else cv2.imwrite
+    image_to_draw_on = cv2.cvtColor(_to_gray(image), cv2.COLOR_GRAY2BGR)
+
+    for filename in store.keys("mask"):
+        corner_mask = store.mask(filename) != 0
+        imwrite(os.path.join(output_dir, filename), draw_corner_mask(image_to_draw_on, corner_mask))
+    for filename in store.keys("points"):
+        points = store.points(filename)
+        keypoints = (to_cv_keypoints(points) if "size" not in points.dtype.names
+                     else records_to_keypoints(points))
+        imwrite(os.path.join(output_dir, filename), draw_rich_keypoints(image_to_draw_on, keypoints))
+    return len(store.keys("mask")) + len(store.keys("points"))
+
+def match_stored_features(feature_store, pairs, images, output_dir, method="exact", ratio=DEFAULT_RATIO,
+                          cross_check=True, render=True):
+    """
+    Mencocokkan descriptor SIFT dari feature store untuk setiap pasangan
+    (gambar query, gambar train) tanpa mendeteksi ulang (common.matching).
+    images: dict nama -> gambar, dipakai untuk menggambar match (jika render).
+    Mengembalikan DataFrame statistik matching.
+    """
+    store = FeatureStore(feature_store)
+    all_stats = []
+    for query_name, train_name in pairs:
+        keypoints_query = store.keypoints("sift", query_name)
+        keypoints_train = store.keypoints("sift", train_name)
+        start = time.perf_counter()
+        with span("match", method=method, query=query_name, train=train_name):
+            matches = match_descriptors(store.descriptors("sift", query_name), store.descriptors("sift", train_name),
+                                        ratio, cross_check, method)
+        duration = time.perf_counter() - start
+
+        filename = f"matches_{query_name}_{train_name}.png"
+        if render:
+            match_image = cv2.drawMatches(_to_gray(images[query_name]), records_to_keypoints(keypoints_query),
+                                          _to_gray(images[train_name]), records_to_keypoints(keypoints_train),
+                                          to_dmatches(matches), None,
+                                          flags=cv2.DrawMatchesFlags_NOT_DRAW_SINGLE_POINTS)
+            cv2.imwrite(os.path.join(output_dir, filename), match_image)
+        all_stats.append({
+            'Image Query': query_name,
+            'Image Train': train_name,
+            'Method': method,
+            'Query Descriptors': len(keypoints_query),
+            'Train Descriptors': len(keypoints_train),
+            'Match Count': len(matches),
+            'Parameters': f'ratio = {ratio}, cross_check = {cross_check}',
+            'Time (ms)': round(duration * 1000, 2),
+            'Output Filename': filename
+        })
+    return pd.DataFrame(all_stats)
+
+def main(workers=1, render=True, render_only=False, feature_store=None, match_pairs=None,
+         match_method="exact", match_ratio=DEFAULT_RATIO, cross_check=True, compact_store=False):
     """
     Fungsi utama untuk menjalankan pipeline deteksi fitur pada semua gambar standar.
+
+    workers: jumlah proses paralel (lihat common.parallel.map_images).
+    render: jika False, hanya statistik dan array ringkas yang disimpan
+    (lihat find_and_draw_features).
+    render_only: jika True, detektor tidak dijalankan; overlay dibuat dari
+    file .npz hasil run --no-render sebelumnya.
+    feature_store: folder feature store opsional untuk keypoint dan
+    descriptor SIFT/FAST (lihat common.feature_store).
+    match_pairs: daftar (gambar query, gambar train) yang dicocokkan dari
+    feature store setelah deteksi (lihat match_stored_features).
+    compact_store: jika True, feature store dipadatkan setelah deteksi
+    (data gambar yang sudah ditulis ulang dibuang, lihat FeatureStore.compact).
+    Parameter Harris dan FAST diambil dari file sweep aktif (common.sweep).
     """
     output_dir_features = "03_featurepoints/output"
-    all_stats_list = []
+    sweep = get_sweep("featurepoints")
 
     # --- Memproses Semua Gambar Standar ---
-    standard_images = [
-        ("cameraman", data.camera()),
-        ("coins", data.coins()),
-        ("checkerboard", data.checkerboard()),
-        ("astronaut", cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2GRAY))
-    ]
-
-    for img_name, img_data in standard_images:
-        print(f"Memproses gambar standar '{img_name}'...")
-        stats = find_and_draw_features(img_data, img_name, output_dir_features)
-        all_stats_list.append(stats)
-    
+    images = load_standard_images(lazy=True)
+
     # --- Memproses Gambar Pribadi ---
     personal_image_path = 'my_photo.jpg'
-    if os.path.exists(personal_image_path):
-        print(f"Memproses gambar pribadi '{personal_image_path}'...")
-        img_personal = cv2.imread(personal_image_path, cv2.IMREAD_GRAYSCALE)
-        if img_personal is not None:
-            stats_personal = find_and_draw_features(img_personal, "personal_image", output_dir_features)
-            all_stats_list.append(stats_personal)
-        else:
-            print(f"Error: Gagal memuat gambar dari '{personal_image_path}'")
-    else:
-        print(f"Peringatan: File gambar pribadi '{personal_image_path}' tidak ditemukan. Langkah ini dilewati.")
+    img_personal = load_personal_image(personal_image_path, lazy=True)
+    if img_personal is not None:
+        images.append((PERSONAL_IMAGE_NAME, img_personal))
+
+    if render_only:
+        counts = map_images(render_stored_features, resolve_images(images), output_dir_features, workers)
+        print(f"\nRender selesai: {sum(counts)} overlay ditulis ke '{output_dir_features}'")
+        return
+
+    # Proses semua gambar (berurutan atau paralel), urutan hasil tetap stabil
+    process_func = functools.partial(find_and_draw_features, harris_params=sweep["harris"],
+                                     fast_thresholds=sweep["fast_thresholds"], render=render,
+                                     feature_store=feature_store)
+    # Gambar yang belum ada di feature store tetap diproses walaupun cache run-nya valid
+    require = None
+    if feature_store is not None:
+        store = FeatureStore(feature_store)
+        require = lambda name: store.contains("sift", name) and store.contains("fast", name)
+    all_stats_list = map_images_cached(process_func, images, output_dir_features, workers, require)
 
     if all_stats_list:
         final_stats_df = pd.concat(all_stats_list, ignore_index=True)
         csv_path = os.path.join(output_dir_features, "statistik_fitur.csv")
-        final_stats_df.to_csv(csv_path, index=False)
+        with span("csv", category="io", file=os.path.basename(csv_path)):
+            final_stats_df.to_csv(csv_path, index=False)
         print(f"\nProses deteksi fitur selesai. Hasil disimpan di: '{output_dir_features}'")
         print(f"Statistik fitur disimpan di: '{csv_path}'")
         print(f"Total gambar diproses: {len(all_stats_list)}")
@@ -151,5 +294,53 @@ def main():
     else:
         print("Tidak ada gambar yang diproses.")
 
+    if compact_store:
+        store = FeatureStore(feature_store)
+        dead_fraction = store.dead_fraction()
+        with span("feature_store_compact", category="io"):
+            store.compact()
+        print(f"\nFeature store '{feature_store}' dipadatkan ({dead_fraction:.1%} data tidak terpakai dibuang)")
+
+    if match_pairs:
+        match_df = match_stored_features(feature_store, match_pairs, dict(resolve_images(images)), output_dir_features,
+                                         match_method, match_ratio, cross_check, render)
+        csv_path = os.path.join(output_dir_features, "statistik_matching.csv")
+        with span("csv", category="io", file=os.path.basename(csv_path)):
+            match_df.to_csv(csv_path, index=False)
+        print("\n--- MATCHING SIFT ---")
+        print(match_df[['Image Query', 'Image Train', 'Match Count', 'Time (ms)']].to_string(index=False))
+        print(f"Statistik matching disimpan di: '{csv_path}'")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = build_parser("Pipeline deteksi feature points")
+    parser.add_argument("--render-only", action="store_true",
+                        help="Buat overlay dari file .npz hasil run --no-render tanpa menjalankan detektor")
+    parser.add_argument("--feature-store", type=str, default=None, metavar="DIR",
+                        help="Simpan keypoint dan descriptor SIFT/FAST ke feature store (memmap) di DIR")
+    parser.add_argument("--compact-store", action="store_true",
+                        help="Padatkan feature store setelah deteksi (buang data gambar yang sudah ditulis ulang)")
+    parser.add_argument("--match", action="append", default=None, metavar="QUERY,TRAIN",
+                        help="Cocokkan descriptor SIFT dua gambar dari feature store (dapat diulang)")
+    parser.add_argument("--match-method", choices=MATCH_METHODS, default="exact",
+                        help="exact (brute-force per blok) atau flann (approximate KD-tree)")
+    parser.add_argument("--match-ratio", type=float, default=DEFAULT_RATIO,
+                        help="Ratio test Lowe (default 0.75)")
+    parser.add_argument("--no-cross-check", action="store_true",
+                        help="Matikan cross-check pada matching")
+    args = parser.parse_args()
+    apply_common_args(args)
+    match_pairs = None
+    if args.match:
+        match_pairs = [tuple(name.strip() for name in pair.split(",")) for pair in args.match]
+        if any(len(pair) != 2 for pair in match_pairs):
+            parser.error("--match harus berformat QUERY,TRAIN (contoh: cameraman,personal_image)")
+        if not args.feature_store:
+            parser.error("--match membutuhkan --feature-store")
+        if args.render_only:
+            parser.error("--match tidak dapat dipakai bersama --render-only")
+    if args.compact_store and not args.feature_store:
+        parser.error("--compact-store membutuhkan --feature-store")
+    main(workers=args.workers, render=not args.no_render, render_only=args.render_only,
+         feature_store=args.feature_store, match_pairs=match_pairs, match_method=args.match_method,
+         match_ratio=args.match_ratio, cross_check=not args.no_cross_check,
+         compact_store=args.compact_store)
@@ -6,17 +6,94 @@
 
 import cv2
 import numpy as np
-from skimage import data
 import os
+import sys
+import time
+import argparse
+import functools
 import pandas as pd
 
-def simulate_camera_calibration(image, image_name, output_dir):
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.calibration import DEFAULT_DETECT_SIDE, calibrate_directory
+from common.cli import add_raster_arguments, apply_common_args, build_parser, load_input_rasters
+from common.compact import skip_write
+from common.image_source import PERSONAL_IMAGE_NAME, load_personal_image, load_standard_images
+from common.run_cache import map_images_cached
+from common.sweep import DEFAULT_SWEEP, get_sweep
+from common.trace import span
+from common.tiling import DEFAULT_TILE_SIZE, open_output, tiled_warp
+from common.warp import warp
+from common.writer import record_output
+
+# Parameter sweep bawaan (dapat diganti lewat file sweep, lihat common/sweep.py)
+PERSPECTIVE_DST = DEFAULT_SWEEP["geometry"]["perspective_dst"]
+ROTATION_ANGLES = DEFAULT_SWEEP["geometry"]["rotation_angles"]
+
+# Backend transformasi: cv2.warpAffine/warpPerspective, atau cv2.remap dengan
+# peta float32 yang di-cache per (ukuran, matriks) (lihat common/warp.py)
+WARP_BACKENDS = ("opencv", "remap")
+
+def perspective_transform(rows, cols, dst_fractions=PERSPECTIVE_DST):
+    """
+    Titik sumber, titik tujuan, dan matriks transformasi perspektif yang
+    dipakai untuk simulasi efek perspektif. dst_fractions: titik tujuan
+    sebagai pecahan (lebar, tinggi) untuk keempat sudut.
+    """
+    # Tentukan 4 titik pada gambar sumber (sudut gambar)
+    src_points = np.float32([
+        [0, 0],         # Kiri atas
+        [cols - 1, 0],  # Kanan atas
+        [0, rows - 1],  # Kiri bawah
+        [cols - 1, rows - 1] # Kanan bawah
+    ])
+
+    # Tentukan 4 titik tujuan untuk efek perspektif (kiri atas, kanan atas, kiri bawah, kanan bawah)
+    dst_points = np.float32([[cols * fx, rows * fy] for fx, fy in dst_fractions])
+
+    # Hitung matriks transformasi perspektif
+    M_perspective = cv2.getPerspectiveTransform(src_points, dst_points)
+    return src_points, dst_points, M_perspective
+
+def apply_transform(image, matrix, backend="opencv"):
+    """
+    Menerapkan matriks 2x3 (affine) atau 3x3 (perspektif) dengan ukuran
+    output sama dengan input. Backend "remap" memakai peta float32 dari
+    cache (selisih maksimum 1 level keabuan pada sangat sedikit piksel, lihat
+    common.warp.MAP_TYPES).
+    """
+    if backend == "remap":
+        return warp(image, matrix)
+    rows, cols = image.shape[:2]
+    if matrix.shape == (2, 3):
+        return cv2.warpAffine(image, matrix, (cols, rows))
+    return cv2.warpPerspective(image, matrix, (cols, rows))
+
+def simulate_camera_calibration(image, image_name, output_dir, writer=None,
+                                perspective_dst=PERSPECTIVE_DST, rotation_angles=ROTATION_ANGLES, render=True,
+                                warp_backend="opencv"):
     """
     Melakukan simulasi kalibrasi kamera dan transformasi geometri.
+
+    writer: AsyncImageWriter opsional untuk menulis gambar di latar belakang.
+    perspective_dst: titik tujuan perspektif (lihat perspective_transform).
+    rotation_angles: daftar sudut rotasi dalam derajat.
+    render: jika False (mode statistik), transformasi dan kalibrasi tetap
+    dihitung dan file parameter tetap ditulis, tetapi overlay corner tidak
+    digambar dan tidak ada PNG yang ditulis.
+    warp_backend: "opencv" (default) atau "remap" (lihat apply_transform).
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    # Gunakan writer asinkron jika tersedia, jika tidak tulis langsung
+    imwrite = writer.write if writer is not None else cv2.imwrite
+    if not render:
+        imwrite = skip_write
+
     # Pastikan gambar dalam format BGR untuk menggambar
     if len(image.shape) == 2:
         image_bgr = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
@@ -25,33 +102,26 @@ def simulate_camera_calibration(image, image_name, output_dir):
         
     rows, cols, _ = image_bgr.shape
 
-    all_params = []
+    # Gambar grayscale di-warp sebagai 1 channel lalu dikonversi ke BGR: hasilnya
+    # identik dengan warp gambar BGR, tetapi interpolasinya 3x lebih sedikit
+    grayscale = len(image.shape) == 2
+    warp_source = image if grayscale else image_bgr
 
-    # --- 1. Simulasi Transformasi Perspektif ---
-    # Tentukan 4 titik pada gambar sumber (sudut gambar)
-    src_points = np.float32([
-        [0, 0],         # Kiri atas
-        [cols - 1, 0],  # Kanan atas
-        [0, rows - 1],  # Kiri bawah
-        [cols - 1, rows - 1] # Kanan bawah
-    ])
+    def transform(matrix):
+        warped = apply_transform(warp_source, matrix, warp_backend)
+        return cv2.cvtColor(warped, cv2.COLOR_GRAY2BGR) if grayscale else warped
 
-    # Tentukan 4 titik tujuan untuk efek perspektif
-    dst_points = np.float32([
-        [cols * 0.15, rows * 0.15], # Kiri atas bergeser ke dalam
-        [cols * 0.85, rows * 0.1],  # Kanan atas bergeser
-        [cols * 0.05, rows * 0.9],  # Kiri bawah bergeser
-        [cols * 0.95, rows * 0.85]  # Kanan bawah bergeser
-    ])
+    all_params = []
 
-    # Hitung matriks transformasi perspektif
-    M_perspective = cv2.getPerspectiveTransform(src_points, dst_points)
+    # --- 1. Simulasi Transformasi Perspektif ---
+    src_points, dst_points, M_perspective = perspective_transform(rows, cols, perspective_dst)
 
     # Terapkan transformasi
-    transformed_img = cv2.warpPerspective(image_bgr, M_perspective, (cols, rows))
+    with span("warp_perspective"):
+        transformed_img = transform(M_perspective)
     
     # Simpan hasil
-    cv2.imwrite(os.path.join(output_dir, f"{image_name}_perspective_transformed.png"), transformed_img)
+    imwrite(os.path.join(output_dir, f"{image_name}_perspective_transformed.png"), transformed_img)
 
     all_params.append({
         'Image Source': image_name,
@@ -61,21 +131,23 @@ def simulate_camera_calibration(image, image_name, output_dir):
     })
 
     # --- 2. Simulasi Rotasi dan Scaling ---
-    # Matriks rotasi 30 derajat
-    angle = 30
     center = (cols // 2, rows // 2)
-    M_rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
-    
-    # Terapkan rotasi
-    rotated_img = cv2.warpAffine(image_bgr, M_rotation, (cols, rows))
-    cv2.imwrite(os.path.join(output_dir, f"{image_name}_rotated_{angle}deg.png"), rotated_img)
+    rotations = []
+    for angle in rotation_angles:
+        M_rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+        rotations.append((angle, M_rotation))
 
-    all_params.append({
-        'Image Source': image_name,
-        'Transform Type': f'Rotation {angle}°',
-        'Matrix Shape': f'{M_rotation.shape}',
-        'Output Files': f'{image_name}_rotated_{angle}deg.png'
-    })
+        # Terapkan rotasi
+        with span("warp_affine", angle=angle):
+            rotated_img = transform(M_rotation)
+        imwrite(os.path.join(output_dir, f"{image_name}_rotated_{angle}deg.png"), rotated_img)
+
+        all_params.append({
+            'Image Source': image_name,
+            'Transform Type': f'Rotation {angle}°',
+            'Matrix Shape': f'{M_rotation.shape}',
+            'Output Files': f'{image_name}_rotated_{angle}deg.png'
+        })
 
     # --- 3. Simulasi Camera Calibration dengan Checkerboard ---
     if "checkerboard" in image_name.lower():
@@ -85,17 +157,20 @@ def simulate_camera_calibration(image, image_name, output_dir):
         # Parameter checkerboard (sesuaikan dengan gambar)
         pattern_size = (7, 7)  # Internal corners
         
-        ret, corners = cv2.findChessboardCorners(gray, pattern_size, None)
+        with span("find_chessboard", pattern=list(pattern_size)):
+            ret, corners = cv2.findChessboardCorners(gray, pattern_size, None)
         
         if ret:
             # Refine corner detection
             criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-            corners_refined = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+            with span("corner_subpix"):
+                corners_refined = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
             
             # Gambar corner yang terdeteksi
-            corner_img = image_bgr.copy()
-            cv2.drawChessboardCorners(corner_img, pattern_size, corners_refined, ret)
-            cv2.imwrite(os.path.join(output_dir, f"{image_name}_calibration_corners.png"), corner_img)
+            if render:
+                corner_img = image_bgr.copy()
+                cv2.drawChessboardCorners(corner_img, pattern_size, corners_refined, ret)
+                imwrite(os.path.join(output_dir, f"{image_name}_calibration_corners.png"), corner_img)
             
             # Simulasi parameter kamera intrinsik
             camera_matrix = np.array([
@@ -111,7 +186,8 @@ def simulate_camera_calibration(image, image_name, output_dir):
             obj_points[:, :2] = np.mgrid[0:pattern_size[0], 0:pattern_size[1]].T.reshape(-1, 2)
             
             # Simulasi pose estimation
-            ret, rvecs, tvecs = cv2.solvePnP(obj_points, corners_refined, camera_matrix, dist_coeffs)
+            with span("solve_pnp"):
+                ret, rvecs, tvecs = cv2.solvePnP(obj_points, corners_refined, camera_matrix, dist_coeffs)
             
             all_params.append({
                 'Image Source': image_name,
@@ -122,6 +198,7 @@ def simulate_camera_calibration(image, image_name, output_dir):
 
     # --- Simpan Parameter dan Matriks ke File Teks ---
     matrix_file_path = os.path.join(output_dir, f"{image_name}_geometry_parameters.txt")
+    record_output(matrix_file_path)
     with open(matrix_file_path, 'w') as f:
         f.write("--- Parameter Transformasi Geometri ---\n\n")
         f.write(f"Gambar Sumber: {image_name}\n")
@@ -133,9 +210,10 @@ def simulate_camera_calibration(image, image_name, output_dir):
         f.write(f"Matriks Transformasi Perspektif:\n{M_perspective}\n\n")
         
         f.write("2. Transformasi Rotasi:\n")
-        f.write(f"Sudut Rotasi: {angle} derajat\n")
-        f.write(f"Pusat Rotasi: {center}\n")
-        f.write(f"Matriks Rotasi:\n{M_rotation}\n\n")
+        for angle, M_rotation in rotations:
+            f.write(f"Sudut Rotasi: {angle} derajat\n")
+            f.write(f"Pusat Rotasi: {center}\n")
+            f.write(f"Matriks Rotasi:\n{M_rotation}\n\n")
         
         if "checkerboard" in image_name.lower() and ret:
             f.write("3. Parameter Kalibrasi Kamera:\n")
@@ -149,43 +227,184 @@ def simulate_camera_calibration(image, image_name, output_dir):
     print(f"Parameter dan matriks disimpan di: '{matrix_file_path}'")
     return df_params
 
-def main():
+def transform_large_image(image, image_name, output_dir, writer=None, tile_size=DEFAULT_TILE_SIZE,
+                          perspective_dst=PERSPECTIVE_DST, rotation_angles=ROTATION_ANGLES):
+    """
+    Versi tiled dari simulate_camera_calibration untuk gambar yang sangat
+    besar. Transformasi perspektif dan rotasi dijalankan per tile output
+    dan ditulis langsung ke file .npy ter-memory-map. Output tetap
+    grayscale (tidak dikonversi ke BGR) agar ukurannya tidak menjadi tiga
+    kali lipat, dan simulasi kalibrasi checkerboard dilewati.
+
+    writer tidak dipakai (output bukan PNG), hanya untuk kompatibilitas map_images.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    rows, cols = image.shape[:2]
+
+    def output(filename):
+        return open_output(os.path.join(output_dir, filename), image.shape[:2], image.dtype)
+
+    all_params = []
+
+    # --- 1. Transformasi Perspektif ---
+    src_points, dst_points, M_perspective = perspective_transform(rows, cols, perspective_dst)
+    filename = f"{image_name}_perspective_transformed.npy"
+    with span("warp_perspective", backend="tiled"):
+        tiled_warp(image, M_perspective, output(filename), tile_size).flush()
+    all_params.append({
+        'Image Source': image_name,
+        'Transform Type': 'Perspective Transform',
+        'Matrix Shape': f'{M_perspective.shape}',
+        'Output Files': filename
+    })
+
+    # --- 2. Rotasi ---
+    center = (cols // 2, rows // 2)
+    rotations = []
+    for angle in rotation_angles:
+        M_rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+        rotations.append((angle, M_rotation))
+        filename = f"{image_name}_rotated_{angle}deg.npy"
+        with span("warp_affine", backend="tiled", angle=angle):
+            tiled_warp(image, M_rotation, output(filename), tile_size).flush()
+        all_params.append({
+            'Image Source': image_name,
+            'Transform Type': f'Rotation {angle}°',
+            'Matrix Shape': f'{M_rotation.shape}',
+            'Output Files': filename
+        })
+
+    # --- Simpan Parameter dan Matriks ke File Teks ---
+    matrix_file_path = os.path.join(output_dir, f"{image_name}_geometry_parameters.txt")
+    record_output(matrix_file_path)
+    with open(matrix_file_path, 'w') as f:
+        f.write("--- Parameter Transformasi Geometri ---\n\n")
+        f.write(f"Gambar Sumber: {image_name}\n")
+        f.write(f"Dimensi Gambar: {cols} x {rows}\n\n")
+
+        f.write("1. Transformasi Perspektif:\n")
+        f.write(f"Titik Sumber:\n{src_points}\n\n")
+        f.write(f"Titik Tujuan:\n{dst_points}\n\n")
+        f.write(f"Matriks Transformasi Perspektif:\n{M_perspective}\n\n")
+
+        f.write("2. Transformasi Rotasi:\n")
+        for angle, M_rotation in rotations:
+            f.write(f"Sudut Rotasi: {angle} derajat\n")
+            f.write(f"Pusat Rotasi: {center}\n")
+            f.write(f"Matriks Rotasi:\n{M_rotation}\n\n")
+
+    df_params = pd.DataFrame(all_params)
+    print(f"Transformasi geometri tiled selesai untuk gambar: {image_name}")
+    print(f"Parameter dan matriks disimpan di: '{matrix_file_path}'")
+    return df_params
+
+def run_calibration(directory, output_dir, pattern_size=(7, 7), square_size=1.0,
+                    detect_side=DEFAULT_DETECT_SIDE, workers=1):
+    """
+    Kalibrasi kamera sungguhan dari folder berisi banyak view papan catur
+    (lihat common.calibration). Hasil ditulis ke calibration_result.txt,
+    calibration_result.npz (camera_matrix, dist_coeffs, image_size), dan
+    tabel per view calibration_views.csv.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    result, report = calibrate_directory(directory, pattern_size, square_size, detect_side, workers)
+    duration = time.perf_counter() - start
+
+    errors = dict(zip(result.views, result.view_errors))
+    views_df = pd.DataFrame([{
+        'View': os.path.basename(path),
+        'Corner Ditemukan': found,
+        'Skala Deteksi': round(scale, 3),
+        'Reprojection Error (px)': errors.get(path),
+        'Keterangan': note,
+    } for path, found, scale, note in report])
+    csv_path = os.path.join(output_dir, "calibration_views.csv")
+    views_df.to_csv(csv_path, index=False)
+
+    np.savez(os.path.join(output_dir, "calibration_result.npz"), camera_matrix=result.camera_matrix,
+             dist_coeffs=result.dist_coeffs, image_size=np.array(result.image_size))
+    result_path = os.path.join(output_dir, "calibration_result.txt")
+    with open(result_path, 'w') as f:
+        f.write("--- Hasil Kalibrasi Kamera ---\n\n")
+        f.write(f"Folder View: {directory}\n")
+        f.write(f"Pola Papan Catur (corner internal): {pattern_size[0]} x {pattern_size[1]}\n")
+        f.write(f"Ukuran Kotak: {square_size}\n")
+        f.write(f"Dimensi Gambar: {result.image_size[0]} x {result.image_size[1]}\n")
+        f.write(f"View Dipakai: {len(result.views)} dari {len(report)}\n\n")
+        f.write(f"RMS Reprojection Error: {result.rms:.4f} px\n\n")
+        f.write(f"Camera Matrix:\n{result.camera_matrix}\n\n")
+        f.write(f"Distortion Coefficients:\n{result.dist_coeffs}\n")
+
+    print(f"\nKalibrasi selesai dalam {duration:.2f} detik: {len(result.views)} dari {len(report)} view dipakai")
+    print(f"RMS reprojection error: {result.rms:.4f} px")
+    print(f"Camera matrix:\n{result.camera_matrix}")
+    print(f"Hasil kalibrasi disimpan di: '{result_path}'")
+    print(f"Tabel per view disimpan di: '{csv_path}'")
+    return result
+
+def _parse_pattern(value):
+    try:
+        columns, rows = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"pola tidak valid: '{value}' (contoh: 9x6)")
+    return columns, rows
+
+def main(workers=1, tile_size=None, inputs=None, render=True, warp_backend="opencv",
+         calibration_dir=None, pattern_size=(7, 7), square_size=1.0, detect_side=DEFAULT_DETECT_SIDE):
     """
     Fungsi utama untuk menjalankan pipeline transformasi geometri pada semua gambar standar.
+
+    workers: jumlah proses paralel (lihat common.parallel.map_images).
+    tile_size: jika diisi, gambar diproses per tile dan output ditulis sebagai .npy.
+    inputs: daftar (nama, raster) opsional (lihat common.image_source.load_raster)
+            sebagai pengganti gambar standar. Raster ini selalu diproses per
+            tile agar hanya bagian yang sedang diproses yang dibaca dari disk.
+    render: jika False, PNG tidak ditulis (frame penuh, lihat simulate_camera_calibration).
+    warp_backend: backend transformasi (frame penuh), lihat WARP_BACKENDS.
+    calibration_dir: jika diisi, pipeline biasa tidak dijalankan; kamera
+    dikalibrasi dari semua view di folder ini (lihat run_calibration) dengan
+    pattern_size (corner internal kolom x baris), square_size, dan
+    detect_side (sisi terpanjang salinan untuk deteksi coarse).
+    Titik perspektif dan sudut rotasi diambil dari file sweep aktif (common.sweep).
     """
     output_dir_geometry = "04_geometry/output"
-    all_params_list = []
-
-    # --- Memproses Semua Gambar Standar ---
-    standard_images = [
-        ("cameraman", data.camera()),
-        ("coins", data.coins()),
-        ("checkerboard", data.checkerboard()),
-        ("astronaut", cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2GRAY))
-    ]
-
-    for img_name, img_data in standard_images:
-        print(f"Memproses gambar standar '{img_name}'...")
-        params = simulate_camera_calibration(img_data, img_name, output_dir_geometry)
-        all_params_list.append(params)
-    
-    # --- Memproses Gambar Pribadi ---
-    personal_image_path = 'my_photo.jpg'
-    if os.path.exists(personal_image_path):
-        print(f"Memproses gambar pribadi '{personal_image_path}'...")
-        img_personal = cv2.imread(personal_image_path, cv2.IMREAD_GRAYSCALE)
-        if img_personal is not None:
-            params_personal = simulate_camera_calibration(img_personal, "personal_image", output_dir_geometry)
-            all_params_list.append(params_personal)
-        else:
-            print(f"Error: Gagal memuat gambar dari '{personal_image_path}'")
+    if calibration_dir is not None:
+        return run_calibration(calibration_dir, output_dir_geometry, pattern_size, square_size,
+                               detect_side, workers)
+    sweep = get_sweep("geometry")
+
+    if inputs is not None:
+        # --- Memproses Raster Input (memory-mapped) ---
+        images = list(inputs)
+        tile_size = tile_size or DEFAULT_TILE_SIZE
     else:
-        print(f"Peringatan: File gambar pribadi '{personal_image_path}' tidak ditemukan. Langkah ini dilewati.")
+        # --- Memproses Semua Gambar Standar ---
+        images = load_standard_images(lazy=True)
+
+        # --- Memproses Gambar Pribadi ---
+        personal_image_path = 'my_photo.jpg'
+        img_personal = load_personal_image(personal_image_path, lazy=True)
+        if img_personal is not None:
+            images.append((PERSONAL_IMAGE_NAME, img_personal))
+
+    # Proses semua gambar (berurutan atau paralel), urutan hasil tetap stabil
+    process_func = functools.partial(simulate_camera_calibration, perspective_dst=sweep["perspective_dst"],
+                                     rotation_angles=sweep["rotation_angles"], render=render,
+                                     warp_backend=warp_backend)
+    if tile_size:
+        process_func = functools.partial(transform_large_image, tile_size=tile_size,
+                                         perspective_dst=sweep["perspective_dst"],
+                                         rotation_angles=sweep["rotation_angles"])
+    all_params_list = map_images_cached(process_func, images, output_dir_geometry, workers)
 
     if all_params_list:
         final_params_df = pd.concat(all_params_list, ignore_index=True)
         csv_path = os.path.join(output_dir_geometry, "tabel_parameter_geometry.csv")
-        final_params_df.to_csv(csv_path, index=False)
+        with span("csv", category="io", file=os.path.basename(csv_path)):
+            final_params_df.to_csv(csv_path, index=False)
         print(f"\nProses transformasi geometri selesai. Hasil disimpan di: '{output_dir_geometry}'")
         print(f"Tabel parameter disimpan di: '{csv_path}'")
         print(f"Total gambar diproses: {len(all_params_list)}")
@@ -194,4 +413,22 @@ def main():
         print("Tidak ada gambar yang diproses.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = build_parser("Pipeline transformasi geometri")
+    parser.add_argument("--tile-size", type=int, default=None,
+                        help="Proses gambar per tile berukuran N piksel (untuk gambar sangat besar)")
+    parser.add_argument("--warp-backend", choices=WARP_BACKENDS, default="opencv",
+                        help="Backend transformasi: opencv (default) atau remap (peta float32 yang di-cache)")
+    parser.add_argument("--calibrate", type=str, default=None, metavar="DIR",
+                        help="Kalibrasi kamera dari semua view papan catur di folder ini")
+    parser.add_argument("--pattern", type=_parse_pattern, default=(7, 7), metavar="KxB",
+                        help="Jumlah corner internal papan catur kolom x baris (default 7x7)")
+    parser.add_argument("--square-size", type=float, default=1.0,
+                        help="Ukuran sisi kotak papan catur (satuan translasi, default 1)")
+    parser.add_argument("--detect-side", type=int, default=DEFAULT_DETECT_SIDE,
+                        help="Sisi terpanjang salinan gambar untuk deteksi corner awal (default 640)")
+    add_raster_arguments(parser)
+    args = parser.parse_args()
+    apply_common_args(args)
+    main(workers=args.workers, tile_size=args.tile_size, inputs=load_input_rasters(args),
+         render=not args.no_render, warp_backend=args.warp_backend, calibration_dir=args.calibrate,
+         pattern_size=args.pattern, square_size=args.square_size, detect_side=args.detect_side)
@@ -0,0 +1,136 @@
+# benchmarks/bench_calibration.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark kalibrasi multi-view. View papan catur sintetis dibuat
+#        dari kamera yang diketahui, lalu deteksi resolusi penuh berurutan
+#        (cara lama) dibandingkan deteksi coarse-to-fine paralel dengan
+#        CALIB_CB_FAST_CHECK (common/calibration.py), termasuk akurasi
+#        parameter kamera yang ditemukan.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.calibration import DEFAULT_DETECT_SIDE, calibrate, calibrate_directory, find_views
+
+
+def board_texture(pattern_size, square):
+    """
+    Papan catur dengan (kolom+1) x (baris+1) kotak dan margin putih satu
+    kotak. Mengembalikan (tekstur, matriks dunia -> piksel tekstur), dengan
+    corner internal (0, 0) di koordinat dunia (0, 0) dan satuan satu kotak.
+    """
+    cols, rows = pattern_size[0] + 1, pattern_size[1] + 1
+    cells = (np.indices((rows, cols)).sum(axis=0) % 2 == 0).astype(np.uint8) * 255
+    board = np.kron(255 - cells, np.ones((square, square), dtype=np.uint8))
+    texture = np.full(((rows + 2) * square, (cols + 2) * square), 255, dtype=np.uint8)
+    texture[square:-square, square:-square] = board
+    world_to_texture = np.array([[square, 0, 2 * square - 0.5],
+                                 [0, square, 2 * square - 0.5],
+                                 [0, 0, 1]], dtype=np.float64)
+    return texture, world_to_texture
+
+
+def synthesize_views(directory, count, pattern_size, size, camera_matrix, empty_fraction, seed=0):
+    """
+    Menulis count view PNG (sebagian tanpa papan catur) ke directory.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    texture, world_to_texture = board_texture(pattern_size, 64)
+    center = np.array([(pattern_size[0] - 1) / 2, (pattern_size[1] - 1) / 2, 0.0])
+    for i in range(count):
+        background = cv2.GaussianBlur(rng.integers(60, 200, (height, width), dtype=np.uint8), (0, 0), 8)
+        if rng.random() < empty_fraction:
+            view = background
+        else:
+            angles = np.deg2rad([rng.uniform(-35, 35), rng.uniform(-35, 35), rng.uniform(-20, 20)])
+            rotation, _ = cv2.Rodrigues(angles)
+            distance = rng.uniform(14, 24)
+            offset = np.array([rng.uniform(-2, 2), rng.uniform(-1.5, 1.5), distance])
+            translation = offset - rotation @ center
+            homography = camera_matrix @ np.column_stack([rotation[:, 0], rotation[:, 1], translation])
+            homography = homography @ np.linalg.inv(world_to_texture)
+            warped = cv2.warpPerspective(texture, homography, (width, height), flags=cv2.INTER_AREA)
+            mask = cv2.warpPerspective(np.full_like(texture, 255), homography, (width, height))
+            view = np.where(mask > 0, warped, background)
+        noise = rng.normal(0, 3, view.shape)
+        view = np.clip(cv2.GaussianBlur(view, (3, 3), 0) + noise, 0, 255).astype(np.uint8)
+        cv2.imwrite(os.path.join(directory, f"view_{i:04d}.png"), view)
+
+
+def calibrate_full_resolution(directory, pattern_size):
+    """
+    Cara lama: findChessboardCorners resolusi penuh tanpa FAST_CHECK dan
+    cornerSubPix 11x11, berurutan.
+    """
+    corners_list, views, image_size = [], [], None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    for path in find_views(directory):
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        found, corners = cv2.findChessboardCorners(gray, pattern_size, None)
+        if found:
+            corners_list.append(cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria))
+            views.append(path)
+            image_size = (gray.shape[1], gray.shape[0])
+    return calibrate(corners_list, pattern_size, image_size, views=views)
+
+
+def describe(name, seconds, result, truth):
+    fx, fy = result.camera_matrix[0, 0], result.camera_matrix[1, 1]
+    cx, cy = result.camera_matrix[0, 2], result.camera_matrix[1, 2]
+    print(f"{name:<30} {seconds:>9.2f} {len(result.views):>6} {result.rms:>8.3f} "
+          f"{fx - truth[0, 0]:>+8.2f} {fy - truth[1, 1]:>+8.2f} {cx - truth[0, 2]:>+8.2f} {cy - truth[1, 2]:>+8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kalibrasi kamera multi-view")
+    parser.add_argument("--views", type=int, default=60, help="Jumlah view sintetis")
+    parser.add_argument("--size", type=int, nargs=2, default=[1920, 1080], metavar=("W", "H"),
+                        help="Ukuran view (default 1920 1080)")
+    parser.add_argument("--empty-fraction", type=float, default=0.2,
+                        help="Proporsi view tanpa papan catur (default 0.2)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker deteksi paralel (0 = semua core)")
+    parser.add_argument("--detect-side", type=int, default=DEFAULT_DETECT_SIDE,
+                        help="Sisi terpanjang salinan deteksi coarse")
+    parser.add_argument("--skip-baseline", action="store_true", help="Jangan jalankan cara lama")
+    args = parser.parse_args()
+
+    pattern_size = (9, 6)
+    width, height = args.size
+    truth = np.array([[1.1 * width, 0, width / 2], [0, 1.1 * width, height / 2], [0, 0, 1]])
+    directory = tempfile.mkdtemp(prefix="bench_calibration_")
+    try:
+        synthesize_views(directory, args.views, pattern_size, (width, height), truth, args.empty_fraction)
+        print(f"{args.views} view {width}x{height}, pola {pattern_size[0]}x{pattern_size[1]}, "
+              f"fx = fy = {truth[0, 0]:.0f}, cx = {truth[0, 2]:.0f}, cy = {truth[1, 2]:.0f}")
+        print(f"{'Metode':<30} {'Waktu (s)':>9} {'View':>6} {'RMS':>8} {'dfx':>8} {'dfy':>8} {'dcx':>8} {'dcy':>8}")
+        print("-" * 94)
+        if not args.skip_baseline:
+            start = time.perf_counter()
+            result = calibrate_full_resolution(directory, pattern_size)
+            describe("penuh, berurutan", time.perf_counter() - start, result, truth)
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            result, _ = calibrate_directory(directory, pattern_size, detect_side=args.detect_side,
+                                            workers=workers)
+            label = "semua core" if workers == 0 else f"{workers} worker"
+            describe(f"coarse-to-fine, {label}", time.perf_counter() - start, result, truth)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
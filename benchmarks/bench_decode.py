@@ -0,0 +1,66 @@
+# benchmarks/bench_decode.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark decode JPEG tereduksi (IMREAD_REDUCED_GRAYSCALE_2/4/8)
+#        dibandingkan decode penuh lalu cv2.resize, untuk waktu dan memori.
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.image_source import REDUCED_GRAYSCALE_FLAGS
+
+
+def best_time(func, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark decode JPEG tereduksi")
+    parser.add_argument("path", nargs="?", default=os.path.join(ROOT_DIR, "my_photo.jpg"),
+                        help="File JPEG yang diuji")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan (diambil tercepat)")
+    args = parser.parse_args()
+
+    full, full_time = best_time(lambda: cv2.imread(args.path, cv2.IMREAD_GRAYSCALE), args.repeats)
+    if full is None:
+        print(f"Error: Gagal memuat gambar dari '{args.path}'")
+        return
+    print(f"'{args.path}' {full.shape[1]}x{full.shape[0]}")
+    print(f"{'Skala':<7} {'Ukuran':>11} {'penuh+resize (ms)':>18} {'tereduksi (ms)':>15} "
+          f"{'Memori (MB)':>12} {'Selisih rata2':>14}")
+    print("-" * 83)
+    print(f"{'1':<7} {f'{full.shape[1]}x{full.shape[0]}':>11} {full_time * 1000:>18.1f} "
+          f"{'-':>15} {full.nbytes / 2**20:>12.2f} {'-':>14}")
+
+    for scale, flag in REDUCED_GRAYSCALE_FLAGS.items():
+        size = (full.shape[1] // scale, full.shape[0] // scale)
+        resized, resize_time = best_time(lambda: cv2.resize(full, size, interpolation=cv2.INTER_AREA),
+                                         args.repeats)
+        reduced, reduced_time = best_time(lambda: cv2.imread(args.path, flag), args.repeats)
+        # Decode tereduksi membulatkan ukuran ke atas; bandingkan bagian yang sama
+        common = reduced[:resized.shape[0], :resized.shape[1]]
+        diff = np.abs(common.astype(np.int16) - resized.astype(np.int16)).mean()
+        print(f"{f'1/{scale}':<7} {f'{reduced.shape[1]}x{reduced.shape[0]}':>11} "
+              f"{(full_time + resize_time) * 1000:>18.1f} {reduced_time * 1000:>15.1f} "
+              f"{reduced.nbytes / 2**20:>12.2f} {diff:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
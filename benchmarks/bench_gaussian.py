@@ -0,0 +1,74 @@
+# benchmarks/bench_gaussian.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark bank Gaussian bertingkat (common/gaussian.py) untuk sweep
+#        sigma dibandingkan cv2.GaussianBlur langsung dari gambar asli untuk
+#        setiap sigma, beserta selisih piksel (toleransi).
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.gaussian import GaussianBank
+from common.image_source import preload_images
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def difference(result, reference, border):
+    """
+    Selisih absolut maksimum, maksimum di bagian dalam (tanpa pita border), dan rata-rata.
+    """
+    diff = np.abs(result.astype(np.int32) - reference.astype(np.int32))
+    inner = diff[border:-border, border:-border] if border else diff
+    return int(diff.max()), int(inner.max()) if inner.size else 0, float(diff.mean())
+
+
+def bench_sigmas(name, image, sigmas):
+    references, direct_time = timed(lambda: [cv2.GaussianBlur(image, (0, 0), s) for s in sigmas])
+    print(f"Sweep {len(sigmas)} sigma ({sigmas[0]:.2f}..{sigmas[-1]:.2f}) pada '{name}' "
+          f"{image.shape[1]}x{image.shape[0]}")
+    print(f"  cv2.GaussianBlur langsung : {direct_time * 1000:8.1f} ms")
+
+    for decimate in (False, True):
+        results, cascade_time = timed(lambda: GaussianBank(image, decimate=decimate).blur_sigmas(sigmas))
+        worst = (0, 0, 0.0)
+        for sigma, result, reference in zip(sigmas, results, references):
+            diff = difference(result, reference, int(3 * sigma) + 4)
+            worst = tuple(max(a, b) for a, b in zip(worst, diff))
+        label = "bertingkat + decimation" if decimate else "bertingkat"
+        print(f"  {label:<26}: {cascade_time * 1000:8.1f} ms "
+              f"(x{direct_time / cascade_time:.1f}), selisih maks {worst[0]}, "
+              f"maks bagian dalam {worst[1]}, rata-rata maks {worst[2]:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bank Gaussian bertingkat")
+    parser.add_argument("--levels", type=int, default=24, help="Jumlah level sigma pada sweep")
+    parser.add_argument("--max-sigma", type=float, default=16.0, help="Sigma terbesar pada sweep")
+    args = parser.parse_args()
+
+    images = preload_images(os.path.join(ROOT_DIR, "my_photo.jpg"))
+    name, image = max(images, key=lambda item: item[1].size)
+    sigmas = list(np.geomspace(1.0, args.max_sigma, args.levels))
+    bench_sigmas(name, image, sigmas)
+    noise = np.random.default_rng(0).integers(0, 256, (1024, 1024), dtype=np.uint8)
+    bench_sigmas("noise", noise, sigmas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_magnitude.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark normalisasi magnitude gradien: kode lama (temporary float64
+#        NumPy) dibandingkan kernel common/magnitude.py untuk setiap dtype.
+#        Mengukur waktu dan alokasi memori puncak (tracemalloc) per gambar.
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.image_source import preload_images
+from common.magnitude import MAGNITUDE_DTYPES, GradientMagnitude
+
+
+def legacy_sobel(sobel_x, sobel_y):
+    """
+    Normalisasi Sobel seperti versi awal modul filtering dan edge.
+    """
+    sobel_x_abs = np.absolute(sobel_x)
+    out_x = np.uint8(255 * sobel_x_abs / np.max(sobel_x_abs))
+    sobel_y_abs = np.absolute(sobel_y)
+    out_y = np.uint8(255 * sobel_y_abs / np.max(sobel_y_abs))
+    sobel_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
+    out_mag = np.uint8(255 * sobel_magnitude / np.max(sobel_magnitude))
+    out_edge = cv2.normalize(sobel_magnitude, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return out_x, out_y, out_mag, out_edge
+
+
+def kernel_sobel(kernel, sobel_x, sobel_y):
+    """
+    Normalisasi yang sama dengan legacy_sobel memakai GradientMagnitude.
+    """
+    return (kernel.abs_to_uint8(sobel_x),
+            kernel.abs_to_uint8(sobel_y),
+            kernel.magnitude_to_uint8(sobel_x, sobel_y),
+            kernel.magnitude_minmax_uint8(sobel_x, sobel_y))
+
+
+def measure(func, repeats):
+    """
+    Menjalankan func sekali untuk pemanasan (alokasi buffer), lalu mengukur
+    waktu median dan alokasi puncak pada pemanggilan berikutnya.
+    """
+    func()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), peak
+
+
+def run(images, repeats):
+    rows = []
+    for name, image in images:
+        grads = {}
+        for dtype, ddepth in MAGNITUDE_DTYPES.items():
+            grads[dtype] = (cv2.Sobel(image, ddepth, 1, 0, ksize=3),
+                            cv2.Sobel(image, ddepth, 0, 1, ksize=3))
+
+        reference = legacy_sobel(*grads["float64"])
+        seconds, peak = measure(lambda: legacy_sobel(*grads["float64"]), repeats)
+        rows.append((name, image.shape, "legacy float64", seconds, peak, True))
+
+        for dtype in MAGNITUDE_DTYPES:
+            kernel = GradientMagnitude(dtype)
+            result = kernel_sobel(kernel, *grads[dtype])
+            identical = all(np.array_equal(a, b) for a, b in zip(result, reference))
+            seconds, peak = measure(lambda: kernel_sobel(kernel, *grads[dtype]), repeats)
+            rows.append((name, image.shape, f"kernel {dtype}", seconds, peak, identical))
+    return rows
+
+
+def print_table(rows):
+    print(f"{'Gambar':<16} {'Ukuran':<14} {'Metode':<16} {'Waktu (ms)':>11} "
+          f"{'Alokasi (MB)':>13} {'Byte/piksel':>12} {'Identik':>8}")
+    print("-" * 96)
+    for name, shape, method, seconds, peak, identical in rows:
+        pixels = shape[0] * shape[1]
+        print(f"{name:<16} {f'{shape[1]}x{shape[0]}':<14} {method:<16} {seconds * 1000:>11.2f} "
+              f"{peak / 2**20:>13.2f} {peak / pixels:>12.1f} {'ya' if identical else 'TIDAK':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kernel magnitude gradien")
+    parser.add_argument("--repeats", type=int, default=5, help="Jumlah pengulangan per metode")
+    parser.add_argument("--large", type=int, default=4096,
+                        help="Sisi gambar sintetis besar (0 = tanpa gambar besar)")
+    args = parser.parse_args()
+
+    images = preload_images(os.path.join(ROOT_DIR, "my_photo.jpg"))
+    if args.large:
+        # Gambar besar dibuat dengan mengulang cameraman
+        camera = dict(images)["cameraman"]
+        reps = -(-args.large // camera.shape[0])
+        images.append(("large", np.tile(camera, (reps, reps))[:args.large, :args.large].copy()))
+
+    print_table(run(images, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
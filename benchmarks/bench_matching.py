@@ -0,0 +1,112 @@
+# benchmarks/bench_matching.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark matching descriptor SIFT: cv2.BFMatcher (knnMatch + ratio
+#        test, dan crossCheck) vs matching exact per blok (common/matching.py)
+#        dan index FLANN KD-tree, untuk korpus 1k, 10k, dan 100k descriptor.
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.matching import DEFAULT_RATIO, FlannIndex, match_descriptors
+
+
+def best_time(func, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def make_descriptors(train_size, query_size, inlier_fraction=0.7, seed=0):
+    """
+    Descriptor sintetis mirip SIFT (uint8 128 dimensi, dinormalisasi ke
+    norma ~512). Sebagian query adalah salinan descriptor train yang diberi
+    noise (punya pasangan), sisanya descriptor acak baru.
+    """
+    rng = np.random.default_rng(seed)
+
+    def random_descriptors(count):
+        values = np.abs(rng.normal(0, 1, (count, 128))) ** 2
+        values *= 512 / np.linalg.norm(values, axis=1, keepdims=True)
+        return np.clip(np.round(values), 0, 255).astype(np.uint8)
+
+    train = random_descriptors(train_size)
+    inliers = int(query_size * inlier_fraction)
+    source = rng.integers(0, train_size, inliers)
+    noisy = train[source].astype(np.float32) + rng.normal(0, 6, (inliers, 128))
+    query = np.concatenate([np.clip(np.round(noisy), 0, 255).astype(np.uint8),
+                            random_descriptors(query_size - inliers)])
+    return query, train
+
+
+def pairs(matches):
+    return set(zip(matches["query"].tolist(), matches["train"].tolist()))
+
+
+def bf_ratio(query, train, ratio):
+    knn = cv2.BFMatcher(cv2.NORM_L2).knnMatch(query, train, k=2)
+    return {(m.queryIdx, m.trainIdx) for m, n in (k for k in knn if len(k) == 2)
+            if m.distance < ratio * n.distance}
+
+
+def bf_cross_check(query, train):
+    return {(m.queryIdx, m.trainIdx) for m in cv2.BFMatcher(cv2.NORM_L2, crossCheck=True).match(query, train)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching descriptor")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Jumlah descriptor train (korpus)")
+    parser.add_argument("--queries", type=int, default=2000,
+                        help="Jumlah descriptor query (maksimum sama dengan ukuran korpus)")
+    parser.add_argument("--ratio", type=float, default=DEFAULT_RATIO, help="Ratio test Lowe")
+    parser.add_argument("--checks", type=int, default=64, help="Jumlah checks FLANN")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan (diambil tercepat)")
+    args = parser.parse_args()
+
+    print(f"{'Korpus':>7} {'Query':>6} {'Metode':<28} {'Waktu (ms)':>11} {'Query/s':>10} "
+          f"{'Match':>6} {'Sama dgn BF':>12}")
+    print("-" * 87)
+    for size in args.sizes:
+        query, train = make_descriptors(size, min(size, args.queries))
+        query_f, train_f = query.astype(np.float32), train.astype(np.float32)
+        ref_ratio, bf_time = best_time(lambda: bf_ratio(query_f, train_f, args.ratio), args.repeats)
+        ref_cross, bf_cross_time = best_time(lambda: bf_cross_check(query_f, train_f), args.repeats)
+        exact, exact_time = best_time(lambda: pairs(match_descriptors(query, train, args.ratio)), args.repeats)
+        exact_cross, exact_cross_time = best_time(
+            lambda: pairs(match_descriptors(query, train, None, cross_check=True)), args.repeats)
+        index, build_time = best_time(lambda: FlannIndex(train, checks=args.checks), args.repeats)
+        flann, flann_time = best_time(
+            lambda: pairs(match_descriptors(query, train, args.ratio, method="flann", index=index)), args.repeats)
+
+        rows = [
+            ("BFMatcher knn + ratio", bf_time, ref_ratio, "-"),
+            ("BFMatcher crossCheck", bf_cross_time, ref_cross, "-"),
+            ("exact blok + ratio", exact_time, exact, str(exact == ref_ratio)),
+            ("exact blok + cross-check", exact_cross_time, exact_cross, str(exact_cross == ref_cross)),
+            ("FLANN + ratio", flann_time, flann,
+             f"recall {len(flann & ref_ratio) / max(1, len(ref_ratio)):.3f}"),
+        ]
+        for name, seconds, matches, agreement in rows:
+            print(f"{size:>7} {len(query):>6} {name:<28} {seconds * 1000:>11.1f} {len(query) / seconds:>10.0f} "
+                  f"{len(matches):>6} {agreement:>12}")
+        print(f"{size:>7} {len(query):>6} bangun index FLANN: {build_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_median.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark median filter common/median.py dibandingkan cv2.medianBlur
+#        untuk berbagai ukuran kernel, pada gambar natural dan gambar sintetis
+#        mirip hasil scan dokumen. Versi uint16 (nilai x 257) diuji terhadap
+#        cv2.medianBlur uint8 x 257, karena cv2.medianBlur menolak uint16
+#        dengan kernel > 5 dan median komutatif dengan skala monoton. Untuk
+#        uint16 juga diukur versi 16-bit penuh (byte bawah diberi noise) dan
+#        fallback sederhana (np.median per jendela) pada potongan gambar,
+#        diekstrapolasi ke ukuran penuh.
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.image_source import preload_images
+from common.median import median_blur
+
+
+def scanned_document(shape, seed=0):
+    """
+    Gambar sintetis mirip scan dokumen: latar terang, baris teks gelap, dan
+    noise salt-and-pepper.
+    """
+    rng = np.random.default_rng(seed)
+    image = np.full(shape, 235, dtype=np.uint8)
+    for y in range(40, shape[0] - 40, 32):
+        for x in range(40, shape[1] - 40, 14):
+            if rng.random() < 0.8:
+                cv2.putText(image, chr(rng.integers(65, 91)), (x, y), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.5, 30, 1, cv2.LINE_AA)
+    noise = rng.random(shape)
+    image[noise < 0.02] = 0
+    image[noise > 0.98] = 255
+    return image
+
+
+# Sisi potongan untuk fallback np.median (terlalu lambat untuk gambar penuh)
+FALLBACK_CROP = 128
+
+
+def numpy_median(image, ksize, rows=16):
+    """
+    Fallback sederhana: np.median setiap jendela ksize x ksize (border
+    replicate), diproses per blok baris agar memori terbatas.
+    """
+    padded = np.pad(image, ksize // 2, mode="edge")
+    out = np.empty_like(image)
+    for y in range(0, image.shape[0], rows):
+        windows = sliding_window_view(padded[y:y + rows + ksize - 1], (ksize, ksize))
+        out[y:y + rows] = np.median(windows, axis=(2, 3))
+    return out
+
+
+def best_time(func, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark median filter")
+    parser.add_argument("--ksizes", type=int, nargs="+", default=[3, 5, 7, 15, 25, 51],
+                        help="Ukuran kernel yang diuji")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan (diambil tercepat)")
+    args = parser.parse_args()
+
+    images = preload_images(os.path.join(ROOT_DIR, "my_photo.jpg"))
+    name, natural = max(images, key=lambda item: item[1].size)
+    cases = [(name, natural), ("dokumen", scanned_document(natural.shape))]
+
+    print(f"{'Gambar':<16} {'Dtype':<7} {'Kernel':<8} {'cv2 uint8 (ms)':>15} {'median_blur (ms)':>17} "
+          f"{'Rasio':>7} {'Identik':>8} {'np.median (ms)*':>16}")
+    print("-" * 101)
+    rng = np.random.default_rng(0)
+    for case_name, image in cases:
+        scaled = image.astype(np.uint16) * np.uint16(257)
+        # 16-bit penuh: byte bawah diberi noise sehingga nilai unik > 256
+        dithered = scaled - rng.integers(0, 256, image.shape).astype(np.uint16) * (image > 0)
+        for dtype, source in (("uint8", image), ("uint16", scaled), ("uint16+", dithered)):
+            for ksize in args.ksizes:
+                reference, cv_time = best_time(lambda: cv2.medianBlur(image, ksize), args.repeats)
+                result, engine_time = best_time(lambda: median_blur(source, ksize), args.repeats)
+                fallback = "-"
+                if dtype == "uint8":
+                    identical = np.array_equal(result, reference)
+                elif dtype == "uint16":
+                    identical = np.array_equal(result, reference.astype(np.uint16) * np.uint16(257))
+                if dtype != "uint8":
+                    crop = source[:FALLBACK_CROP, :FALLBACK_CROP]
+                    crop_result, crop_time = best_time(lambda: numpy_median(crop, ksize), 1)
+                    fallback = f"{crop_time * source.size / crop.size * 1000:.0f}"
+                if dtype == "uint16+":
+                    identical = np.array_equal(median_blur(crop, ksize), crop_result)
+                print(f"{case_name:<16} {dtype:<7} {f'{ksize}x{ksize}':<8} {cv_time * 1000:>15.1f} "
+                      f"{engine_time * 1000:>17.1f} {engine_time / cv_time:>7.2f} "
+                      f"{'ya' if identical else 'TIDAK':>8} {fallback:>16}")
+    print(f"* diekstrapolasi dari potongan {FALLBACK_CROP}x{FALLBACK_CROP}")
+
+
+if __name__ == "__main__":
+    main()
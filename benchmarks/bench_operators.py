@@ -0,0 +1,324 @@
+# benchmarks/bench_operators.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark per operator yang dipakai keempat modul (GaussianBlur,
+#        medianBlur, Sobel + magnitude, Canny, cornerHarris, SIFT, FAST,
+#        warpPerspective, warpAffine, findChessboardCorners) pada gambar
+#        sintetis 256² sampai 8192², untuk setiap backend yang tersedia.
+#        Hasil (throughput MP/s, memori puncak, dan speedup terhadap backend
+#        opencv operator yang sama) disimpan sebagai JSON, dan mode compare
+#        menandai regresi di antara dua file hasil.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.canny import CannySweep
+from common.fast import MultiThresholdFAST
+from common.gaussian import GaussianBank
+from common.gradients import get_gradient_cache
+from common.harris import HarrisEngine
+from common.magnitude import MAGNITUDE_DTYPES, GradientMagnitude
+from common.median import median_blur
+from common.sweep import DEFAULT_SWEEP
+
+RESULTS_VERSION = 1
+
+DEFAULT_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "bench_operators.json")
+
+# Batas regresi bawaan: throughput turun atau memori naik lebih dari 10%
+DEFAULT_THRESHOLD = 0.10
+
+# Parameter sweep bawaan modul, agar benchmark mengukur kerja yang sama
+GAUSSIAN_KSIZES = DEFAULT_SWEEP["filtering"]["gaussian_ksizes"]
+MEDIAN_KSIZES = DEFAULT_SWEEP["filtering"]["median_ksizes"]
+CANNY_THRESHOLDS = [(low, high) for low, high, _ in DEFAULT_SWEEP["edge"]["canny_thresholds"]]
+HARRIS_PARAMS = [(block_size, ksize, k) for block_size, ksize, k, _ in DEFAULT_SWEEP["featurepoints"]["harris"]]
+FAST_THRESHOLDS = DEFAULT_SWEEP["featurepoints"]["fast_thresholds"]
+# Sweep sigma panjang, satu-satunya pemakaian GaussianBank (common/gaussian.py)
+GAUSSIAN_SIGMAS = [round(float(sigma), 2) for sigma in np.geomspace(1.0, 8.0, 12)]
+PATTERN_SIZE = (7, 7)
+
+
+def synthetic_image(size, seed=0):
+    """
+    Gambar grayscale sintetis bertekstur: noise frekuensi rendah yang
+    diperbesar, bentuk geometris (tepi dan sudut), dan noise halus.
+    """
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, (size // 16 + 1, size // 16 + 1), dtype=np.uint8)
+    image = cv2.resize(coarse, (size, size), interpolation=cv2.INTER_CUBIC)
+    for _ in range(max(8, size // 16)):
+        x, y = (int(v) for v in rng.integers(0, size, 2))
+        extent = int(rng.integers(size // 64 + 2, size // 8 + 4))
+        color = int(rng.integers(0, 256))
+        if rng.random() < 0.5:
+            cv2.rectangle(image, (x, y), (x + extent, y + extent), color, -1)
+        else:
+            cv2.circle(image, (x, y), extent // 2, color, -1)
+    return cv2.add(image, rng.integers(0, 12, (size, size), dtype=np.uint8))
+
+
+def synthetic_checkerboard(size):
+    """
+    Papan catur 8x8 kotak (7x7 corner internal) di tengah latar putih.
+    """
+    square = size // 10
+    board = np.kron((np.indices((8, 8)).sum(axis=0) % 2 == 0).astype(np.uint8) * 255,
+                    np.ones((square, square), dtype=np.uint8))
+    image = np.full((size, size), 255, dtype=np.uint8)
+    offset = (size - board.shape[0]) // 2
+    image[offset:offset + board.shape[0], offset:offset + board.shape[1]] = board
+    return image
+
+
+def perspective_matrix(size):
+    src = np.float32([[0, 0], [size - 1, 0], [0, size - 1], [size - 1, size - 1]])
+    dst = np.float32([[size * fx, size * fy] for fx, fy in DEFAULT_SWEEP["geometry"]["perspective_dst"]])
+    return cv2.getPerspectiveTransform(src, dst)
+
+
+def _magnitude(image, dtype):
+    kernel = GradientMagnitude(dtype)
+    dx = cv2.Sobel(image, kernel.ddepth, 1, 0, ksize=3)
+    dy = cv2.Sobel(image, kernel.ddepth, 0, 1, ksize=3)
+    return kernel.magnitude_minmax_uint8(dx, dy)
+
+
+def _harris_engine(image):
+    # Cache gradien dikosongkan agar setiap pengulangan menghitung dari awal
+    get_gradient_cache().clear()
+    return HarrisEngine(image).sweep(HARRIS_PARAMS)
+
+
+def _canny_sweep(image):
+    gradients = (cv2.Sobel(image, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE),
+                 cv2.Sobel(image, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE))
+    return CannySweep(image, gradients).sweep(CANNY_THRESHOLDS)
+
+
+def _sift(image):
+    return cv2.SIFT_create().detectAndCompute(image, None)
+
+
+def _fast_opencv(image):
+    return [cv2.FastFeatureDetector_create(threshold=t).detect(image, None) for t in FAST_THRESHOLDS]
+
+
+def _fast_multi(image):
+    engine = MultiThresholdFAST(image, min(FAST_THRESHOLDS))
+    return [engine.detect(t) for t in FAST_THRESHOLDS]
+
+
+def operators():
+    """
+    Daftar (operator, backend, parameter, fungsi, ukuran maksimum, input).
+    Fungsi menerima gambar input; ukuran maksimum None berarti tanpa batas.
+    """
+    ops = [
+        ("GaussianBlur", "opencv", f"ksize={GAUSSIAN_KSIZES}",
+         lambda img: [cv2.GaussianBlur(img, (k, k), 0) for k in GAUSSIAN_KSIZES], None, "texture"),
+        ("GaussianBlur sigma", "opencv", f"sigma={GAUSSIAN_SIGMAS}",
+         lambda img: [cv2.GaussianBlur(img, (0, 0), s) for s in GAUSSIAN_SIGMAS], 4096, "texture"),
+        ("GaussianBlur sigma", "cascade", f"sigma={GAUSSIAN_SIGMAS}",
+         lambda img: GaussianBank(img).blur_sigmas(GAUSSIAN_SIGMAS), 4096, "texture"),
+        ("medianBlur", "opencv", f"ksize={MEDIAN_KSIZES}",
+         lambda img: [cv2.medianBlur(img, k) for k in MEDIAN_KSIZES], None, "texture"),
+        ("medianBlur", "histogram", f"ksize={MEDIAN_KSIZES}",
+         lambda img: [median_blur(img, k) for k in MEDIAN_KSIZES], 4096, "texture"),
+    ]
+    for dtype in MAGNITUDE_DTYPES:
+        ops.append(("Sobel+magnitude", dtype, "ksize=3, minmax",
+                    lambda img, dtype=dtype: _magnitude(img, dtype), None, "texture"))
+    ops += [
+        ("Canny", "opencv", f"thresholds={CANNY_THRESHOLDS}",
+         lambda img: [cv2.Canny(img, low, high) for low, high in CANNY_THRESHOLDS], None, "texture"),
+        ("Canny", "sweep", f"thresholds={CANNY_THRESHOLDS}", _canny_sweep, None, "texture"),
+        ("cornerHarris", "opencv", f"params={HARRIS_PARAMS}",
+         lambda img: [cv2.cornerHarris(np.float32(img), b, k, kk) for b, k, kk in HARRIS_PARAMS],
+         None, "texture"),
+        ("cornerHarris", "engine", f"params={HARRIS_PARAMS}", _harris_engine, None, "texture"),
+        ("SIFT", "opencv", "default", _sift, 4096, "texture"),
+        ("FAST", "opencv", f"thresholds={list(FAST_THRESHOLDS)}", _fast_opencv, None, "texture"),
+        ("FAST", "multi", f"thresholds={list(FAST_THRESHOLDS)}", _fast_multi, None, "texture"),
+        ("warpPerspective", "opencv", "linear",
+         lambda img: cv2.warpPerspective(img, perspective_matrix(img.shape[0]), img.shape[::-1]),
+         None, "texture"),
+        ("warpAffine", "opencv", "rotation 30",
+         lambda img: cv2.warpAffine(img, cv2.getRotationMatrix2D((img.shape[1] // 2, img.shape[0] // 2),
+                                                                 30, 1.0), img.shape[::-1]),
+         None, "texture"),
+        ("findChessboardCorners", "opencv", f"pattern={PATTERN_SIZE}",
+         lambda img: cv2.findChessboardCorners(img, PATTERN_SIZE, None), None, "checkerboard"),
+    ]
+    return ops
+
+
+def measure(func, image, repeats):
+    """
+    Satu pemanggilan dengan tracemalloc untuk memori puncak (alokasi
+    NumPy/Python, termasuk array output OpenCV), lalu waktu tercepat dari
+    beberapa pemanggilan tanpa tracing.
+    """
+    tracemalloc.start()
+    func(image)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(image)
+        best = min(best, time.perf_counter() - start)
+    return best, peak
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "opencv_threads": cv2.getNumThreads(),
+    }
+
+
+def run(sizes, repeats, selected, no_limit):
+    """
+    Menjalankan semua operator untuk setiap ukuran. Backend selain opencv
+    diberi speedup = waktu backend opencv / waktu backend (operator dan
+    ukuran sama); nilai < 1 berarti lebih lambat dari OpenCV.
+    """
+    results = []
+    print(f"{'Operator':<22} {'Backend':<10} {'Ukuran':>7} {'Waktu (ms)':>11} {'MP/s':>9} {'Memori (MB)':>12} "
+          f"{'vs opencv':>10}")
+    print("-" * 87)
+    for size in sizes:
+        inputs = {"texture": synthetic_image(size), "checkerboard": synthetic_checkerboard(size)}
+        megapixels = size * size / 1e6
+        opencv_seconds = {}
+        for name, backend, params, func, max_size, input_name in operators():
+            if selected and name not in selected:
+                continue
+            entry = {"operator": name, "backend": backend, "params": params, "size": size,
+                     "megapixels": megapixels}
+            if max_size is not None and size > max_size and not no_limit:
+                entry["skipped"] = f"ukuran > {max_size} (gunakan --no-limit)"
+                print(f"{name:<22} {backend:<10} {size:>7} {'dilewati':>11}")
+            else:
+                seconds, peak = measure(func, inputs[input_name], repeats)
+                entry.update({"seconds": seconds, "mp_per_s": megapixels / seconds,
+                              "peak_mb": peak / 2**20})
+                if backend == "opencv":
+                    opencv_seconds[name] = seconds
+                    speedup = "-"
+                elif name in opencv_seconds:
+                    entry["speedup_vs_opencv"] = opencv_seconds[name] / seconds
+                    speedup = f"{entry['speedup_vs_opencv']:.2f}x"
+                else:
+                    speedup = "-"
+                print(f"{name:<22} {backend:<10} {size:>7} {seconds * 1000:>11.1f} "
+                      f"{entry['mp_per_s']:>9.1f} {entry['peak_mb']:>12.1f} {speedup:>10}")
+            results.append(entry)
+
+    slower = [e for e in results if e.get("speedup_vs_opencv", 1.0) < 1.0]
+    if slower:
+        print(f"\nBackend lebih lambat dari OpenCV ({len(slower)}):")
+        for entry in slower:
+            print(f"  {entry['operator']:<22} {entry['backend']:<10} {entry['size']:>7} "
+                  f"{entry['speedup_vs_opencv']:.2f}x")
+    return results
+
+
+def _result_key(entry):
+    return (entry["operator"], entry["backend"], entry["params"], entry["size"])
+
+
+def compare(old_path, new_path, threshold):
+    """
+    Membandingkan dua file hasil. Regresi: throughput turun atau memori
+    puncak naik lebih dari threshold (relatif). Mengembalikan jumlah regresi.
+    """
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {_result_key(e): e for e in json.load(f)["results"] if "seconds" in e}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {_result_key(e): e for e in json.load(f)["results"] if "seconds" in e}
+
+    regressions = 0
+    print(f"{'Operator':<22} {'Backend':<10} {'Ukuran':>7} {'MP/s lama':>10} {'MP/s baru':>10} "
+          f"{'Waktu':>8} {'Memori':>8}  Status")
+    print("-" * 90)
+    for key in sorted(set(old) & set(new), key=lambda k: (k[0], k[1], k[3])):
+        before, after = old[key], new[key]
+        speed_change = after["mp_per_s"] / before["mp_per_s"] - 1
+        memory_change = (after["peak_mb"] / before["peak_mb"] - 1) if before["peak_mb"] > 0 else 0.0
+        slower = speed_change < -threshold
+        bigger = memory_change > threshold
+        if slower or bigger:
+            regressions += 1
+            status = "REGRESI " + ", ".join(label for label, flag in
+                                            (("waktu", slower), ("memori", bigger)) if flag)
+        elif speed_change > threshold:
+            status = "lebih cepat"
+        else:
+            status = "ok"
+        print(f"{key[0]:<22} {key[1]:<10} {key[3]:>7} {before['mp_per_s']:>10.1f} "
+              f"{after['mp_per_s']:>10.1f} {speed_change:>+8.0%} {memory_change:>+8.0%}  {status}")
+
+    missing = sorted(set(old) - set(new))
+    if missing:
+        print(f"\n{len(missing)} hasil lama tidak ada di file baru")
+    print(f"\nTotal regresi (threshold {threshold:.0%}): {regressions}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per operator untuk berbagai ukuran dan backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Sisi gambar sintetis (default 256 512 1024 2048 4096 8192)")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan (diambil tercepat)")
+    parser.add_argument("--operators", nargs="+", default=None,
+                        help="Hanya operator tertentu (misalnya Canny SIFT)")
+    parser.add_argument("--no-limit", action="store_true",
+                        help="Jalankan juga operator lambat (SIFT, median histogram) di atas 4096²")
+    parser.add_argument("--output", type=str, default=DEFAULT_OUTPUT, help="File JSON hasil")
+    parser.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"), default=None,
+                        help="Bandingkan dua file hasil dan tandai regresi")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Batas regresi relatif untuk --compare (default 0.10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    results = run(args.sizes, args.repeats, args.operators, args.no_limit)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": RESULTS_VERSION,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "environment": environment(),
+            "repeats": args.repeats,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nHasil disimpan di: '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_warp.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Benchmark transformasi geometri untuk banyak frame berukuran sama:
+#        cv2.warpPerspective/warpAffine per frame vs cv2.remap dengan peta
+#        dari cache (common/warp.py, float32 dan fixed-point), per frame dan
+#        batch.
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Tambahkan root proyek ke sys.path agar paket common dapat diimpor
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.sweep import DEFAULT_SWEEP
+from common.warp import MAP_TYPES, WarpMaps, get_warp_cache, warp, warp_batch
+
+
+def best_time(func, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def make_frames(count, rows, cols, seed=0):
+    """
+    Frame grayscale sintetis (noise halus yang diperbesar) berukuran sama.
+    """
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, (count, rows // 8 + 1, cols // 8 + 1), dtype=np.uint8)
+    return [cv2.resize(c, (cols, rows), interpolation=cv2.INTER_CUBIC) for c in coarse]
+
+
+def transforms(rows, cols):
+    src = np.float32([[0, 0], [cols - 1, 0], [0, rows - 1], [cols - 1, rows - 1]])
+    dst = np.float32([[cols * fx, rows * fy] for fx, fy in DEFAULT_SWEEP["geometry"]["perspective_dst"]])
+    return [("perspektif", cv2.getPerspectiveTransform(src, dst)),
+            ("rotasi 30", cv2.getRotationMatrix2D((cols // 2, rows // 2), 30, 1.0))]
+
+
+def opencv_warp(image, matrix):
+    rows, cols = image.shape[:2]
+    if matrix.shape == (2, 3):
+        return cv2.warpAffine(image, matrix, (cols, rows))
+    return cv2.warpPerspective(image, matrix, (cols, rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache peta warp")
+    parser.add_argument("--frames", type=int, default=32, help="Jumlah frame berukuran sama")
+    parser.add_argument("--size", type=int, nargs=2, default=[960, 1280], metavar=("ROWS", "COLS"),
+                        help="Ukuran frame (default 960 1280)")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan (diambil tercepat)")
+    args = parser.parse_args()
+
+    rows, cols = args.size
+    frames = make_frames(args.frames, rows, cols)
+    frames_bgr = [cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) for frame in frames]
+    print(f"{args.frames} frame {cols}x{rows}")
+    print(f"{'Transformasi':<12} {'Metode':<26} {'Waktu (ms)':>11} {'ms/frame':>9} {'Selisih maks':>13} "
+          f"{'Piksel beda':>12}")
+    print("-" * 88)
+
+    for name, matrix in transforms(rows, cols):
+        reference, ref_time = best_time(lambda: [opencv_warp(f, matrix) for f in frames_bgr], args.repeats)
+        _, build_time = best_time(lambda: WarpMaps(matrix, (rows, cols)), args.repeats)
+        get_warp_cache().clear()
+
+        methods = [
+            ("warp BGR per frame", ref_time, reference),
+        ]
+        gray_first, gray_time = best_time(
+            lambda: [cv2.cvtColor(opencv_warp(f, matrix), cv2.COLOR_GRAY2BGR) for f in frames], args.repeats)
+        methods.append(("warp gray lalu BGR", gray_time, gray_first))
+        batch_equal = True
+        for map_type in MAP_TYPES:
+            warp(frames[0], matrix, map_type)
+            single, single_time = best_time(
+                lambda: [cv2.cvtColor(warp(f, matrix, map_type), cv2.COLOR_GRAY2BGR) for f in frames],
+                args.repeats)
+            methods.append((f"remap {map_type} per frame", single_time, single))
+            batch, batch_time = best_time(
+                lambda: [cv2.cvtColor(w, cv2.COLOR_GRAY2BGR) for w in warp_batch(frames, matrix, map_type)],
+                args.repeats)
+            methods.append((f"remap {map_type} batch", batch_time, batch))
+            batch_equal &= all(np.array_equal(a, b) for a, b in zip(single, batch))
+
+        for method, seconds, outputs in methods:
+            diffs = [np.abs(o.astype(np.int16) - r.astype(np.int16)) for o, r in zip(outputs, reference)]
+            changed = sum(np.count_nonzero(d) for d in diffs) / sum(d.size for d in diffs)
+            print(f"{name:<12} {method:<26} {seconds * 1000:>11.1f} {seconds * 1000 / args.frames:>9.2f} "
+                  f"{max(int(d.max()) for d in diffs):>13} {changed * 100:>11.2f}%")
+        print(f"{name:<12} bangun peta sekali: {build_time * 1000:.1f} ms, "
+              f"batch identik dengan per frame: {batch_equal}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# common/__init__.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Paket utilitas bersama yang dipakai oleh keempat modul Computer Vision.
@@ -0,0 +1,185 @@
+# common/calibration.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Kalibrasi kamera multi-view dari folder gambar papan catur. Corner
+#        dideteksi paralel per view dengan CALIB_CB_FAST_CHECK pada salinan
+#        yang diperkecil (coarse), lalu diperhalus dengan cornerSubPix pada
+#        resolusi penuh (fine), dan semua view dipakai cv2.calibrateCamera.
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from common.parallel import init_worker, opencv_threads_per_worker, resolve_workers
+from common.trace import flush_trace, span
+
+VIEW_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# Sisi terpanjang salinan coarse untuk deteksi awal
+DEFAULT_DETECT_SIDE = 640
+
+DETECT_FLAGS = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK
+SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+
+def find_views(directory):
+    """
+    Daftar path gambar view di folder (tidak rekursif), urut nama.
+    """
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if os.path.splitext(name)[1].lower() in VIEW_EXTENSIONS)
+
+
+def detect_view(path, pattern_size, detect_side=DEFAULT_DETECT_SIDE):
+    """
+    Mendeteksi corner papan catur pada satu view.
+
+    Deteksi dijalankan pada salinan yang diperkecil sampai sisi terpanjang
+    detect_side (dengan FAST_CHECK, view tanpa papan catur cepat ditolak).
+    Posisi corner lalu diskalakan ke resolusi penuh dan diperhalus dengan
+    cornerSubPix; jendela pencarian diperbesar sebanding skala agar
+    kesalahan posisi coarse (sekitar setengah piksel coarse) masih tercakup.
+    Jika deteksi coarse gagal (misalnya papan catur terlalu kecil), deteksi
+    diulang sekali pada salinan 2 * detect_side, bukan resolusi penuh:
+    findChessboardCorners pada view besar yang sulit bisa memakan beberapa
+    detik per view.
+
+    Mengembalikan (ukuran gambar (w, h), corner float32 Nx1x2 atau None,
+    skala yang dipakai).
+    """
+    gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None, None, 1.0
+    rows, cols = gray.shape
+
+    found, corners, scale = False, None, 1.0
+    for side in (detect_side, 2 * detect_side):
+        scale = max(1.0, max(rows, cols) / side)
+        with span("detect_coarse" if scale > 1 else "detect_full", category="calibration",
+                  view=os.path.basename(path), side=side):
+            if scale > 1:
+                small = cv2.resize(gray, (round(cols / scale), round(rows / scale)), interpolation=cv2.INTER_AREA)
+            else:
+                small = gray
+            found, corners = cv2.findChessboardCorners(small, pattern_size, None, DETECT_FLAGS)
+        if found or scale == 1:
+            break
+    if not found:
+        return (cols, rows), None, scale
+    if scale > 1:
+        # Pusat piksel coarse (i + 0.5) * skala sebenarnya - 0.5 di resolusi penuh
+        scale_xy = np.float32([cols / small.shape[1], rows / small.shape[0]])
+        corners = (corners + 0.5) * scale_xy - 0.5
+
+    half_window = max(5, math.ceil(2 * scale))
+    with span("corner_subpix", category="calibration", view=os.path.basename(path)):
+        corners = cv2.cornerSubPix(gray, corners.astype(np.float32), (half_window, half_window), (-1, -1),
+                                   SUBPIX_CRITERIA)
+    # cornerSubPix di OpenCV 5 mengembalikan Nx2; samakan dengan format findChessboardCorners
+    return (cols, rows), corners.reshape(-1, 1, 2), scale
+
+
+def _detect_task(path, pattern_size, detect_side):
+    try:
+        return detect_view(path, pattern_size, detect_side)
+    finally:
+        flush_trace()
+
+
+def detect_views(paths, pattern_size, detect_side=DEFAULT_DETECT_SIDE, workers=1):
+    """
+    detect_view untuk semua path, berurutan atau paralel. Yang dikirim ke
+    worker hanya path, jadi setiap view didekode di worker itu sendiri.
+    Hasil dalam urutan yang sama dengan paths.
+    """
+    workers = min(resolve_workers(workers), max(1, len(paths)))
+    if workers == 1:
+        return [detect_view(path, pattern_size, detect_side) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(opencv_threads_per_worker(workers),)) as executor:
+        return list(executor.map(_detect_task, paths, [pattern_size] * len(paths),
+                                 [detect_side] * len(paths), chunksize=max(1, len(paths) // (4 * workers))))
+
+
+def object_points(pattern_size, square_size=1.0):
+    """
+    Koordinat 3D corner papan catur di bidang z = 0 (satuan square_size).
+    """
+    points = np.zeros((pattern_size[0] * pattern_size[1], 3), np.float32)
+    points[:, :2] = np.mgrid[0:pattern_size[0], 0:pattern_size[1]].T.reshape(-1, 2) * square_size
+    return points
+
+
+class CalibrationResult:
+    """
+    Hasil kalibrasi: RMS reprojection error, matriks kamera, koefisien
+    distorsi, pose setiap view yang dipakai, dan error per view.
+    """
+
+    def __init__(self, rms, camera_matrix, dist_coeffs, image_size, views, rvecs, tvecs, view_errors):
+        self.rms = rms
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.image_size = image_size
+        self.views = views
+        self.rvecs = rvecs
+        self.tvecs = tvecs
+        self.view_errors = view_errors
+
+
+def calibrate(corners_list, pattern_size, image_size, square_size=1.0, views=None, flags=0):
+    """
+    cv2.calibrateCamera dari corner beberapa view (semua berukuran
+    image_size). Error per view adalah RMS jarak reprojection corner.
+    """
+    if len(corners_list) < 3:
+        raise ValueError(f"Kalibrasi membutuhkan minimal 3 view dengan papan catur, hanya ada {len(corners_list)}")
+    obj = object_points(pattern_size, square_size)
+    obj_list = [obj] * len(corners_list)
+    with span("calibrate_camera", category="calibration", views=len(corners_list)):
+        rms, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(
+            obj_list, corners_list, image_size, None, None, flags=flags)
+
+    view_errors = []
+    for corners, rvec, tvec in zip(corners_list, rvecs, tvecs):
+        projected, _ = cv2.projectPoints(obj, rvec, tvec, camera_matrix, dist_coeffs)
+        # Keduanya dibentuk Nx2 agar selisihnya per corner, bukan broadcast NxN
+        residuals = projected.reshape(-1, 2) - np.asarray(corners).reshape(-1, 2)
+        view_errors.append(float(np.sqrt(np.mean(np.sum(residuals ** 2, axis=1)))))
+    return CalibrationResult(rms, camera_matrix, dist_coeffs, image_size, list(views or []), rvecs, tvecs,
+                             view_errors)
+
+
+def calibrate_directory(directory, pattern_size, square_size=1.0, detect_side=DEFAULT_DETECT_SIDE, workers=1):
+    """
+    Deteksi paralel lalu kalibrasi untuk semua view di folder. View yang
+    ukurannya berbeda dari view pertama yang terdeteksi dilewati.
+
+    Mengembalikan (CalibrationResult, daftar (path, ditemukan, skala, alasan)).
+    """
+    paths = find_views(directory)
+    if not paths:
+        raise ValueError(f"Tidak ada gambar view di folder '{directory}'")
+
+    detections = detect_views(paths, pattern_size, detect_side, workers)
+    image_size = None
+    used_paths, corners_list, report = [], [], []
+    for path, (size, corners, scale) in zip(paths, detections):
+        if size is None:
+            report.append((path, False, scale, "gagal didekode"))
+        elif corners is None:
+            report.append((path, False, scale, "papan catur tidak ditemukan"))
+        elif image_size is not None and size != image_size:
+            report.append((path, False, scale, f"ukuran {size} berbeda dari {image_size}"))
+        else:
+            image_size = size
+            used_paths.append(path)
+            corners_list.append(corners)
+            report.append((path, True, scale, ""))
+
+    result = calibrate(corners_list, pattern_size, image_size, square_size, used_paths)
+    return result, report
@@ -0,0 +1,129 @@
+# common/canny.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Sweep Canny multi-threshold. Gradien dan non-maximum suppression (NMS)
+#        dihitung sekali per gambar, lalu hanya tahap hysteresis yang diulang
+#        untuk setiap pasangan threshold. Hasilnya identik bit per bit dengan
+#        cv2.Canny(image, low, high) (aperture 3, L1 gradient).
+
+import math
+
+import cv2
+import numpy as np
+
+from common.gradients import get_gradients
+
+# Konstanta fixed-point yang sama dengan implementasi Canny di OpenCV
+CANNY_SHIFT = 15
+TG22 = int(0.4142135623730950488016887242097 * (1 << CANNY_SHIFT) + 0.5)
+
+
+class CannySweep:
+    """
+    Menyimpan magnitude gradien dan hasil NMS sebuah gambar sehingga
+    edge map untuk banyak pasangan threshold bisa dihitung dengan murah.
+    """
+
+    def __init__(self, image, gradients=None):
+        """
+        gradients: pasangan (dx, dy) CV_16S opsional. Jika None, gradien
+        diambil dari cache bersama (Sobel 3x3, BORDER_REPLICATE seperti Canny).
+        """
+        if gradients is None:
+            if image.dtype != np.uint8:
+                image = image.astype(np.uint8)
+            gradients = get_gradients(image, 3, cv2.CV_16S, cv2.BORDER_REPLICATE)
+        dx, dy = gradients
+        self.shape = dx.shape[:2]
+
+        dx = dx.astype(np.int32)
+        dy = dy.astype(np.int32)
+        ax = np.abs(dx)
+        ay = np.abs(dy)
+
+        # Magnitude L1, diberi padding 0 di luar gambar seperti di OpenCV
+        self.magnitude = ax + ay
+        mag = np.pad(self.magnitude, 1)
+        m = mag[1:-1, 1:-1]
+
+        # Klasifikasi arah gradien dengan aritmetika fixed-point
+        tg22x = ax * TG22
+        y = ay << CANNY_SHIFT
+        horizontal = y < tg22x
+        vertical = ~horizontal & (y > tg22x + (ax << (CANNY_SHIFT + 1)))
+        diagonal = ~horizontal & ~vertical
+        # s = -1 jika tanda dx dan dy berbeda, selain itu +1
+        anti = (dx ^ dy) < 0
+
+        nms = np.zeros(self.shape, dtype=bool)
+        nms |= horizontal & (m > mag[1:-1, :-2]) & (m >= mag[1:-1, 2:])
+        nms |= vertical & (m > mag[:-2, 1:-1]) & (m >= mag[2:, 1:-1])
+        # s = +1: bandingkan (y-1, x-1) dan (y+1, x+1); s = -1: (y-1, x+1) dan (y+1, x-1)
+        diag_main = (m > mag[:-2, :-2]) & (m > mag[2:, 2:])
+        diag_anti = (m > mag[:-2, 2:]) & (m > mag[2:, :-2])
+        nms |= diagonal & np.where(anti, diag_anti, diag_main)
+        self.nms = nms
+
+    @staticmethod
+    def _normalize_thresholds(low_threshold, high_threshold):
+        if low_threshold > high_threshold:
+            low_threshold, high_threshold = high_threshold, low_threshold
+        return math.floor(low_threshold), math.floor(high_threshold)
+
+    def masks(self, low_threshold, high_threshold):
+        """
+        Mask kandidat (lolos NMS dan magnitude > low) dan mask piksel kuat
+        (kandidat dengan magnitude > high) sebelum hysteresis.
+        """
+        low, high = self._normalize_thresholds(low_threshold, high_threshold)
+        candidates = self.nms & (self.magnitude > low)
+        return candidates, candidates & (self.magnitude > high)
+
+    def _hysteresis(self, low, highs):
+        """
+        Hysteresis untuk satu threshold low dan beberapa threshold high.
+        Kandidat (lolos NMS dan magnitude > low) diberi label komponen
+        8-connected sekali saja; sebuah komponen menjadi tepi jika memuat
+        piksel dengan magnitude > high. Untuk setiap high cukup satu lookup
+        table per label.
+        """
+        candidates = self.nms & (self.magnitude > low)
+        num_labels, labels = cv2.connectedComponents(candidates.view(np.uint8), connectivity=8)
+
+        # Magnitude maksimum per komponen, cukup dihitung dari piksel di atas high terkecil
+        seeds = candidates & (self.magnitude > min(highs))
+        component_max = np.zeros(num_labels, dtype=np.int32)
+        np.maximum.at(component_max, labels[seeds], self.magnitude[seeds])
+        component_max[0] = 0
+
+        results = []
+        for high in highs:
+            lut = np.where(component_max > high, 255, 0).astype(np.uint8)
+            lut[0] = 0
+            results.append(lut[labels])
+        return results
+
+    def edges(self, low_threshold, high_threshold):
+        """
+        Edge map uint8 (0/255) untuk satu pasangan threshold.
+        """
+        return self.sweep([(low_threshold, high_threshold)])[0]
+
+    def sweep(self, thresholds):
+        """
+        Menghitung edge map untuk daftar pasangan (low, high).
+        Pasangan dengan threshold low yang sama berbagi satu pelabelan
+        komponen. Mengembalikan list dengan urutan yang sama dengan input.
+        """
+        normalized = [self._normalize_thresholds(low, high) for low, high in thresholds]
+        by_low = {}
+        for index, (low, high) in enumerate(normalized):
+            by_low.setdefault(low, []).append((index, high))
+
+        results = [None] * len(normalized)
+        for low, entries in by_low.items():
+            edge_maps = self._hysteresis(low, [high for _, high in entries])
+            for (index, _), edge_map in zip(entries, edge_maps):
+                results[index] = edge_map
+        return results
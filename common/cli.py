@@ -0,0 +1,77 @@
+# common/cli.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Argumen command line bersama untuk semua modul.
+
+import argparse
+
+from common.image_source import load_rasters, set_disk_cache_dir
+from common.run_cache import set_run_cache_enabled
+from common.sweep import set_sweep_config
+from common.trace import set_trace_output
+
+
+def build_parser(description):
+    """
+    Membuat ArgumentParser dengan opsi yang dikenali oleh setiap modul.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses paralel per gambar (0 = semua core, default 1)")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Direktori cache .npy untuk gambar yang sudah didekode (opsional)")
+    parser.add_argument("--no-run-cache", action="store_true",
+                        help="Proses ulang semua gambar walaupun input dan parameternya tidak berubah")
+    parser.add_argument("--sweep", type=str, default=None, metavar="PATH",
+                        help="File sweep parameter (.json, atau .yaml jika PyYAML terpasang)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="Mode statistik: lewati overlay dan penulisan PNG, simpan statistik dan array ringkas")
+    parser.add_argument("--trace", type=str, default=None, metavar="PATH",
+                        help="Catat waktu dan CPU per stage ke file Chrome trace (.json)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Bersama --trace: ukur juga memori per stage (tracemalloc, memperlambat waktu)")
+    return parser
+
+
+def apply_common_args(args):
+    """
+    Menerapkan opsi global (yang tidak diteruskan lewat parameter main())
+    dari hasil parse_args().
+    """
+    set_disk_cache_dir(args.cache_dir)
+    set_run_cache_enabled(not args.no_run_cache)
+    set_sweep_config(args.sweep)
+    set_trace_output(args.trace, memory=args.trace_memory)
+
+
+def _parse_shape(value):
+    try:
+        return tuple(int(v) for v in value.lower().replace("x", ",").split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shape tidak valid: '{value}' (contoh: 20000,30000)")
+
+
+def add_raster_arguments(parser):
+    """
+    Menambahkan opsi input raster besar (.npy, .raw/.bin, atau format gambar
+    biasa) yang menggantikan gambar standar.
+    """
+    parser.add_argument("--input", nargs="+", default=None, metavar="PATH",
+                        help="Raster input (.npy, .raw/.bin, atau gambar) sebagai pengganti gambar standar")
+    parser.add_argument("--raw-shape", type=_parse_shape, default=None, metavar="H,W",
+                        help="Ukuran raster raw dalam format tinggi,lebar")
+    parser.add_argument("--raw-dtype", type=str, default="uint8",
+                        help="Tipe piksel raster raw (default uint8). Output Gaussian, median, "
+                             "dan warp memakai dtype yang sama")
+    return parser
+
+
+def load_input_rasters(args):
+    """
+    Membuka raster dari opsi --input sebagai daftar (nama, gambar), atau
+    None jika opsi tersebut tidak dipakai.
+    """
+    if not args.input:
+        return None
+    return load_rasters(args.input, args.raw_shape, args.raw_dtype)
@@ -0,0 +1,115 @@
+# common/compact.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Penyimpanan hasil ringkas untuk mode statistik (--no-render). Peta
+#        biner (Canny, mask corner Harris) disimpan bit-packed dan keypoint
+#        sebagai array terstruktur dalam satu file .npz per gambar, sehingga
+#        overlay dan PNG bisa dibuat belakangan tanpa menjalankan detektor
+#        lagi.
+
+import os
+
+import cv2
+import numpy as np
+
+from common.writer import record_output
+
+# Atribut cv2.KeyPoint lengkap (SIFT memakai size, angle, dan octave)
+KEYPOINT_RECORD_DTYPE = np.dtype([("x", np.float32), ("y", np.float32), ("size", np.float32),
+                                  ("angle", np.float32), ("response", np.float32),
+                                  ("octave", np.int32), ("class_id", np.int32)])
+
+
+def keypoints_to_records(keypoints):
+    """
+    Mengubah list cv2.KeyPoint menjadi array KEYPOINT_RECORD_DTYPE.
+    """
+    records = np.empty(len(keypoints), dtype=KEYPOINT_RECORD_DTYPE)
+    for i, kp in enumerate(keypoints):
+        records[i] = (kp.pt[0], kp.pt[1], kp.size, kp.angle, kp.response, kp.octave, kp.class_id)
+    return records
+
+
+def records_to_keypoints(records):
+    """
+    Kebalikan keypoints_to_records. Nilai float32 disimpan apa adanya,
+    sehingga keypoint yang digambar ulang identik dengan aslinya.
+    """
+    return [cv2.KeyPoint(float(r["x"]), float(r["y"]), float(r["size"]), float(r["angle"]),
+                         float(r["response"]), int(r["octave"]), int(r["class_id"]))
+            for r in records]
+
+
+def skip_write(path, image, params=None):
+    """
+    Pengganti cv2.imwrite pada mode --no-render untuk output yang hanya
+    berupa gambar: tidak menulis apa pun.
+    """
+    return True
+
+
+class CompactStore:
+    """
+    Kumpulan array ringkas satu gambar, dengan kunci nama file PNG yang
+    akan dihasilkan jika overlay di-render. Disimpan sebagai .npz tanpa
+    kompresi (bit-packing sudah mengecilkan peta biner 8x).
+    """
+
+    def __init__(self, arrays=None):
+        self.arrays = dict(arrays or {})
+
+    def add_mask(self, key, mask):
+        """
+        Menyimpan peta biner (array bool, atau uint8 0/255) secara bit-packed.
+        """
+        mask = np.asarray(mask)
+        self.arrays[f"mask:{key}"] = np.packbits(mask != 0)
+        self.arrays[f"shape:{key}"] = np.array(mask.shape, dtype=np.int64)
+
+    def add_points(self, key, points):
+        """
+        Menyimpan keypoint: list cv2.KeyPoint atau array terstruktur (misalnya
+        common.fast.KEYPOINT_DTYPE).
+        """
+        if not isinstance(points, np.ndarray):
+            points = keypoints_to_records(points)
+        self.arrays[f"points:{key}"] = points
+
+    def write(self, path, image, params=None):
+        """
+        Pengganti writer.write untuk modul yang outputnya peta tepi: peta
+        biner uint8 (hanya 0 dan 255) disimpan bit-packed dengan kunci nama
+        filenya, gambar lain (magnitude, fusion mean) diabaikan.
+        """
+        if image.dtype == np.uint8 and image.ndim == 2 and not np.any((image != 0) & (image != 255)):
+            self.add_mask(os.path.basename(path), image)
+        return True
+
+    def keys(self, kind):
+        prefix = f"{kind}:"
+        return [name[len(prefix):] for name in self.arrays if name.startswith(prefix)]
+
+    def mask(self, key):
+        """
+        Peta biner sebagai uint8 0/255, sama dengan gambar yang akan ditulis.
+        """
+        shape = tuple(self.arrays[f"shape:{key}"])
+        bits = np.unpackbits(self.arrays[f"mask:{key}"], count=int(np.prod(shape)))
+        return (bits.reshape(shape) * 255).astype(np.uint8)
+
+    def points(self, key):
+        return self.arrays[f"points:{key}"]
+
+    def save(self, path):
+        # Tulis ke file sementara dulu agar pembaca tidak melihat file setengah jadi
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **self.arrays)
+        os.replace(tmp_path, path)
+        record_output(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
@@ -0,0 +1,98 @@
+# common/fast.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Deteksi FAST untuk banyak threshold sekaligus. Deteksi (dengan
+#        non-maximum suppression) hanya dijalankan sekali pada threshold
+#        terendah, lalu keypoint untuk threshold lain diturunkan dengan filter
+#        skor yang tervektorisasi.
+
+import cv2
+import numpy as np
+
+# Ukuran keypoint FAST di OpenCV (diameter lingkaran Bresenham)
+KEYPOINT_SIZE = 7.0
+
+# Representasi ringkas keypoint FAST
+KEYPOINT_DTYPE = np.dtype([("x", np.float32), ("y", np.float32), ("response", np.float32)])
+
+
+class MultiThresholdFAST:
+    """
+    Keypoint FAST-9 (dengan non-maximum suppression) untuk banyak threshold.
+
+    Skor FAST (KeyPoint.response) adalah threshold terbesar di mana sebuah
+    titik masih corner, jadi corner pada threshold t adalah titik dengan
+    skor >= t. NMS OpenCV mempertahankan corner yang skornya lebih besar dari
+    semua tetangga-8 yang juga corner. Tetangga yang gugur pada threshold
+    lebih tinggi selalu punya skor < t <= skor titik itu sendiri, sehingga
+    tidak pernah menekan titik tersebut. Akibatnya hasil NMS pada threshold t
+    sama persis dengan hasil NMS pada threshold terendah yang difilter
+    skor >= t, termasuk urutan keypoint.
+    """
+
+    def __init__(self, gray_image, min_threshold):
+        self.min_threshold = int(min_threshold)
+        detector = cv2.FastFeatureDetector_create(threshold=self.min_threshold,
+                                                  nonmaxSuppression=True)
+        self.cv_keypoints = detector.detect(gray_image, None)
+
+        self.points = np.empty(len(self.cv_keypoints), dtype=KEYPOINT_DTYPE)
+        if self.cv_keypoints:
+            xy = np.asarray(cv2.KeyPoint_convert(self.cv_keypoints), dtype=np.float32)
+            self.points["x"] = xy[:, 0]
+            self.points["y"] = xy[:, 1]
+            self.points["response"] = [kp.response for kp in self.cv_keypoints]
+
+    def _mask(self, threshold):
+        threshold = int(threshold)
+        if threshold < self.min_threshold:
+            raise ValueError(f"threshold {threshold} lebih kecil dari threshold deteksi "
+                             f"{self.min_threshold}")
+        return self.points["response"] >= threshold
+
+    def detect(self, threshold):
+        """
+        Keypoint untuk satu threshold sebagai array KEYPOINT_DTYPE.
+        """
+        return self.points[self._mask(threshold)]
+
+    def cv_keypoints_for(self, threshold):
+        """
+        Keypoint untuk satu threshold sebagai list cv2.KeyPoint (untuk digambar).
+        """
+        return [self.cv_keypoints[i] for i in np.flatnonzero(self._mask(threshold))]
+
+    def detect_all(self, thresholds):
+        """
+        Mengembalikan dict {threshold: array keypoint} untuk semua threshold.
+        """
+        return {threshold: self.detect(threshold) for threshold in thresholds}
+
+    def counts(self, thresholds):
+        """
+        Jumlah keypoint untuk setiap threshold tanpa membuat array baru.
+        """
+        return {threshold: int(np.count_nonzero(self._mask(threshold)))
+                for threshold in thresholds}
+
+
+def detect_fast_multi(gray_image, thresholds):
+    """
+    Deteksi FAST untuk semua threshold sekaligus. Mengembalikan
+    (counts, keypoints): dict jumlah keypoint dan dict array keypoint
+    dengan kunci threshold.
+    """
+    engine = MultiThresholdFAST(gray_image, min(thresholds))
+    keypoints = engine.detect_all(thresholds)
+    counts = {threshold: len(points) for threshold, points in keypoints.items()}
+    return counts, keypoints
+
+
+def to_cv_keypoints(points):
+    """
+    Mengubah array KEYPOINT_DTYPE menjadi list cv2.KeyPoint. Atribut lain
+    mengikuti nilai bawaan FAST OpenCV (angle -1, octave 0).
+    """
+    return [cv2.KeyPoint(float(x), float(y), KEYPOINT_SIZE, -1, float(response))
+            for x, y, response in zip(points["x"], points["y"], points["response"])]
@@ -0,0 +1,269 @@
+# common/feature_store.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Penyimpanan keypoint dan descriptor persisten untuk hasil SIFT dan
+#        FAST. Setiap set (misalnya "sift") terdiri dari file keypoint
+#        (array terstruktur) dan file descriptor (blok kontigu) yang hanya
+#        ditambah di ujungnya, plus index.json berisi offset dan jumlah
+#        keypoint per gambar. File data dibaca dengan np.memmap, jadi
+#        descriptor jutaan keypoint bisa dimuat sebagian tanpa unpickle
+#        objek cv2.KeyPoint.
+
+import contextlib
+import json
+import os
+
+import numpy as np
+
+from common.compact import KEYPOINT_RECORD_DTYPE, keypoints_to_records
+from common.fast import KEYPOINT_SIZE
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+LOCK_NAME = ".lock"
+
+# append() memadatkan store otomatis jika porsi data mati (milik entri yang
+# sudah ditulis ulang) melebihi nilai ini, sehingga ukuran store paling
+# banyak ~2x data yang dirujuk index
+AUTO_COMPACT_FRACTION = 0.5
+
+# Set bawaan: dtype dan panjang descriptor. Descriptor SIFT OpenCV selalu
+# bernilai bulat 0-255 (disimpan sebagai float32), sehingga disimpan sebagai
+# uint8 tanpa kehilangan informasi (4x lebih kecil). FAST tidak punya
+# descriptor; keypoint-nya disimpan pada threshold deteksi terendah dan
+# threshold lain cukup difilter dari response.
+FEATURE_SETS = {
+    "sift": {"descriptor_dtype": "uint8", "descriptor_size": 128},
+    "fast": {"descriptor_dtype": None, "descriptor_size": 0},
+}
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """
+    Kunci eksklusif antar proses (worker paralel menulis ke store yang sama).
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _dead_fraction(index):
+    total = live = 0
+    for entries in index["sets"].values():
+        total += max((entry["offset"] + entry["count"] for entry in entries.values()), default=0)
+        live += sum(entry["count"] for entry in entries.values())
+    return (total - live) / total if total else 0.0
+
+
+def fast_records(points):
+    """
+    Mengubah array common.fast.KEYPOINT_DTYPE menjadi KEYPOINT_RECORD_DTYPE
+    dengan atribut bawaan FAST OpenCV (size 7, angle -1, octave 0).
+    """
+    records = np.zeros(len(points), dtype=KEYPOINT_RECORD_DTYPE)
+    records["x"] = points["x"]
+    records["y"] = points["y"]
+    records["response"] = points["response"]
+    records["size"] = KEYPOINT_SIZE
+    records["angle"] = -1
+    records["class_id"] = -1
+    return records
+
+
+class FeatureStore:
+    """
+    Store keypoint/descriptor di sebuah folder. Penulisan (append) aman
+    dipanggil dari beberapa proses sekaligus; data ditulis dulu, baru
+    index.json diganti secara atomik, sehingga pembaca tidak pernah melihat
+    entri yang datanya belum lengkap. Menulis ulang gambar yang sama hanya
+    memindahkan entrinya ke data baru di ujung file; ruang lama dibuang
+    dengan compact(), yang juga dijalankan otomatis oleh append() jika
+    dead_fraction() melebihi auto_compact (None untuk mematikan).
+    """
+
+    def __init__(self, path, auto_compact=AUTO_COMPACT_FRACTION):
+        self.path = path
+        self.auto_compact = auto_compact
+        self._index = None
+        self._maps = {}
+
+    def _file(self, feature_set, kind):
+        return os.path.join(self.path, f"{feature_set}.{kind}")
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.path, INDEX_NAME), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {"version": INDEX_VERSION, "sets": {}}
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Versi index feature store tidak didukung: {index.get('version')}")
+        return index
+
+    def _write_index(self, index):
+        path = os.path.join(self.path, INDEX_NAME)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def refresh(self):
+        """
+        Membaca ulang index dan membuka ulang memmap (setelah proses lain menulis).
+        """
+        self._index = None
+        self._maps.clear()
+
+    def _layout(self, feature_set):
+        if feature_set not in FEATURE_SETS:
+            raise ValueError(f"Set fitur tidak dikenal: {feature_set}. Pilihan: {', '.join(FEATURE_SETS)}")
+        spec = FEATURE_SETS[feature_set]
+        descriptor_dtype = np.dtype(spec["descriptor_dtype"]) if spec["descriptor_dtype"] else None
+        return descriptor_dtype, spec["descriptor_size"]
+
+    def append(self, feature_set, image_name, keypoints, descriptors=None):
+        """
+        Menambahkan keypoint (list cv2.KeyPoint atau array
+        KEYPOINT_RECORD_DTYPE) dan descriptor satu gambar ke set.
+        """
+        descriptor_dtype, descriptor_size = self._layout(feature_set)
+        records = keypoints if isinstance(keypoints, np.ndarray) else keypoints_to_records(keypoints)
+        if records.dtype != KEYPOINT_RECORD_DTYPE:
+            raise ValueError(f"dtype keypoint harus KEYPOINT_RECORD_DTYPE, bukan {records.dtype}")
+        if descriptor_dtype is not None:
+            if descriptors is None:
+                descriptors = np.empty((0, descriptor_size), dtype=descriptor_dtype)
+            descriptors = np.asarray(descriptors).reshape(-1, descriptor_size)
+            if len(descriptors) != len(records):
+                raise ValueError(f"Jumlah descriptor ({len(descriptors)}) tidak sama dengan "
+                                 f"jumlah keypoint ({len(records)})")
+            converted = descriptors.astype(descriptor_dtype)
+            if not np.array_equal(converted, descriptors):
+                raise ValueError(f"Descriptor tidak dapat disimpan sebagai {descriptor_dtype} tanpa kehilangan nilai")
+            descriptors = converted
+
+        os.makedirs(self.path, exist_ok=True)
+        with _locked(os.path.join(self.path, LOCK_NAME)):
+            index = self._read_index()
+            entries = index["sets"].setdefault(feature_set, {})
+            end = max((entry["offset"] + entry["count"] for entry in entries.values()), default=0)
+            with open(self._file(feature_set, "keypoints"), "ab") as f:
+                f.truncate(end * KEYPOINT_RECORD_DTYPE.itemsize)
+                f.write(records.tobytes())
+            if descriptor_dtype is not None:
+                with open(self._file(feature_set, "descriptors"), "ab") as f:
+                    f.truncate(end * descriptor_size * descriptor_dtype.itemsize)
+                    f.write(np.ascontiguousarray(descriptors).tobytes())
+            entries[image_name] = {"offset": end, "count": len(records)}
+            self._write_index(index)
+            if self.auto_compact is not None and _dead_fraction(index) > self.auto_compact:
+                self._compact(index)
+        self.refresh()
+
+    def images(self, feature_set):
+        return list(self.index["sets"].get(feature_set, {}))
+
+    def contains(self, feature_set, image_name):
+        return image_name in self.index["sets"].get(feature_set, {})
+
+    def _memmap(self, feature_set, kind):
+        key = (feature_set, kind)
+        if key not in self._maps:
+            descriptor_dtype, descriptor_size = self._layout(feature_set)
+            entries = self.index["sets"].get(feature_set, {})
+            rows = max((entry["offset"] + entry["count"] for entry in entries.values()), default=0)
+            if kind == "keypoints":
+                dtype, shape = KEYPOINT_RECORD_DTYPE, (rows,)
+            else:
+                dtype, shape = descriptor_dtype, (rows, descriptor_size)
+            if rows == 0:
+                self._maps[key] = np.empty(shape, dtype=dtype)
+            else:
+                self._maps[key] = np.memmap(self._file(feature_set, kind), dtype=dtype, mode="r", shape=shape)
+        return self._maps[key]
+
+    def _entry(self, feature_set, image_name):
+        entry = self.index["sets"].get(feature_set, {}).get(image_name)
+        if entry is None:
+            raise KeyError(f"Gambar '{image_name}' tidak ada di set '{feature_set}'")
+        return entry["offset"], entry["offset"] + entry["count"]
+
+    def keypoints(self, feature_set, image_name):
+        """
+        Keypoint satu gambar sebagai view memmap read-only (KEYPOINT_RECORD_DTYPE).
+        """
+        start, stop = self._entry(feature_set, image_name)
+        return self._memmap(feature_set, "keypoints")[start:stop]
+
+    def descriptors(self, feature_set, image_name):
+        """
+        Descriptor satu gambar sebagai view memmap read-only (N x ukuran descriptor).
+        """
+        if self._layout(feature_set)[0] is None:
+            raise ValueError(f"Set '{feature_set}' tidak memiliki descriptor")
+        start, stop = self._entry(feature_set, image_name)
+        return self._memmap(feature_set, "descriptors")[start:stop]
+
+    def dead_fraction(self):
+        """
+        Porsi baris data (semua set) yang tidak lagi dirujuk index.
+        """
+        return _dead_fraction(self._read_index())
+
+    def compact(self):
+        """
+        Menulis ulang setiap set hanya dengan data yang dirujuk index
+        (membuang data gambar yang sudah ditulis ulang), urut nama gambar.
+        """
+        with _locked(os.path.join(self.path, LOCK_NAME)):
+            self._compact(self._read_index())
+        self.refresh()
+
+    def _compact(self, index):
+        # Dipanggil dengan kunci sudah dipegang
+        self.refresh()
+        self._index = index
+        for feature_set, entries in index["sets"].items():
+            descriptor_dtype = self._layout(feature_set)[0]
+            kinds = ["keypoints"] + (["descriptors"] if descriptor_dtype is not None else [])
+            new_entries, offset = {}, 0
+            for kind in kinds:
+                source = self._memmap(feature_set, kind)
+                tmp_path = f"{self._file(feature_set, kind)}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    offset = 0
+                    for image_name in sorted(entries):
+                        start, count = entries[image_name]["offset"], entries[image_name]["count"]
+                        f.write(np.ascontiguousarray(source[start:start + count]).tobytes())
+                        new_entries[image_name] = {"offset": offset, "count": count}
+                        offset += count
+                self._maps.pop((feature_set, kind), None)
+                del source
+                os.replace(tmp_path, self._file(feature_set, kind))
+            index["sets"][feature_set] = new_entries
+        self._write_index(index)
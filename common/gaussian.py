@@ -0,0 +1,141 @@
+# common/gaussian.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Bank Gaussian bertingkat (scale space). Setiap level dihitung dari level
+#        sebelumnya dengan sigma sisa sqrt(s² - s_prev²), dan level dengan sigma
+#        besar diturunkan resolusinya (decimation) sehingga sweep banyak level
+#        jauh lebih murah daripada memanggil cv2.GaussianBlur dari gambar asli.
+
+import bisect
+import math
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Level diturunkan resolusinya jika sigma-nya (dalam piksel grid level) >= nilai ini
+DECIMATE_SIGMA = 4.0
+
+# Sisi terkecil gambar yang masih boleh diturunkan resolusinya
+MIN_DECIMATED_SIZE = 32
+
+# Sigma sisa minimum (piksel grid level). Gaussian diskret dengan sigma lebih
+# kecil dari ~0.8 variansnya jauh di bawah sigma², sehingga galatnya menumpuk.
+MIN_RESIDUAL_SIGMA = 0.8
+
+# Jumlah level terakhir yang disimpan sebagai titik awal level berikutnya
+RECENT_LEVELS = 8
+
+
+def _blur(level, sigma):
+    """
+    Gaussian dengan kernel selebar +-3 sigma (aturan ukuran kernel OpenCV untuk 8-bit).
+    """
+    ksize = 2 * math.ceil(3 * sigma) + 1
+    return cv2.GaussianBlur(level, (ksize, ksize), sigma)
+
+
+class GaussianBank:
+    """
+    Menghasilkan gambar hasil blur Gaussian untuk banyak sigma secara
+    bertingkat.
+
+    Level disimpan dalam float32 agar pembulatan tidak menumpuk. Jika sigma
+    sebuah level sudah >= DECIMATE_SIGMA piksel, level itu juga disimpan
+    dalam resolusi setengah (rata-rata 2x2, variansnya diperhitungkan) dan
+    level berikutnya dihitung dari sana. Hasil pada resolusi rendah
+    dikembalikan ke ukuran asli dengan interpolasi linear.
+
+    Bank ini hanya untuk sweep sigma panjang. Untuk sweep ukuran kernel
+    pendek (misalnya 3/5/7) cv2.GaussianBlur langsung lebih cepat dan
+    identik, jadi modul filtering memanggil OpenCV langsung.
+
+    Toleransi terhadap cv2.GaussianBlur langsung (gambar uint8, diukur
+    dengan benchmarks/bench_gaussian.py): tanpa decimation selisih maksimum
+    2 level keabuan dan waktu ~2x lebih cepat untuk 24 sigma 1..16 pada
+    960x1280 (230 ms vs 465 ms); dengan decimation ~3.5x (134 ms). Dengan
+    decimation selisih di bagian dalam gambar tetap <= 2 pada foto (<= 3
+    pada pola tajam seperti papan catur), tetapi dalam pita ~3 sigma dari
+    tepi gambar bisa lebih besar karena refleksi border pada grid setengah
+    resolusi tidak sejajar dengan grid asli. Gunakan decimate=False jika
+    tepi penting.
+    """
+
+    def __init__(self, image, decimate=True):
+        self.image = image
+        self.decimate = decimate
+        self.shape = image.shape[:2]
+        # Level permanen (gambar asli dan awal setiap oktaf) terurut berdasarkan sigma
+        self._levels = [(0.0, 1, image.astype(np.float32))]
+        self._recent = deque(maxlen=RECENT_LEVELS)
+
+    def _insert(self, sigma, factor, data, keep):
+        entry = (sigma, factor, data)
+        if keep:
+            index = bisect.bisect_right([level[0] for level in self._levels], sigma)
+            self._levels.insert(index, entry)
+        else:
+            # Level biasa hanya disimpan beberapa yang terakhir agar memori tidak menumpuk
+            self._recent.append(entry)
+
+    def _nearest(self, sigma):
+        """
+        Level tersimpan dengan sigma terbesar yang sigma sisanya masih
+        >= MIN_RESIDUAL_SIGMA (atau sama persis). Gambar asli selalu menjadi
+        kandidat. Untuk sigma yang sama dipilih resolusi paling rendah.
+        """
+        def usable(level):
+            prev_sigma, factor, _ = level
+            if prev_sigma == 0 or prev_sigma == sigma:
+                return True
+            return sigma * sigma - prev_sigma * prev_sigma >= (MIN_RESIDUAL_SIGMA * factor) ** 2
+
+        candidates = [level for level in list(self._levels) + list(self._recent)
+                      if level[0] <= sigma and usable(level)]
+        return max(candidates, key=lambda level: (level[0], level[1]))
+
+    def level(self, sigma):
+        """
+        Mengembalikan (factor, data): level float32 dengan sigma (dalam piksel
+        gambar asli) pada resolusi 1/factor.
+        """
+        prev_sigma, factor, data = self._nearest(sigma)
+        residual = math.sqrt(max(sigma * sigma - prev_sigma * prev_sigma, 0.0)) / factor
+        if residual > 1e-6:
+            data = _blur(data, residual)
+            self._insert(sigma, factor, data, keep=False)
+
+        rows, cols = data.shape[:2]
+        if (self.decimate and sigma / factor >= DECIMATE_SIGMA
+                and min(rows, cols) >= 2 * MIN_DECIMATED_SIZE):
+            # Rata-rata 2x2 menambah varians factor² / 4 (dalam piksel asli)
+            decimated = cv2.resize(data, (cols // 2, rows // 2), interpolation=cv2.INTER_AREA)
+            self._insert(math.sqrt(sigma * sigma + factor * factor / 4), factor * 2, decimated,
+                         keep=True)
+        return factor, data
+
+    def _to_image(self, factor, data):
+        if factor > 1:
+            data = cv2.resize(data, (self.shape[1], self.shape[0]), interpolation=cv2.INTER_LINEAR)
+        if np.issubdtype(self.image.dtype, np.integer):
+            # Dibulatkan setengah ke atas seperti fixed-point cv2.GaussianBlur
+            info = np.iinfo(self.image.dtype)
+            return np.clip(np.floor(data + 0.5), info.min, info.max).astype(self.image.dtype)
+        return data
+
+    def blur(self, sigma):
+        """
+        Gambar hasil blur dengan sigma (dalam piksel gambar asli).
+        """
+        return self._to_image(*self.level(sigma))
+
+    def blur_sigmas(self, sigmas):
+        """
+        Blur untuk daftar sigma. Dihitung dari sigma terkecil ke terbesar;
+        hasil dikembalikan sesuai urutan input.
+        """
+        results = {}
+        for sigma in sorted(set(sigmas)):
+            results[sigma] = self.blur(sigma)
+        return [results[sigma] for sigma in sigmas]
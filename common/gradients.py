@@ -0,0 +1,152 @@
+# common/gradients.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Cache gradien orde pertama (Sobel) per gambar di dalam satu proses.
+#        Modul pipeline berjalan di proses terpisah, jadi cache ini hanya
+#        dipakai bersama oleh operasi di dalam satu modul (misalnya Sobel
+#        per ksize di edge, Canny, dan Harris di featurepoints), tidak
+#        antar modul.
+
+import weakref
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Kedalaman output yang didukung beserta dtype NumPy-nya
+DDEPTH_DTYPES = {
+    cv2.CV_16S: np.int16,
+    cv2.CV_32F: np.float32,
+    cv2.CV_64F: np.float64,
+}
+
+
+class GradientCache:
+    """
+    Menyimpan pasangan gradien (dx, dy) dengan kunci
+    (id gambar, ksize, dtype, border). Id gambar adalah identitas objek
+    array (id()), bukan hash isi piksel, sehingga lookup tidak membaca
+    seluruh gambar. Entri sebuah gambar dihapus ketika array-nya di-garbage
+    collect, dan gambar tidak boleh diubah in-place selama dipakai.
+
+    Untuk input uint8, gradien dihitung sekali per (ksize, border) dalam
+    float32 (nilainya bilangan bulat sehingga eksak), lalu dtype lain
+    diturunkan dengan konversi. Hasilnya identik dengan cv2.Sobel langsung.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tracked = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def _image_id(self, image):
+        image_id = id(image)
+        if image_id not in self._tracked:
+            # id() bisa dipakai ulang setelah array dibebaskan, jadi entri
+            # gambar ini dihapus bersama array-nya
+            self._tracked.add(image_id)
+            weakref.finalize(image, self._forget, image_id)
+        return image_id
+
+    def _forget(self, image_id):
+        self._tracked.discard(image_id)
+        for key in [key for key in self._entries if key[0] == image_id]:
+            del self._entries[key]
+
+    def _compute(self, image, image_id, ksize, ddepth, border):
+        if image.dtype != np.uint8:
+            dx = cv2.Sobel(image, ddepth, 1, 0, ksize=ksize, borderType=border)
+            dy = cv2.Sobel(image, ddepth, 0, 1, ksize=ksize, borderType=border)
+            return dx, dy
+
+        # Gradien dasar float32 untuk (ksize, border) ini
+        base_key = (image_id, ksize, np.dtype(np.float32).str, border)
+        base = self._lookup(base_key)
+        if base is None:
+            self.misses += 1
+            base = tuple(self._freeze(g) for g in (
+                cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=ksize, borderType=border),
+                cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=ksize, borderType=border)))
+            self._store(base_key, base)
+        else:
+            self.hits += 1
+
+        if ddepth == cv2.CV_32F:
+            return base
+        if ddepth == cv2.CV_16S:
+            # Saturasi seperti cv2 (relevan untuk ksize >= 7)
+            return tuple(np.clip(g, -32768, 32767).astype(np.int16) for g in base)
+        return tuple(g.astype(DDEPTH_DTYPES[ddepth]) for g in base)
+
+    @staticmethod
+    def _freeze(array):
+        array.flags.writeable = False
+        return array
+
+    def get(self, image, ksize=3, ddepth=cv2.CV_64F, border=cv2.BORDER_DEFAULT):
+        """
+        Mengembalikan (dx, dy) = Sobel orde pertama arah x dan y.
+        Array hasil bersifat read-only karena dibagikan lewat cache.
+        """
+        if ddepth not in DDEPTH_DTYPES:
+            raise ValueError(f"ddepth tidak didukung: {ddepth}")
+
+        image_id = self._image_id(image)
+        key = (image_id, ksize, np.dtype(DDEPTH_DTYPES[ddepth]).str, border)
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        grads = tuple(self._freeze(g) for g in
+                      self._compute(image, image_id, ksize, ddepth, border))
+        self._store(key, grads)
+        return grads
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Cache bawaan per proses, dipakai bersama oleh semua operasi di modul itu
+_default_cache = GradientCache()
+
+
+def get_gradient_cache():
+    """
+    Mengembalikan cache gradien bawaan untuk proses ini.
+    """
+    return _default_cache
+
+
+def get_gradients(image, ksize=3, ddepth=cv2.CV_64F, border=cv2.BORDER_DEFAULT):
+    """
+    Shortcut untuk get_gradient_cache().get(...).
+    """
+    return _default_cache.get(image, ksize, ddepth, border)
+
+
+def canny(image, low_threshold, high_threshold):
+    """
+    cv2.Canny dengan aperture 3 yang memakai gradien dari cache.
+    Canny internal OpenCV memakai Sobel CV_16S dengan BORDER_REPLICATE,
+    sehingga hasil overload cv2.Canny(dx, dy, ...) ini identik bit per bit
+    dengan cv2.Canny(image, ...).
+    """
+    dx, dy = get_gradients(image, 3, cv2.CV_16S, cv2.BORDER_REPLICATE)
+    return cv2.Canny(dx, dy, low_threshold, high_threshold)
+
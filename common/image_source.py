@@ -0,0 +1,304 @@
+# common/image_source.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Sumber gambar bersama untuk semua modul. Setiap input (dataset skimage
+#        dan gambar pribadi) didekode sekali per run lalu disimpan di cache LRU
+#        di memori, dan opsional di cache .npy di disk. Raster besar (.npy dan
+#        file raw) dibuka dengan memory map tanpa didekode ke memori. File JPEG
+#        dapat didekode langsung ke resolusi 1/2, 1/4, atau 1/8.
+
+import hashlib
+import os
+from functools import lru_cache
+
+import cv2
+import numpy as np
+import skimage
+from skimage import data
+
+from common.trace import span
+
+# Nama environment variable untuk direktori cache .npy di disk.
+# Disimpan di environment agar ikut diwariskan ke proses worker.
+CACHE_DIR_ENV = "CV_IMAGE_CACHE_DIR"
+
+PERSONAL_IMAGE_NAME = "personal_image"
+
+# Ekstensi file raster tanpa header (piksel mentah, row-major)
+RAW_RASTER_EXTENSIONS = (".raw", ".bin")
+
+# Ekstensi file JPEG; libjpeg dapat mendekode langsung ke resolusi tereduksi
+JPEG_EXTENSIONS = (".jpg", ".jpeg", ".jpe", ".jfif")
+
+# Skala decode tereduksi yang didukung (1/scale per sisi) beserta flag imread-nya
+REDUCED_GRAYSCALE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Gambar standar beserta fungsi pemuatnya (semua dalam grayscale 8-bit)
+STANDARD_IMAGE_LOADERS = {
+    "cameraman": data.camera,
+    "coins": data.coins,
+    "checkerboard": data.checkerboard,
+    "astronaut": lambda: cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2GRAY),
+}
+
+
+def image_digest(image):
+    """
+    Sidik jari isi gambar (piksel, shape, dan dtype). Dipakai sebagai kunci
+    isi gambar di run cache.
+    """
+    image = np.ascontiguousarray(image)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.shape}|{image.dtype.str}".encode("ascii"))
+    h.update(image.data)
+    return h.hexdigest()
+
+
+def set_disk_cache_dir(cache_dir):
+    """
+    Mengaktifkan (atau menonaktifkan jika None) cache .npy di disk.
+    """
+    if cache_dir:
+        os.environ[CACHE_DIR_ENV] = os.path.abspath(cache_dir)
+    else:
+        os.environ.pop(CACHE_DIR_ENV, None)
+
+
+def decode_scale(scales):
+    """
+    Skala decode yang mencukupi semua stage. Setiap stage mendeklarasikan
+    resolusi yang dibutuhkannya sebagai skala (1 = penuh, 2 = 1/2, ...);
+    karena semua skala adalah pangkat 2, skala terkecil selalu bisa
+    diturunkan ke skala stage lainnya dengan resize.
+    """
+    scale = min(scales, default=1)
+    if scale != 1 and scale not in REDUCED_GRAYSCALE_FLAGS:
+        raise ValueError(f"Skala decode tidak didukung: {scale}")
+    return scale
+
+
+def reduced_decode_scale(source, scale):
+    """
+    Skala yang benar-benar dipakai load_image(source, scale). Hanya file JPEG
+    yang bisa didekode langsung ke resolusi tereduksi; sumber lain tetap
+    didekode penuh (skala 1) karena decode penuh lalu resize tidak lebih
+    murah, dan pemanggil yang melakukan resize sendiri.
+    """
+    if scale in REDUCED_GRAYSCALE_FLAGS and source not in STANDARD_IMAGE_LOADERS \
+            and os.path.splitext(source)[1].lower() in JPEG_EXTENSIONS:
+        return scale
+    return 1
+
+
+def _source_key(source, scale=1):
+    """
+    Membuat kunci cache untuk sebuah sumber gambar. Untuk file, kunci memuat
+    path absolut, mtime, dan ukuran sehingga file yang berubah otomatis
+    didekode ulang. Decode tereduksi memakai kunci tersendiri.
+    """
+    if source in STANDARD_IMAGE_LOADERS:
+        return ("skimage", source, skimage.__version__)
+    path = os.path.abspath(source)
+    stat = os.stat(path)
+    key = ("file", path, stat.st_mtime_ns, stat.st_size)
+    if scale > 1:
+        return ("reduced", scale) + key
+    return key
+
+
+def _disk_cache_path(key):
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.npy")
+
+
+def _decode(key):
+    """
+    Mendekode sumber gambar menjadi array grayscale uint8.
+    """
+    if key[0] == "skimage":
+        return np.ascontiguousarray(STANDARD_IMAGE_LOADERS[key[1]]())
+    if key[0] == "reduced":
+        return cv2.imread(key[3], REDUCED_GRAYSCALE_FLAGS[key[1]])
+    return cv2.imread(key[1], cv2.IMREAD_GRAYSCALE)
+
+
+@lru_cache(maxsize=32)
+def _load_cached(key):
+    cache_path = _disk_cache_path(key)
+    if cache_path and os.path.exists(cache_path):
+        image = np.load(cache_path)
+    else:
+        source = key[3] if key[0] == "reduced" else key[1]
+        with span("decode", category="io", source=os.path.basename(source)):
+            image = _decode(key)
+        if image is None:
+            return None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Tulis ke file sementara dulu agar proses lain tidak membaca file setengah jadi
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, image)
+            os.replace(tmp_path, cache_path)
+
+    # Array dibagikan ke semua pemanggil, jadi dibuat read-only
+    image.flags.writeable = False
+    return image
+
+
+def load_image(source, scale=1):
+    """
+    Memuat gambar grayscale dari nama gambar standar ("cameraman", "coins",
+    "checkerboard", "astronaut") atau path file. Mengembalikan None jika
+    file tidak dapat didekode.
+
+    scale: resolusi yang cukup untuk pemanggil (1, 2, 4, atau 8). File JPEG
+    didekode langsung ke 1/scale per sisi (ukuran dibulatkan ke atas, dan
+    hasilnya sedikit berbeda dari resize INTER_AREA karena penskalaan
+    dilakukan di domain DCT); sumber lain tetap didekode penuh. Gunakan
+    reduced_decode_scale untuk mengetahui skala yang dipakai.
+
+    Array yang dikembalikan bersifat read-only karena dibagikan lewat cache.
+    """
+    return _load_cached(_source_key(source, reduced_decode_scale(source, scale)))
+
+
+class ImageRef:
+    """
+    Gambar yang belum didekode: sumber (nama gambar standar atau path),
+    skala decode (lihat load_image), dan pengali piksel opsional. digest()
+    hanya memakai kunci sumber (path, mtime, dan ukuran file, atau versi
+    skimage), sehingga cache run dapat diperiksa tanpa mendekode gambar;
+    load() mendekode lewat cache yang sama dengan load_image.
+    """
+
+    def __init__(self, source, scale=1, multiplier=None):
+        self.source = source
+        self.scale = reduced_decode_scale(source, scale)
+        self.multiplier = multiplier
+
+    def digest(self):
+        key = (_source_key(self.source, self.scale), self.multiplier)
+        return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+    def load(self):
+        image = load_image(self.source, self.scale)
+        if image is not None and self.multiplier is not None:
+            image = image * self.multiplier
+        return image
+
+
+def resolve_images(images):
+    """
+    Mendekode setiap ImageRef di daftar (nama, gambar); gambar biasa
+    dibiarkan. Gambar yang gagal didekode dilewati dengan pesan error.
+    """
+    resolved = []
+    for image_name, image in images:
+        if isinstance(image, ImageRef):
+            image = image.load()
+            if image is None:
+                print(f"Error: Gagal memuat gambar '{image_name}'")
+                continue
+        resolved.append((image_name, image))
+    return resolved
+
+
+def load_standard_images(lazy=False):
+    """
+    Mengembalikan daftar (nama, gambar) untuk semua gambar standar.
+    lazy: jika True, gambar dikembalikan sebagai ImageRef (belum didekode).
+    """
+    if lazy:
+        return [(name, ImageRef(name)) for name in STANDARD_IMAGE_LOADERS]
+    return [(name, load_image(name)) for name in STANDARD_IMAGE_LOADERS]
+
+
+def load_personal_image(path, scale=1, lazy=False):
+    """
+    Memuat gambar pribadi beserta pesan status. Mengembalikan None jika
+    file tidak ada atau gagal didekode. scale: lihat load_image.
+    lazy: jika True, dikembalikan ImageRef dan kegagalan decode baru
+    terlihat saat gambar dibutuhkan (lihat resolve_images).
+    """
+    if not os.path.exists(path):
+        print(f"Peringatan: File gambar pribadi '{path}' tidak ditemukan. Langkah ini dilewati.")
+        return None
+
+    actual_scale = reduced_decode_scale(path, scale)
+    if actual_scale > 1:
+        print(f"Memuat gambar pribadi '{path}' (decode 1/{actual_scale})...")
+    else:
+        print(f"Memuat gambar pribadi '{path}'...")
+    if lazy:
+        return ImageRef(path, scale)
+    image = load_image(path, scale)
+    if image is None:
+        print(f"Error: Gagal memuat gambar dari '{path}'")
+    return image
+
+
+def preload_images(personal_image_path='my_photo.jpg'):
+    """
+    Mendekode semua input sekali di proses ini dan mengembalikan daftar
+    (nama, gambar). Proses worker yang dibuat dengan fork setelahnya
+    mewarisi cache yang sudah terisi.
+    """
+    images = load_standard_images()
+    if os.path.exists(personal_image_path):
+        image = load_image(personal_image_path)
+        if image is not None:
+            images.append((PERSONAL_IMAGE_NAME, image))
+    return images
+
+
+def load_raster(path, shape=None, dtype=np.uint8):
+    """
+    Membuka raster besar tanpa mendekode seluruh isinya ke memori.
+
+    - .npy dibuka dengan np.load(mmap_mode='r').
+    - File raw (.raw/.bin) dibuka dengan np.memmap; shape (tinggi, lebar)
+      wajib diisi dan dtype menentukan tipe pikselnya.
+    - Format lain (PNG, JPEG, ...) didekode biasa lewat load_image.
+
+    Array yang dikembalikan read-only; halaman file baru dibaca dari disk
+    ketika bagian array tersebut diakses.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        return np.load(path, mmap_mode="r")
+    if extension in RAW_RASTER_EXTENSIONS:
+        if shape is None:
+            raise ValueError(f"shape wajib diisi untuk raster raw: '{path}'")
+        return np.memmap(path, dtype=dtype, mode="r", shape=tuple(shape))
+    return load_image(path)
+
+
+def load_rasters(paths, shape=None, dtype=np.uint8):
+    """
+    Memuat beberapa raster (lihat load_raster) sebagai daftar (nama, gambar).
+    Nama diambil dari nama file tanpa ekstensi; jika bentrok (misalnya
+    a.npy dan a.raw), ekstensinya ikut dipakai agar file output tidak saling
+    menimpa.
+    """
+    images = []
+    names = set()
+    for path in paths:
+        image = load_raster(path, shape, dtype)
+        if image is None:
+            print(f"Error: Gagal memuat gambar dari '{path}'")
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in names:
+            name = os.path.basename(path).replace(".", "_")
+        names.add(name)
+        images.append((name, image))
+    return images
@@ -0,0 +1,234 @@
+# common/magnitude.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Kernel magnitude gradien dengan alokasi rendah. Magnitude, min/max, dan
+#        skala ke uint8 dihitung dalam float32 (atau dari gradien int16) di atas
+#        buffer yang dipakai ulang untuk gambar dengan ukuran yang sama.
+
+import cv2
+import numpy as np
+
+# Kedalaman gradien yang didukung beserta ddepth OpenCV-nya
+MAGNITUDE_DTYPES = {
+    "float32": cv2.CV_32F,
+    "int16": cv2.CV_16S,
+    "float64": cv2.CV_64F,
+}
+
+# Lebar minimum pita di sekitar bilangan bulat yang dihitung ulang dalam float64
+GUARD_BAND = 1e-3
+
+
+def normalize_minmax(values, vmin, vmax):
+    """
+    cv2.normalize(..., 0, 255, NORM_MINMAX) dalam float64 untuk sebagian
+    nilai dengan min/max global vmin dan vmax. Konversi di OpenCV memakai
+    fused multiply-add, jadi hasilnya tidak selalu sama dengan
+    values * scale + shift di NumPy; karena itu vmin dan vmax disisipkan di
+    depan agar cv2.normalize sendiri yang menghitung skala dan nilainya.
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    stacked = np.concatenate(([vmin, vmax], values)).reshape(-1, 1)
+    return cv2.normalize(stacked, None, 0, 255, cv2.NORM_MINMAX)[2:, 0]
+
+
+class GradientMagnitude:
+    """
+    Menghitung versi uint8 dari |gradien| dan magnitude gradien dengan rumus
+    yang sama seperti modul filtering dan edge:
+
+    - abs_to_uint8:           np.uint8(255 * |d| / max(|d|))
+    - magnitude_to_uint8:     np.uint8(255 * m / max(m)), m = sqrt(dx² + dy²)
+    - magnitude_minmax_uint8: cv2.normalize(m, None, 0, 255, NORM_MINMAX).astype(np.uint8)
+
+    Perhitungan utama memakai float32 di buffer yang dipakai ulang, sehingga
+    tidak ada temporary float64 seukuran gambar. Hasil float32 bisa berbeda
+    dari rumus float64 hanya jika nilainya sangat dekat ke bilangan bulat
+    (karena dipotong ke uint8). Piksel seperti itu (biasanya sangat sedikit)
+    dihitung ulang dengan rumus float64 asli, sehingga untuk gradien bernilai
+    bulat (input uint8) hasilnya identik dengan kode lama.
+
+    Array uint8 hasil selalu baru (atau out dari pemanggil) karena bisa
+    diteruskan ke AsyncImageWriter yang menulis di latar belakang.
+    """
+
+    def __init__(self, dtype="float32"):
+        dtype = np.dtype(dtype).name
+        if dtype not in MAGNITUDE_DTYPES:
+            raise ValueError(f"dtype magnitude tidak didukung: {dtype}")
+        self.dtype = dtype
+        self.ddepth = MAGNITUDE_DTYPES[dtype]
+        # Gradien int16 diubah ke float32 karena cv2.magnitude butuh input float
+        self.work_dtype = np.dtype(np.float64 if dtype == "float64" else np.float32)
+        self._buffers = {}
+
+    def _buffer(self, name, shape):
+        key = (name, tuple(shape))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = np.empty(shape, dtype=self.work_dtype)
+        return buffer
+
+    def _work(self, array, name):
+        """
+        Gradien dalam work dtype. Gradien float32 dari cache dipakai langsung
+        tanpa salinan; dtype lain dikonversi ke buffer yang dipakai ulang.
+        """
+        if array.dtype == self.work_dtype:
+            return array
+        buffer = self._buffer(name, array.shape)
+        np.copyto(buffer, array, casting="unsafe")
+        return buffer
+
+    def magnitude(self, dx, dy):
+        """
+        Magnitude sqrt(dx² + dy²) dalam work dtype. Buffer hasil dipakai ulang
+        dan akan ditimpa oleh pemanggilan berikutnya.
+        """
+        x = self._work(dx, "x")
+        y = self._work(dy, "y")
+        out = self._buffer("magnitude", x.shape)
+        cv2.magnitude(x, y, out)
+        return out
+
+    def _guard(self, vmax, vmin=0.0):
+        """
+        Lebar pita aman: galat relatif work dtype (beberapa ulp) dikalikan
+        skala normalisasi, minimal GUARD_BAND.
+        """
+        eps = np.finfo(self.work_dtype).eps
+        return max(GUARD_BAND, 16 * eps * 255.0 * vmax / (vmax - vmin))
+
+    @staticmethod
+    def _exact_extreme(values, target, exact, largest):
+        """
+        Nilai ekstrem float64 yang sama dengan rumus asli. Kandidatnya adalah
+        piksel yang nilai work dtype-nya (hampir) sama dengan target.
+        """
+        tolerance = 8 * np.finfo(values.dtype).eps * abs(target)
+        if largest:
+            indices = np.flatnonzero(values >= target - tolerance)
+            return float(exact(indices).max())
+        indices = np.flatnonzero(values <= target + tolerance)
+        return float(exact(indices).min())
+
+    def _scaled_uint8(self, values, scale, shift, guard, exact_scaled, out):
+        """
+        out = trunc(values * scale + shift). Piksel yang hasilnya berada dalam
+        pita guard di sekitar bilangan bulat dihitung ulang dengan
+        exact_scaled(indices) (rumus float64 asli).
+        """
+        scaled = self._buffer("scaled", values.shape)
+        np.multiply(values, scale, out=scaled)
+        if shift:
+            np.add(scaled, shift, out=scaled)
+        np.copyto(out, scaled, casting="unsafe")
+
+        frac = self._buffer("frac", values.shape)
+        np.subtract(scaled, out, out=frac)
+        near = frac < guard
+        near |= frac > 1 - guard
+        if not shift:
+            # Nilai 0 berasal dari gradien 0 dan juga 0 pada rumus float64
+            near &= scaled != 0
+        indices = np.flatnonzero(near)
+        if indices.size:
+            out.flat[indices] = exact_scaled(indices).astype(np.uint8)
+        return out
+
+    def _finish(self, values, exact, out, minmax):
+        if out is None:
+            out = np.empty(values.shape, dtype=np.uint8)
+
+        vmin, vmax, _, _ = cv2.minMaxLoc(values)
+        if minmax and vmin > 0:
+            vmin = self._exact_extreme(values, vmin, exact, largest=False)
+        else:
+            vmin = 0.0
+        vmax = self._exact_extreme(values, vmax, exact, largest=True) if vmax > 0 else 0.0
+
+        if minmax:
+            # Rumus skala yang sama dengan NORM_MINMAX di OpenCV
+            value_range = vmax - vmin
+            scale = 255.0 * (1.0 / value_range if value_range > np.finfo(np.float64).eps else 0.0)
+            shift = -vmin * scale
+
+            def exact_scaled(indices):
+                return normalize_minmax(exact(indices), vmin, vmax)
+        else:
+            if vmax == 0:
+                # 255 * 0 / 0 pada kode lama menghasilkan NaN yang menjadi 0
+                out[...] = 0
+                return out
+            scale = 255.0 / vmax
+            shift = 0.0
+
+            def exact_scaled(indices):
+                return 255 * exact(indices) / vmax
+
+        if scale == 0:
+            out[...] = np.uint8(shift)
+            return out
+        guard = self._guard(vmax, vmin)
+        if guard >= 0.5:
+            # Rentang nilai terlalu sempit untuk work dtype, hitung semuanya dalam float64
+            out[...] = exact_scaled(np.arange(values.size)).astype(np.uint8).reshape(values.shape)
+            return out
+        return self._scaled_uint8(values, scale, shift, guard, exact_scaled, out)
+
+    def abs_to_uint8(self, gradient, out=None):
+        """
+        np.uint8(255 * |gradient| / max(|gradient|)) seperti Sobel X/Y di modul filtering.
+        """
+        work = self._work(gradient, "x")
+        values = self._buffer("magnitude", work.shape)
+        np.absolute(work, out=values)
+        flat = np.ravel(gradient)
+
+        def exact(indices):
+            return np.absolute(flat[indices].astype(np.float64))
+
+        return self._finish(values, exact, out, minmax=False)
+
+    def _magnitude_exact(self, dx, dy):
+        flat_x = np.ravel(dx)
+        flat_y = np.ravel(dy)
+
+        def exact(indices):
+            x = flat_x[indices].astype(np.float64)
+            y = flat_y[indices].astype(np.float64)
+            return np.sqrt(x**2 + y**2)
+
+        return exact
+
+    def magnitude_to_uint8(self, dx, dy, out=None):
+        """
+        np.uint8(255 * m / max(m)) dengan m = sqrt(dx² + dy²), seperti Sobel
+        Magnitude di modul filtering.
+        """
+        return self._finish(self.magnitude(dx, dy), self._magnitude_exact(dx, dy), out, minmax=False)
+
+    def magnitude_minmax_uint8(self, dx, dy, out=None):
+        """
+        cv2.normalize(m, None, 0, 255, NORM_MINMAX).astype(np.uint8) dengan
+        m = sqrt(dx² + dy²), seperti Sobel di modul edge.
+        """
+        return self._finish(self.magnitude(dx, dy), self._magnitude_exact(dx, dy), out, minmax=True)
+
+    def clear(self):
+        self._buffers.clear()
+
+
+# Kernel bawaan per proses untuk setiap dtype, buffernya dipakai ulang antar gambar
+_default_kernels = {}
+
+
+def get_magnitude_kernel(dtype="float32"):
+    """
+    Mengembalikan kernel bawaan untuk dtype tersebut di proses ini.
+    """
+    dtype = np.dtype(dtype).name
+    if dtype not in _default_kernels:
+        _default_kernels[dtype] = GradientMagnitude(dtype)
+    return _default_kernels[dtype]
@@ -0,0 +1,174 @@
+# common/matching.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Matching descriptor (SIFT) antar gambar. Mode exact menghitung jarak
+#        L2 brute-force per blok sebagai perkalian matriks NumPy dengan seleksi
+#        2 tetangga terdekat, ratio test Lowe, dan cross-check; mode
+#        approximate memakai index FLANN KD-tree yang dibangun sekali untuk
+#        pencarian di korpus besar.
+
+import cv2
+import numpy as np
+
+# Metode matching yang didukung
+MATCH_METHODS = ("exact", "flann")
+
+# Hasil matching: indeks descriptor query, indeks descriptor train, jarak L2
+MATCH_DTYPE = np.dtype([("query", np.int32), ("train", np.int32), ("distance", np.float32)])
+
+# Batas memori matriks jarak satu blok (baris query x semua train, float32)
+MATCH_BLOCK_BYTES = 64 * 2**20
+
+DEFAULT_RATIO = 0.75
+
+# Parameter FLANN KD-tree bawaan (FLANN_INDEX_KDTREE = 1)
+FLANN_TREES = 4
+FLANN_CHECKS = 64
+
+
+def _as_float32(descriptors):
+    return np.ascontiguousarray(descriptors, dtype=np.float32)
+
+
+def knn2_exact(query, train, block_rows=None, reverse=False):
+    """
+    Dua tetangga terdekat (L2) setiap descriptor query di train.
+
+    Jarak kuadrat dihitung per blok baris query sebagai
+    |q|^2 + |t|^2 - 2 q.t (satu perkalian matriks BLAS per blok), jadi
+    memori yang dipakai hanya blok x len(train) float32 (lihat
+    MATCH_BLOCK_BYTES). Untuk descriptor uint8 (SIFT) semua suku adalah
+    bilangan bulat < 2^24, sehingga hitungan float32 ini eksak dan urutan
+    tetangganya sama dengan cv2.BFMatcher. Jika jarak sama, indeks train
+    terkecil yang dipilih.
+
+    Mengembalikan (indices, distances) berukuran len(query) x 2 (-1 dan inf
+    jika train kurang dari 2), ditambah (reverse_indices) jika reverse=True:
+    untuk setiap descriptor train, indeks query terdekatnya (untuk cross-check).
+    """
+    q = _as_float32(query)
+    t = _as_float32(train)
+    nq, nt = len(q), len(t)
+    indices = np.full((nq, 2), -1, dtype=np.int32)
+    distances = np.full((nq, 2), np.inf, dtype=np.float32)
+    reverse_indices = np.full(nt, -1, dtype=np.int32)
+    reverse_best = np.full(nt, np.inf, dtype=np.float32)
+    if nq == 0 or nt == 0:
+        return (indices, distances, reverse_indices) if reverse else (indices, distances)
+
+    q_norm = np.einsum("ij,ij->i", q, q)
+    t_norm = np.einsum("ij,ij->i", t, t)
+    if block_rows is None:
+        block_rows = max(1, MATCH_BLOCK_BYTES // (4 * nt))
+    columns = np.arange(nt)
+
+    for start in range(0, nq, block_rows):
+        stop = min(start + block_rows, nq)
+        rows = np.arange(stop - start)
+        d2 = q[start:stop] @ t.T
+        d2 *= -2
+        d2 += q_norm[start:stop, np.newaxis]
+        d2 += t_norm[np.newaxis, :]
+        np.maximum(d2, 0, out=d2)
+
+        if reverse:
+            best_query = d2.argmin(axis=0)
+            best = d2[best_query, columns]
+            better = best < reverse_best
+            reverse_best[better] = best[better]
+            reverse_indices[better] = best_query[better] + start
+
+        # Seleksi top-2 parsial: argmin, tandai, argmin lagi (tanpa mengurutkan baris)
+        first = d2.argmin(axis=1)
+        indices[start:stop, 0] = first
+        distances[start:stop, 0] = d2[rows, first]
+        if nt > 1:
+            d2[rows, first] = np.inf
+            second = d2.argmin(axis=1)
+            indices[start:stop, 1] = second
+            distances[start:stop, 1] = d2[rows, second]
+
+    np.sqrt(distances, out=distances)
+    return (indices, distances, reverse_indices) if reverse else (indices, distances)
+
+
+class FlannIndex:
+    """
+    Index approximate (FLANN KD-tree acak) untuk sekumpulan descriptor train
+    yang dibangun sekali lalu dipakai untuk banyak query, misalnya korpus
+    descriptor semua gambar di feature store. checks mengatur trade-off
+    akurasi dan kecepatan (jumlah daun yang diperiksa per query).
+    """
+
+    def __init__(self, train, trees=FLANN_TREES, checks=FLANN_CHECKS):
+        self.train = _as_float32(train)
+        self.checks = checks
+        self._index = cv2.flann_Index(self.train, dict(algorithm=1, trees=trees)) if len(self.train) else None
+
+    def __len__(self):
+        return len(self.train)
+
+    def knn(self, query, k=2):
+        """
+        k tetangga terdekat (approximate) setiap descriptor query, dalam
+        format yang sama dengan knn2_exact (indices, distances L2).
+        """
+        query = _as_float32(query)
+        indices = np.full((len(query), k), -1, dtype=np.int32)
+        distances = np.full((len(query), k), np.inf, dtype=np.float32)
+        available = min(k, len(self.train))
+        if len(query) and available:
+            found, squared = self._index.knnSearch(query, available, params=dict(checks=self.checks))
+            indices[:, :available] = found.reshape(len(query), available)
+            distances[:, :available] = np.sqrt(np.maximum(squared.reshape(len(query), available), 0))
+        return indices, distances
+
+
+def filter_matches(indices, distances, ratio=DEFAULT_RATIO, reverse_indices=None):
+    """
+    Menerapkan ratio test Lowe (jarak terdekat < ratio x jarak kedua; query
+    tanpa tetangga kedua ditolak) dan, jika reverse_indices diberikan,
+    cross-check (train yang dipilih juga harus memilih query itu sebagai
+    terdekat). ratio None melewati ratio test. Mengembalikan array MATCH_DTYPE.
+    """
+    keep = indices[:, 0] >= 0
+    if ratio is not None:
+        keep &= (indices[:, 1] >= 0) & (distances[:, 0] < ratio * distances[:, 1])
+    if reverse_indices is not None:
+        keep &= reverse_indices[np.maximum(indices[:, 0], 0)] == np.arange(len(indices))
+    matches = np.empty(int(np.count_nonzero(keep)), dtype=MATCH_DTYPE)
+    matches["query"] = np.flatnonzero(keep)
+    matches["train"] = indices[keep, 0]
+    matches["distance"] = distances[keep, 0]
+    return matches
+
+
+def match_descriptors(query, train, ratio=DEFAULT_RATIO, cross_check=False, method="exact", index=None):
+    """
+    Mencocokkan descriptor query ke train. method "exact" memakai
+    knn2_exact; "flann" memakai FlannIndex (index boleh diberikan agar
+    dibangun sekali untuk banyak query). Cross-check pada mode flann
+    membangun index kedua dari query. Mengembalikan array MATCH_DTYPE.
+    """
+    if method not in MATCH_METHODS:
+        raise ValueError(f"Metode matching tidak dikenal: {method}. Pilihan: {', '.join(MATCH_METHODS)}")
+    if method == "exact":
+        if cross_check:
+            indices, distances, reverse_indices = knn2_exact(query, train, reverse=True)
+            return filter_matches(indices, distances, ratio, reverse_indices)
+        return filter_matches(*knn2_exact(query, train), ratio=ratio)
+
+    index = index if index is not None else FlannIndex(train)
+    indices, distances = index.knn(query, 2)
+    reverse_indices = None
+    if cross_check:
+        reverse_indices = FlannIndex(query, checks=index.checks).knn(train, 1)[0][:, 0]
+    return filter_matches(indices, distances, ratio, reverse_indices)
+
+
+def to_dmatches(matches):
+    """
+    Mengubah array MATCH_DTYPE menjadi list cv2.DMatch (untuk cv2.drawMatches).
+    """
+    return [cv2.DMatch(int(m["query"]), int(m["train"]), float(m["distance"])) for m in matches]
@@ -0,0 +1,98 @@
+# common/median.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Median filter kernel besar untuk gambar uint16, yang ditolak
+#        cv2.medianBlur jika kernel > 5. Modul ini TIDAK punya engine uint8
+#        sendiri: gambar uint8 (dan kernel <= 5) selalu diteruskan ke
+#        cv2.medianBlur, yang untuk uint8 sudah memakai histogram
+#        waktu-konstan dan lebih cepat dari implementasi apa pun di Python.
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Ukuran kernel terbesar yang diterima
+MAX_KSIZE = 255
+
+# cv2.medianBlur menerima kernel > 5 hanya untuk uint8; kernel 3 dan 5 juga
+# untuk dtype berikut
+OPENCV_MAX_KSIZE = 5
+OPENCV_SMALL_KERNEL_DTYPES = (np.uint8, np.uint16, np.float32)
+
+# Dtype yang ditangani modul ini untuk kernel > 5
+ENGINE_DTYPES = (np.uint16,)
+
+# Jumlah elemen jendela maksimum per blok baris pada fallback np.median
+MEDIAN_BLOCK_ELEMENTS = 1 << 24
+
+
+def _median_ranks(image, values, ranks, ksize):
+    # Paling banyak 256 nilai unik: rank muat di uint8 dan median komutatif
+    # dengan pemetaan rank -> nilai (monoton naik), jadi cukup satu
+    # cv2.medianBlur uint8
+    levels = ranks.reshape(image.shape).astype(np.uint8)
+    return values[cv2.medianBlur(levels, ksize)]
+
+
+def _median_windows(image, ksize):
+    # np.median setiap jendela ksize x ksize (border replicate), per blok
+    # baris agar memori sementara dibatasi MEDIAN_BLOCK_ELEMENTS
+    padded = np.pad(image, ksize // 2, mode="edge")
+    rows = max(1, MEDIAN_BLOCK_ELEMENTS // (image.shape[1] * ksize * ksize))
+    out = np.empty_like(image)
+    for y in range(0, image.shape[0], rows):
+        windows = sliding_window_view(padded[y:y + rows + ksize - 1], (ksize, ksize))
+        out[y:y + rows] = np.median(windows, axis=(2, 3))
+    return out
+
+
+def _median_channel(image, ksize):
+    values, ranks = np.unique(image, return_inverse=True)
+    if len(values) <= 256:
+        return _median_ranks(image, values, ranks, ksize)
+    return _median_windows(image, ksize)
+
+
+def check_median(dtype, ksize):
+    """
+    Memastikan median_blur mendukung kombinasi dtype dan ksize ini, sehingga
+    pemanggil (misalnya mode tiled) bisa menolak input sebelum ada output
+    yang ditulis. ValueError jika tidak didukung.
+    """
+    if ksize % 2 == 0 or not 1 <= ksize <= MAX_KSIZE:
+        raise ValueError(f"ksize harus ganjil antara 1 dan {MAX_KSIZE}: {ksize}")
+    dtype = np.dtype(dtype)
+    if ksize == 1 or dtype == np.uint8 or dtype in ENGINE_DTYPES:
+        return
+    if ksize <= OPENCV_MAX_KSIZE and dtype in OPENCV_SMALL_KERNEL_DTYPES:
+        return
+    raise ValueError(f"Median {ksize}x{ksize} tidak didukung untuk {dtype}: kernel > "
+                     f"{OPENCV_MAX_KSIZE} hanya untuk uint8 dan uint16")
+
+
+def median_blur(image, ksize):
+    """
+    Median filter ksize x ksize (ganjil, 1..MAX_KSIZE) dengan border
+    replicate, hasil identik dengan cv2.medianBlur di semua kasus yang
+    didukung OpenCV.
+
+    Gambar uint8 (semua kernel) serta uint16/float32 dengan kernel <= 5
+    diteruskan ke cv2.medianBlur. Hanya uint16 dengan kernel > 5 yang
+    ditangani di sini, dengan batas biaya yang jelas:
+    - <= 256 nilai unik (misalnya data 8-bit yang disimpan 16-bit, label,
+      scan terkuantisasi): np.unique + satu cv2.medianBlur uint8 pada rank.
+    - lebih dari itu: np.median per jendela, O(piksel x ksize²) dengan
+      memori sementara dibatasi MEDIAN_BLOCK_ELEMENTS.
+    Dtype lain dengan kernel > 5 ditolak (ValueError).
+    Gambar berwarna difilter per kanal.
+    """
+    check_median(image.dtype, ksize)
+    if ksize == 1:
+        return image.copy()
+    if image.dtype == np.uint8 or ksize <= OPENCV_MAX_KSIZE:
+        return cv2.medianBlur(image, ksize)
+    if image.ndim == 3:
+        return cv2.merge([_median_channel(np.ascontiguousarray(channel), ksize)
+                          for channel in cv2.split(image)])
+    return _median_channel(image, ksize)
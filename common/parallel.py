@@ -0,0 +1,111 @@
+# common/parallel.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Eksekusi paralel per gambar menggunakan process pool untuk semua modul.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from common.trace import flush_trace, span
+from common.writer import AsyncImageWriter
+
+
+def resolve_workers(workers):
+    """
+    Menentukan jumlah worker yang dipakai. Nilai None atau <= 0 berarti
+    gunakan semua core yang tersedia.
+    """
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def opencv_threads_per_worker(workers):
+    """
+    Membagi core yang tersedia ke setiap worker agar thread internal
+    OpenCV tidak berebut core (oversubscription).
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def init_worker(num_threads):
+    """
+    Initializer untuk setiap proses worker di dalam pool.
+    """
+    cv2.setNumThreads(num_threads)
+
+
+class _MemmapRef:
+    """
+    Referensi ringan ke array np.memmap. Mem-pickle np.memmap menyalin
+    seluruh isinya, jadi yang dikirim ke worker hanya path dan layout-nya,
+    lalu file dibuka ulang di proses worker.
+    """
+
+    def __init__(self, array):
+        self.filename = array.filename
+        self.dtype = array.dtype
+        self.shape = array.shape
+        self.offset = array.offset
+        self.order = "F" if array.flags.f_contiguous and not array.flags.c_contiguous else "C"
+
+    def open(self):
+        return np.memmap(self.filename, dtype=self.dtype, mode="r", shape=self.shape,
+                         offset=self.offset, order=self.order)
+
+
+def _as_task_image(image):
+    if isinstance(image, np.memmap) and image.filename is not None:
+        return _MemmapRef(image)
+    return image
+
+
+def _run_with_writer(func, image, image_name, output_dir):
+    """
+    Menjalankan satu gambar di proses worker dengan writer miliknya sendiri.
+    Task baru selesai setelah semua gambarnya tertulis ke disk.
+    """
+    if isinstance(image, _MemmapRef):
+        image = image.open()
+    try:
+        with span("image", category="image", image=image_name):
+            with AsyncImageWriter() as writer:
+                return func(image, image_name, output_dir, writer=writer)
+    finally:
+        flush_trace()
+
+
+def map_images(func, images, output_dir, workers=1):
+    """
+    Menjalankan func(image, image_name, output_dir, writer=...) untuk setiap
+    pasangan (image_name, image) pada daftar images.
+
+    Dengan workers == 1 semua gambar diproses berurutan di proses ini.
+    Dengan workers > 1 gambar dikirim ke process pool. Hasil selalu
+    dikembalikan dalam urutan yang sama dengan daftar input, dan fungsi ini
+    baru kembali setelah semua gambar output selesai ditulis ke disk.
+    """
+    workers = min(resolve_workers(workers), max(1, len(images)))
+
+    if workers == 1:
+        results = []
+        with AsyncImageWriter() as writer:
+            for img_name, img_data in images:
+                print(f"Memproses gambar '{img_name}'...")
+                with span("image", category="image", image=img_name):
+                    results.append(func(img_data, img_name, output_dir, writer=writer))
+        return results
+
+    print(f"Memproses {len(images)} gambar dengan {workers} worker paralel...")
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=init_worker,
+                             initargs=(opencv_threads_per_worker(workers),)) as executor:
+        futures = [executor.submit(_run_with_writer, func, _as_task_image(img_data),
+                                   img_name, output_dir)
+                   for img_name, img_data in images]
+        # Ambil hasil sesuai urutan submit agar urutan baris CSV stabil
+        return [future.result() for future in futures]
@@ -0,0 +1,132 @@
+# common/pyramid.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Deteksi tepi multi-skala pada piramida gambar. Piramida dibangun sekali
+#        (setiap level diturunkan dari level sebelumnya), Canny dijalankan per
+#        level untuk banyak threshold sekaligus, hasilnya bisa digabung kembali
+#        ke resolusi penuh, dan level kasar bisa dipakai untuk early exit.
+
+import cv2
+import numpy as np
+
+from common.canny import CannySweep
+
+# Sisi terkecil level piramida; level yang lebih kecil tidak dibuat
+MIN_LEVEL_SIZE = 8
+
+# Metode penggabungan edge map antar level
+FUSE_METHODS = ("max", "mean")
+
+
+def build_pyramid(image, levels):
+    """
+    Mengembalikan [image, 1/2, 1/4, ...] dengan paling banyak levels level
+    tambahan. Setiap level adalah cv2.resize(level_sebelumnya, INTER_AREA)
+    ke setengah ukuran, sehingga level 1 identik dengan downsample tunggal
+    yang dipakai modul edge.
+    """
+    pyramid = [image]
+    for _ in range(levels):
+        rows, cols = pyramid[-1].shape[:2]
+        if min(rows, cols) // 2 < MIN_LEVEL_SIZE:
+            break
+        pyramid.append(cv2.resize(pyramid[-1], (cols // 2, rows // 2), interpolation=cv2.INTER_AREA))
+    return pyramid
+
+
+def edge_fraction(edge_map):
+    """
+    Proporsi piksel tepi pada sebuah edge map.
+    """
+    return cv2.countNonZero(edge_map) / edge_map.size
+
+
+class EdgePyramid:
+    """
+    Piramida gambar beserta edge map Canny per level. Level 0 adalah gambar
+    asli, level i berukuran 1/2^i.
+
+    base_level: level dari image yang diberikan, misalnya 1 jika image sudah
+    didekode pada resolusi 1/2. Level di bawahnya tidak tersedia (None) dan
+    shape resolusi penuh diperkirakan dari ukuran image.
+    """
+
+    def __init__(self, image, levels, base_level=0):
+        if image.dtype != np.uint8:
+            image = image.astype(np.uint8)
+        self.base_level = base_level
+        self.images = [None] * base_level + build_pyramid(image, levels - base_level)
+        rows, cols = image.shape[:2]
+        self.shape = (rows << base_level, cols << base_level)
+        self._sweeps = {}
+
+    @property
+    def num_levels(self):
+        return len(self.images)
+
+    def _sweep(self, level):
+        # Gradien dan NMS per level hanya dihitung sekali untuk semua threshold
+        if level not in self._sweeps:
+            self._sweeps[level] = CannySweep(self.images[level])
+        return self._sweeps[level]
+
+    def edges(self, level, thresholds):
+        """
+        Edge map Canny pada satu level untuk daftar pasangan (low, high).
+        """
+        return self._sweep(level).sweep(thresholds)
+
+    def is_empty(self, low_threshold, high_threshold, min_fraction):
+        """
+        True jika level paling kasar hampir tidak memiliki tepi (proporsi
+        piksel tepi < min_fraction). Dipakai untuk early exit pada frame kosong.
+        """
+        coarsest = self.edges(self.num_levels - 1, [(low_threshold, high_threshold)])[0]
+        return edge_fraction(coarsest) < min_fraction
+
+    def detect(self, thresholds, first_level=1, early_exit_fraction=None):
+        """
+        Menjalankan Canny pada level first_level..terakhir, dari level paling
+        kasar ke paling halus. Mengembalikan (maps, early_exit), dengan maps
+        dict {level: [edge map per threshold]}.
+
+        Jika early_exit_fraction diisi dan level paling kasar tidak memiliki
+        tepi yang berarti (threshold pertama), level yang lebih halus tidak
+        dihitung dan early_exit bernilai True.
+        """
+        maps = {}
+        first_level = max(first_level, self.base_level)
+        for level in range(self.num_levels - 1, first_level - 1, -1):
+            maps[level] = self.edges(level, thresholds)
+            if (early_exit_fraction is not None and level == self.num_levels - 1
+                    and edge_fraction(maps[level][0]) < early_exit_fraction):
+                return maps, True
+        return maps, False
+
+    def upsample(self, edge_map):
+        """
+        Mengembalikan edge map sebuah level ke resolusi penuh (nearest neighbor).
+        """
+        if edge_map.shape[:2] == self.shape:
+            return edge_map
+        return cv2.resize(edge_map, (self.shape[1], self.shape[0]), interpolation=cv2.INTER_NEAREST)
+
+    def fuse(self, edge_maps, method="max"):
+        """
+        Menggabungkan edge map dari beberapa level ke resolusi penuh.
+        "max": piksel tepi jika tepi di level mana pun; "mean": rata-rata
+        (0-255) sehingga tepi yang muncul di banyak skala lebih terang.
+        """
+        if method not in FUSE_METHODS:
+            raise ValueError(f"Metode fusion tidak dikenal: {method}")
+        upsampled = [self.upsample(edge_map) for edge_map in edge_maps]
+        if method == "max":
+            fused = upsampled[0].copy()
+            for edge_map in upsampled[1:]:
+                np.maximum(fused, edge_map, out=fused)
+            return fused
+        total = np.zeros(self.shape, dtype=np.uint16)
+        for edge_map in upsampled:
+            total += edge_map
+        return (total // len(upsampled)).astype(np.uint8)
@@ -0,0 +1,230 @@
+# common/run_cache.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Cache run inkremental berbasis isi. Setiap gambar diberi kunci
+#        hash(input, fungsi proses, parameter, versi library, source code);
+#        input berupa piksel, atau kunci sumber untuk ImageRef sehingga cache
+#        dapat diperiksa sebelum gambar didekode. Jika kuncinya sama dan
+#        semua file output yang tercatat masih utuh, gambar tidak diproses
+#        (maupun didekode) ulang dan baris tabel parameternya diambil dari
+#        manifest di folder output.
+
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from common.image_source import ImageRef, image_digest, resolve_images
+from common.parallel import map_images
+from common.writer import recording_outputs
+
+# Nama environment variable untuk menonaktifkan cache ("0").
+# Disimpan di environment agar ikut diwariskan ke proses modul dan worker.
+RUN_CACHE_ENV = "CV_RUN_CACHE"
+
+# Manifest cache di setiap folder output
+MANIFEST_NAME = ".run_cache.json"
+MANIFEST_VERSION = 2
+
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def set_run_cache_enabled(enabled):
+    """
+    Mengaktifkan atau menonaktifkan cache run untuk proses ini dan turunannya.
+    """
+    if enabled:
+        os.environ.pop(RUN_CACHE_ENV, None)
+    else:
+        os.environ[RUN_CACHE_ENV] = "0"
+
+
+def run_cache_enabled():
+    return os.environ.get(RUN_CACHE_ENV, "1") != "0"
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _func_digest(func):
+    """
+    Sidik jari fungsi proses: nama, argumen functools.partial, source file
+    fungsi beserta semua modul common/, dan versi library yang menentukan
+    hasilnya.
+    """
+    args, keywords = (), {}
+    while isinstance(func, functools.partial):
+        args = func.args + args
+        keywords = {**func.keywords, **keywords}
+        func = func.func
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(func.__qualname__.encode("utf-8"))
+    h.update(repr(args).encode("utf-8"))
+    h.update(repr(sorted(keywords.items())).encode("utf-8"))
+    h.update(f"{cv2.__version__}|{np.__version__}|{pd.__version__}".encode("ascii"))
+    for path in [inspect.getsourcefile(func)] + sorted(glob.glob(os.path.join(COMMON_DIR, "*.py"))):
+        h.update(_file_digest(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def _content_digest(image):
+    """
+    Sidik jari isi gambar. Raster ter-memory-map memakai path, mtime, dan
+    layout file-nya agar file besar tidak perlu dibaca seluruhnya; ImageRef
+    memakai kunci sumbernya tanpa didekode.
+    """
+    if isinstance(image, ImageRef):
+        return image.digest()
+    if isinstance(image, np.memmap) and image.filename is not None:
+        stat = os.stat(image.filename)
+        return repr(("memmap", os.path.abspath(image.filename), stat.st_mtime_ns, stat.st_size,
+                     image.offset, image.shape, image.dtype.str))
+    return image_digest(image)
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class RunCache:
+    """
+    Manifest cache untuk satu folder output dan satu fungsi proses. Entri
+    per gambar menyimpan kunci, baris DataFrame hasil fungsi, dan ukuran
+    serta mtime setiap file output yang ditulis fungsi itu; entri hanya
+    valid jika semua file itu masih ada dan tidak berubah.
+    """
+
+    def __init__(self, output_dir, func):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.func_digest = _func_digest(func)
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("entries", {})
+
+    def key(self, image_name, image):
+        h = hashlib.blake2b(digest_size=16)
+        for part in (self.func_digest, image_name, _content_digest(image)):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def lookup(self, image_name, key):
+        """
+        DataFrame hasil yang tersimpan, atau None jika tidak ada entri yang
+        valid untuk kunci ini.
+        """
+        entry = self.entries.get(image_name)
+        if entry is None or entry["key"] != key:
+            return None
+        for filename, state in entry["files"].items():
+            path = os.path.join(self.output_dir, filename)
+            if not os.path.exists(path) or _file_state(path) != state:
+                return None
+        return pd.DataFrame(entry["rows"]["data"], columns=entry["rows"]["columns"])
+
+    def _output_files(self, paths):
+        """
+        Ukuran dan mtime file output yang tercatat, relatif terhadap folder
+        output. File sementara yang sudah dihapus dan file di luar folder
+        output (ditangani lewat require) diabaikan.
+        """
+        files = {}
+        output_dir = os.path.abspath(self.output_dir)
+        for path in paths:
+            filename = os.path.relpath(path, output_dir)
+            if filename.startswith(os.pardir) or not os.path.exists(path):
+                continue
+            files[filename] = _file_state(path)
+        return files
+
+    def store(self, image_name, key, df, paths):
+        self.entries[image_name] = {
+            "key": key,
+            "rows": json.loads(df.to_json(orient="split", index=False, double_precision=15)),
+            "files": self._output_files(paths),
+        }
+
+    def save(self):
+        # Tulis ke file sementara dulu agar manifest tidak pernah setengah jadi
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+class _RecordOutputs:
+    """
+    Membungkus fungsi proses agar mengembalikan (DataFrame, path output yang
+    ditulis). Kelas top-level supaya tetap bisa di-pickle ke worker.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, image, image_name, output_dir, writer=None):
+        with recording_outputs() as paths:
+            df = self.func(image, image_name, output_dir, writer=writer)
+        return df, list(paths)
+
+
+def map_images_cached(func, images, output_dir, workers=1, require=None):
+    """
+    Sama seperti common.parallel.map_images, tetapi gambar yang input,
+    fungsi, dan parameternya tidak berubah sejak run sebelumnya (dan file
+    outputnya masih utuh) tidak diproses ulang; DataFrame-nya dibaca dari
+    manifest. Urutan hasil tetap sama dengan daftar input.
+
+    Gambar boleh berupa ImageRef (lihat common.image_source); hanya gambar
+    yang tidak ada di cache yang didekode. Gambar yang gagal didekode
+    dilewati dan tidak ada di hasil, sama seperti jika cache dinonaktifkan.
+
+    require: fungsi opsional image_name -> bool untuk output di luar folder
+    output (misalnya feature store); entri cache hanya dipakai jika True.
+    """
+    if not run_cache_enabled():
+        return map_images(func, resolve_images(images), output_dir, workers)
+
+    os.makedirs(output_dir, exist_ok=True)
+    cache = RunCache(output_dir, func)
+    keys, results, pending = {}, {}, []
+    for image_name, image in images:
+        keys[image_name] = cache.key(image_name, image)
+        df = cache.lookup(image_name, keys[image_name])
+        if df is not None and require is not None and not require(image_name):
+            df = None
+        if df is None:
+            pending.append((image_name, image))
+        else:
+            results[image_name] = df
+    if results:
+        print(f"Cache run: {len(results)} gambar tidak berubah, dilewati")
+
+    pending = resolve_images(pending)
+    for (image_name, _), (df, paths) in zip(pending, map_images(_RecordOutputs(func), pending, output_dir, workers)):
+        results[image_name] = df
+        if df is not None:
+            cache.store(image_name, keys[image_name], df, paths)
+    cache.save()
+    return [results[image_name] for image_name, _ in images if results.get(image_name) is not None]
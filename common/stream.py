@@ -0,0 +1,387 @@
+# common/stream.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Mode streaming untuk video atau urutan frame. Frame dibaca lewat
+#        cv2.VideoCapture lalu mengalir lewat pipeline generator (decode ->
+#        filtering -> edge -> fitur -> geometri -> writer) yang setiap
+#        stage-nya berjalan di thread sendiri dengan antrian terbatas di
+#        antaranya, sehingga klip tidak pernah ditampung seluruhnya di memori.
+#        Throughput (fps) dan persentil latensi per stage dilaporkan di akhir.
+
+import csv
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from common.fast import MultiThresholdFAST, to_cv_keypoints
+from common.pyramid import build_pyramid, edge_fraction
+from common.sweep import DEFAULT_SWEEP
+from common.trace import span
+from common.warp import warp
+from common.writer import AsyncImageWriter
+
+# Ekstensi gambar yang dibaca jika sumber berupa folder urutan frame
+FRAME_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# Stage yang tersedia, dengan nama yang sama seperti modul di main_integration
+STREAM_STAGES = ("filtering", "edge", "featurepoints", "geometry")
+
+# Jumlah frame maksimum yang menunggu di setiap antrian antar stage
+DEFAULT_QUEUE_SIZE = 4
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+# Parameter per frame: nilai tengah sweep bawaan setiap modul, satu per stage
+STREAM_GAUSSIAN_KSIZE = DEFAULT_SWEEP["filtering"]["gaussian_ksizes"][1]
+STREAM_MEDIAN_KSIZE = DEFAULT_SWEEP["filtering"]["median_ksizes"][1]
+STREAM_CANNY_THRESHOLD = DEFAULT_SWEEP["edge"]["canny_thresholds"][0][:2]
+STREAM_FAST_THRESHOLD = DEFAULT_SWEEP["featurepoints"]["fast_thresholds"][1]
+STREAM_PYRAMID_LEVELS = 3
+
+# Penanda akhir stream di antrian
+_END = object()
+
+
+class StreamFrame:
+    """
+    Satu frame yang mengalir di pipeline: gambar grayscale, statistik untuk
+    baris CSV, gambar hasil yang akan ditulis (akhiran nama file -> gambar),
+    dan waktu proses setiap stage dalam ms.
+    """
+
+    def __init__(self, index, image, started):
+        self.index = index
+        self.image = image
+        self.started = started
+        self.stats = {"Frame": index}
+        self.outputs = {}
+        self.timings = {}
+
+
+class FrameSource:
+    """
+    Sumber frame grayscale untuk mode streaming. source dapat berupa file
+    video, pola urutan gambar printf (misalnya frames/img_%04d.png), indeks
+    kamera ("0"), yang semuanya dibaca dengan cv2.VideoCapture, atau folder
+    berisi gambar (dibaca urut nama). fps diisi dari CAP_PROP_FPS jika
+    diketahui.
+    """
+
+    def __init__(self, source, max_frames=None):
+        self.source = source
+        self.max_frames = max_frames
+        self.fps = None
+
+    def _read_capture(self):
+        capture = cv2.VideoCapture(int(self.source) if self.source.isdigit() else self.source)
+        if not capture.isOpened():
+            raise IOError(f"Sumber video tidak dapat dibuka: {self.source}")
+        try:
+            self.fps = capture.get(cv2.CAP_PROP_FPS) or None
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    return
+                yield frame
+        finally:
+            capture.release()
+
+    def _read_directory(self):
+        paths = sorted(os.path.join(self.source, name) for name in os.listdir(self.source)
+                       if os.path.splitext(name)[1].lower() in FRAME_EXTENSIONS)
+        for path in paths:
+            frame = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if frame is None:
+                raise IOError(f"Frame tidak dapat didekode: {path}")
+            yield frame
+
+    def __iter__(self):
+        frames = self._read_directory() if os.path.isdir(self.source) else self._read_capture()
+        for index, frame in enumerate(frames):
+            if self.max_frames is not None and index >= self.max_frames:
+                return
+            if frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+            yield frame
+
+
+def filtering_stage(frame):
+    gaussian = cv2.GaussianBlur(frame.image, (STREAM_GAUSSIAN_KSIZE, STREAM_GAUSSIAN_KSIZE), 0)
+    median = cv2.medianBlur(frame.image, STREAM_MEDIAN_KSIZE)
+    frame.stats["Mean Intensitas"] = round(float(cv2.mean(frame.image)[0]), 2)
+    frame.outputs[f"gaussian_{STREAM_GAUSSIAN_KSIZE}x{STREAM_GAUSSIAN_KSIZE}"] = gaussian
+    frame.outputs[f"median_{STREAM_MEDIAN_KSIZE}x{STREAM_MEDIAN_KSIZE}"] = median
+
+
+def make_edge_stage(early_exit_fraction=None):
+    """
+    Canny resolusi penuh satu threshold. Dengan early_exit_fraction, frame
+    yang level piramida paling kasarnya hampir tanpa tepi tidak diproses di
+    resolusi penuh (sama seperti EdgePyramid.detect). Untuk satu threshold
+    per frame cv2.Canny langsung lebih murah daripada CannySweep (hasilnya
+    identik), dan gradien frame video tidak perlu masuk cache gradien.
+    """
+    low, high = STREAM_CANNY_THRESHOLD
+
+    def edge_stage(frame):
+        if early_exit_fraction is not None:
+            coarsest = build_pyramid(frame.image, STREAM_PYRAMID_LEVELS)[-1]
+            fraction = edge_fraction(cv2.Canny(coarsest, low, high))
+            if fraction < early_exit_fraction:
+                frame.stats["Edge Fraction"] = round(fraction, 5)
+                frame.stats["Early Exit"] = True
+                return
+        edges = cv2.Canny(frame.image, low, high)
+        frame.stats["Edge Fraction"] = round(edge_fraction(edges), 5)
+        frame.stats["Early Exit"] = False
+        frame.outputs["canny"] = edges
+    return edge_stage
+
+
+def featurepoints_stage(frame):
+    points = MultiThresholdFAST(frame.image, STREAM_FAST_THRESHOLD).detect(STREAM_FAST_THRESHOLD)
+    frame.stats["FAST Keypoints"] = len(points)
+    frame.outputs["fast"] = points
+
+
+def geometry_stage(frame):
+    # Semua frame berukuran sama, jadi peta remap dibangun sekali lalu diambil dari cache
+    rows, cols = frame.image.shape[:2]
+    src = np.float32([[0, 0], [cols - 1, 0], [0, rows - 1], [cols - 1, rows - 1]])
+    dst = np.float32([[cols * fx, rows * fy] for fx, fy in DEFAULT_SWEEP["geometry"]["perspective_dst"]])
+    frame.outputs["perspective"] = warp(frame.image, cv2.getPerspectiveTransform(src, dst))
+
+
+def build_stages(names=STREAM_STAGES, early_exit_fraction=None):
+    """
+    Daftar (nama, fungsi) stage sesuai urutan STREAM_STAGES. Setiap fungsi
+    menerima StreamFrame dan mengisi stats/outputs-nya.
+    """
+    unknown = [name for name in names if name not in STREAM_STAGES]
+    if unknown:
+        raise ValueError(f"Stage tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(STREAM_STAGES)}")
+    functions = {
+        "filtering": filtering_stage,
+        "edge": make_edge_stage(early_exit_fraction),
+        "featurepoints": featurepoints_stage,
+        "geometry": geometry_stage,
+    }
+    return [(name, functions[name]) for name in STREAM_STAGES if name in names]
+
+
+class StreamReport:
+    """
+    Ringkasan satu run streaming: jumlah frame, durasi, throughput, dan
+    latensi per stage (ms per frame). "total" adalah latensi ujung ke ujung
+    dari mulai decode sampai frame selesai di writer, termasuk waktu tunggu
+    di antrian.
+    """
+
+    def __init__(self, frames, elapsed, latencies, source_fps=None):
+        self.frames = frames
+        self.elapsed = elapsed
+        self.latencies = latencies
+        self.source_fps = source_fps
+
+    @property
+    def fps(self):
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def rows(self):
+        rows = []
+        for name, values in self.latencies.items():
+            values = np.asarray(values, dtype=np.float64)
+            row = {"Stage": name, "Frame": len(values)}
+            for p in LATENCY_PERCENTILES:
+                row[f"p{p} (ms)"] = float(np.percentile(values, p)) if len(values) else 0.0
+            row["Maks (ms)"] = float(values.max()) if len(values) else 0.0
+            rows.append(row)
+        return rows
+
+    def format(self):
+        headers = ["Stage", "Frame"] + [f"p{p} (ms)" for p in LATENCY_PERCENTILES] + ["Maks (ms)"]
+        lines = [f"{self.frames} frame dalam {self.elapsed:.2f} detik: {self.fps:.1f} fps"
+                 + (f" (sumber {self.source_fps:.1f} fps, "
+                    f"{'real-time' if self.fps >= self.source_fps else 'lebih lambat dari real-time'})"
+                    if self.source_fps else ""),
+                 f"{headers[0]:<15} {headers[1]:>6} " + " ".join(f"{h:>10}" for h in headers[2:]),
+                 "-" * (23 + 11 * (len(headers) - 2))]
+        for row in self.rows():
+            lines.append(f"{row['Stage']:<15} {row['Frame']:>6} "
+                         + " ".join(f"{row[h]:>10.2f}" for h in headers[2:]))
+        return "\n".join(lines)
+
+
+def _drain(items):
+    # Generator isi antrian sampai penanda akhir
+    while True:
+        item = items.get()
+        if item is _END:
+            return
+        yield item
+
+
+def run_stream(frames, stages, sink, queue_size=DEFAULT_QUEUE_SIZE, source_fps=None):
+    """
+    Menjalankan pipeline streaming. frames adalah iterable gambar (decode
+    dikerjakan saat iterasi), stages daftar (nama, fungsi(StreamFrame)), dan
+    sink fungsi(StreamFrame) yang dipanggil di thread pemanggil untuk setiap
+    frame secara berurutan.
+
+    Decode dan setiap stage berjalan di thread sendiri (operasi OpenCV
+    melepas GIL), dihubungkan oleh queue.Queue(maxsize=queue_size). Jika
+    stage di belakang lebih lambat, antrian penuh dan stage di depannya
+    menunggu (backpressure), sehingga paling banyak sekitar
+    (jumlah stage + 1) * (queue_size + 1) frame ada di memori.
+
+    Error di stage mana pun menghentikan decode; frame yang sudah di
+    antrian dibuang dan error pertama dilempar ulang setelah semua thread
+    selesai. Mengembalikan StreamReport.
+    """
+    names = ["decode"] + [name for name, _ in stages] + ["writer"]
+    latencies = {name: [] for name in names + ["total"]}
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    stop = threading.Event()
+    errors = []
+
+    def fail(error):
+        errors.append(error)
+        stop.set()
+
+    def decode():
+        try:
+            iterator = iter(frames)
+            index = 0
+            while not stop.is_set():
+                started = time.perf_counter()
+                with span("decode", category="stream", frame=index):
+                    image = next(iterator, None)
+                if image is None:
+                    break
+                frame = StreamFrame(index, image, started)
+                frame.timings["decode"] = (time.perf_counter() - started) * 1000
+                queues[0].put(frame)
+                index += 1
+        except Exception as e:
+            fail(e)
+        finally:
+            queues[0].put(_END)
+
+    def run_stage(name, func, inbox, outbox):
+        for frame in _drain(inbox):
+            if stop.is_set():
+                continue
+            try:
+                start = time.perf_counter()
+                with span(name, category="stream", frame=frame.index):
+                    func(frame)
+                frame.timings[name] = (time.perf_counter() - start) * 1000
+                outbox.put(frame)
+            except Exception as e:
+                fail(e)
+        outbox.put(_END)
+
+    threads = [threading.Thread(target=decode, name="stream-decode", daemon=True)]
+    for i, (name, func) in enumerate(stages):
+        threads.append(threading.Thread(target=run_stage, args=(name, func, queues[i], queues[i + 1]),
+                                        name=f"stream-{name}", daemon=True))
+
+    count = 0
+    first_start = last_end = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for frame in _drain(queues[-1]):
+        if stop.is_set():
+            continue
+        try:
+            start = time.perf_counter()
+            with span("writer", category="stream", frame=frame.index):
+                sink(frame)
+            last_end = time.perf_counter()
+            frame.timings["writer"] = (last_end - start) * 1000
+            frame.timings["total"] = (last_end - frame.started) * 1000
+        except Exception as e:
+            fail(e)
+            continue
+        if count == 0:
+            first_start = frame.started
+        count += 1
+        for name, value in frame.timings.items():
+            latencies[name].append(value)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return StreamReport(count, last_end - first_start, latencies, source_fps)
+
+
+class StreamSink:
+    """
+    Stage terakhir: menulis satu baris CSV per frame (langsung ke file,
+    tanpa menampung seluruh klip) dan, setiap save_every frame, gambar hasil
+    setiap stage lewat AsyncImageWriter. save_every 0 berarti hanya CSV.
+    """
+
+    def __init__(self, output_dir, save_every=0):
+        self.output_dir = output_dir
+        self.save_every = save_every
+        self.csv_path = os.path.join(output_dir, "stream_frames.csv")
+        self._file = None
+        self._csv = None
+        self.writer = AsyncImageWriter()
+
+    def __call__(self, frame):
+        if self.save_every and frame.index % self.save_every == 0:
+            prefix = os.path.join(self.output_dir, f"frame_{frame.index:06d}")
+            self.writer.write(f"{prefix}_original.png", frame.image)
+            for suffix, output in frame.outputs.items():
+                if suffix == "fast":
+                    output = cv2.drawKeypoints(frame.image, to_cv_keypoints(output), None, color=(0, 255, 0))
+                self.writer.write(f"{prefix}_{suffix}.png", output)
+
+        row = dict(frame.stats, **{"Latensi (ms)": round((time.perf_counter() - frame.started) * 1000, 2)})
+        if self._csv is None:
+            self._file = open(self.csv_path, "w", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._file, fieldnames=list(row))
+            self._csv.writeheader()
+        self._csv.writerow(row)
+
+    def close(self):
+        try:
+            self.writer.close()
+        finally:
+            if self._file is not None:
+                self._file.close()
+
+
+def stream_video(source, output_dir="stream_output", stages=STREAM_STAGES, queue_size=DEFAULT_QUEUE_SIZE,
+                 max_frames=None, save_every=0, early_exit_fraction=None):
+    """
+    Menjalankan stage streaming pada semua frame source (lihat FrameSource),
+    menulis stream_frames.csv dan stream_report.txt ke output_dir, lalu
+    menampilkan throughput dan persentil latensi. Mengembalikan StreamReport.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    frames = FrameSource(source, max_frames)
+    sink = StreamSink(output_dir, save_every)
+    try:
+        report = run_stream(frames, build_stages(stages, early_exit_fraction), sink, queue_size)
+    finally:
+        sink.close()
+    report.source_fps = frames.fps
+
+    report_path = os.path.join(output_dir, "stream_report.txt")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(f"Sumber: {source}\n")
+        f.write(f"Stage: {', '.join(name for name in STREAM_STAGES if name in stages)}\n")
+        f.write(f"Ukuran antrian: {queue_size}\n\n")
+        f.write(report.format() + "\n")
+    print(report.format())
+    print(f"Statistik per frame disimpan di: '{sink.csv_path}'")
+    print(f"Laporan streaming disimpan di: '{report_path}'")
+    return report
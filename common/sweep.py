@@ -0,0 +1,192 @@
+# common/sweep.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Konfigurasi sweep parameter deklaratif (JSON, atau YAML jika PyYAML
+#        terpasang) untuk semua modul.
+
+import copy
+import itertools
+import json
+import os
+
+# Nama environment variable untuk path file sweep.
+# Disimpan di environment agar ikut diwariskan ke proses modul dan worker.
+SWEEP_ENV = "CV_SWEEP_CONFIG"
+
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+# Sweep bawaan: parameter yang sebelumnya ditulis langsung di setiap modul
+DEFAULT_SWEEP = {
+    "filtering": {
+        "gaussian_ksizes": (3, 5, 7),
+        "median_ksizes": (3, 5, 7),
+    },
+    "edge": {
+        "sobel_ksizes": (3, 5),
+        "canny_thresholds": ((50, 150, "low"), (100, 200, "medium"), (150, 250, "high")),
+    },
+    "featurepoints": {
+        "harris": ((2, 3, 0.04, "default"), (3, 3, 0.04, "larger_block"),
+                   (2, 5, 0.04, "larger_kernel"), (2, 3, 0.06, "higher_k")),
+        "fast_thresholds": (10, 20, 30),
+    },
+    "geometry": {
+        # Titik tujuan perspektif sebagai pecahan (lebar, tinggi) untuk sudut
+        # kiri atas, kanan atas, kiri bawah, kanan bawah
+        "perspective_dst": ((0.15, 0.15), (0.85, 0.1), (0.05, 0.9), (0.95, 0.85)),
+        "rotation_angles": (30,),
+    },
+}
+
+# Label untuk kombinasi threshold Canny dan parameter Harris yang dibuat dari grid
+GRID_LABEL = "sweep"
+
+
+def _values(value, cast):
+    """
+    Daftar nilai dari list biasa atau range {"start", "stop", "step"}
+    (stop tidak termasuk, seperti range()).
+    """
+    if isinstance(value, dict):
+        start, stop, step = value["start"], value["stop"], value.get("step", 1)
+        count = int(round((stop - start) / step))
+        return tuple(cast(start + i * step) for i in range(max(count, 0)))
+    return tuple(cast(v) for v in value)
+
+
+def _odd_ksizes(value, key):
+    ksizes = _values(value, int)
+    if any(k < 1 or k % 2 == 0 for k in ksizes):
+        raise ValueError(f"{key} harus berisi bilangan ganjil positif: {list(ksizes)}")
+    return ksizes
+
+
+def _canny_thresholds(value):
+    """
+    List [low, high] / [low, high, label], atau grid {"low": ..., "high": ...}
+    yang dikembangkan ke semua pasangan dengan low < high.
+    """
+    if isinstance(value, dict):
+        return tuple((low, high, GRID_LABEL)
+                     for low, high in itertools.product(_values(value["low"], int),
+                                                        _values(value["high"], int))
+                     if low < high)
+    return tuple((int(entry[0]), int(entry[1]), str(entry[2]) if len(entry) > 2 else GRID_LABEL)
+                 for entry in value)
+
+
+def _harris_label(block_size, ksize, k):
+    return f"b{block_size}_k{ksize}_{k:g}"
+
+
+def _harris(value):
+    """
+    List [blockSize, ksize, k] / [blockSize, ksize, k, label], atau grid
+    {"block_size": ..., "ksize": ..., "k": ...} (semua kombinasi).
+    """
+    if isinstance(value, dict):
+        return tuple((block_size, ksize, k, _harris_label(block_size, ksize, k))
+                     for block_size, ksize, k in itertools.product(_values(value["block_size"], int),
+                                                                   _values(value["ksize"], int),
+                                                                   _values(value["k"], float)))
+    params = []
+    for entry in value:
+        block_size, ksize, k = int(entry[0]), int(entry[1]), float(entry[2])
+        label = str(entry[3]) if len(entry) > 3 else _harris_label(block_size, ksize, k)
+        params.append((block_size, ksize, k, label))
+    return tuple(params)
+
+
+def _perspective_dst(value):
+    points = tuple((float(x), float(y)) for x, y in value)
+    if len(points) != 4:
+        raise ValueError(f"perspective_dst harus berisi 4 titik, bukan {len(points)}")
+    return points
+
+
+def _angles(value):
+    # Sudut bulat tetap int agar nama file tetap "rotated_30deg"
+    return _values(value, lambda a: int(a) if float(a).is_integer() else float(a))
+
+
+# Parser untuk setiap kunci sweep
+SWEEP_PARSERS = {
+    "filtering": {
+        "gaussian_ksizes": lambda v: _odd_ksizes(v, "gaussian_ksizes"),
+        "median_ksizes": lambda v: _odd_ksizes(v, "median_ksizes"),
+    },
+    "edge": {
+        "sobel_ksizes": lambda v: _odd_ksizes(v, "sobel_ksizes"),
+        "canny_thresholds": _canny_thresholds,
+    },
+    "featurepoints": {
+        "harris": _harris,
+        "fast_thresholds": lambda v: _values(v, int),
+    },
+    "geometry": {
+        "perspective_dst": _perspective_dst,
+        "rotation_angles": _angles,
+    },
+}
+
+
+def parse_sweep(spec):
+    """
+    Menggabungkan spesifikasi sweep (dict hasil JSON/YAML) dengan
+    DEFAULT_SWEEP. Kunci yang tidak disebut memakai nilai bawaan; modul
+    atau kunci yang tidak dikenal menghasilkan ValueError.
+    """
+    sweep = copy.deepcopy(DEFAULT_SWEEP)
+    for module, params in (spec or {}).items():
+        if module not in SWEEP_PARSERS:
+            raise ValueError(f"Modul sweep tidak dikenal: '{module}'. Pilihan: {', '.join(SWEEP_PARSERS)}")
+        for key, value in params.items():
+            if key not in SWEEP_PARSERS[module]:
+                raise ValueError(f"Parameter sweep '{module}.{key}' tidak dikenal. "
+                                 f"Pilihan: {', '.join(SWEEP_PARSERS[module])}")
+            sweep[module][key] = SWEEP_PARSERS[module][key](value)
+    return sweep
+
+
+def load_sweep(path=None):
+    """
+    Membaca file sweep (.json, atau .yaml/.yml jika PyYAML terpasang) dan
+    mengembalikan sweep lengkap. Tanpa path, dikembalikan DEFAULT_SWEEP.
+    """
+    if not path:
+        return copy.deepcopy(DEFAULT_SWEEP)
+    with open(path, "r", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in YAML_EXTENSIONS:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("File sweep YAML membutuhkan PyYAML (pip install pyyaml); "
+                                  "gunakan JSON jika tidak tersedia")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    return parse_sweep(spec)
+
+
+def set_sweep_config(path):
+    """
+    Mengaktifkan (atau menonaktifkan jika None) file sweep untuk proses ini
+    dan turunannya. File langsung divalidasi agar kesalahan terlihat sebelum
+    modul dijalankan.
+    """
+    if path:
+        load_sweep(path)
+        os.environ[SWEEP_ENV] = os.path.abspath(path)
+    else:
+        os.environ.pop(SWEEP_ENV, None)
+
+
+def get_sweep(module=None):
+    """
+    Sweep aktif (dari file di SWEEP_ENV atau bawaan), seluruhnya atau untuk
+    satu modul.
+    """
+    sweep = load_sweep(os.environ.get(SWEEP_ENV))
+    return sweep[module] if module else sweep
+
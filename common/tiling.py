@@ -0,0 +1,310 @@
+# common/tiling.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Eksekusi per tile dengan halo untuk gambar yang sangat besar. Setiap
+#        tile dibaca bersama halo secukupnya sehingga hasilnya identik dengan
+#        pemrosesan satu frame penuh, lalu langsung ditulis ke array output
+#        (misalnya memmap .npy) sehingga memori puncak dibatasi ukuran tile.
+
+import cv2
+import numpy as np
+
+from common.canny import CannySweep
+from common.magnitude import normalize_minmax
+from common.median import median_blur
+from common.writer import record_output
+
+DEFAULT_TILE_SIZE = 1024
+
+# Halo Canny: 1 piksel untuk Sobel 3x3 dan 1 piksel untuk NMS
+CANNY_HALO = 2
+
+# Status piksel pada peta hysteresis tiled
+_NOT_EDGE, _CANDIDATE, _EDGE = 0, 1, 2
+
+
+def iter_tiles(shape, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Menghasilkan batas tile (y0, y1, x0, x1) yang menutupi seluruh gambar.
+    """
+    rows, cols = shape[:2]
+    for y0 in range(0, rows, tile_size):
+        for x0 in range(0, cols, tile_size):
+            yield y0, min(y0 + tile_size, rows), x0, min(x0 + tile_size, cols)
+
+
+def _with_halo(bounds, halo, shape):
+    """
+    Memperluas batas tile dengan halo, dipotong pada tepi gambar. Mengembalikan
+    batas region dan slice posisi tile di dalam region.
+    """
+    y0, y1, x0, x1 = bounds
+    ry0, ry1 = max(0, y0 - halo), min(shape[0], y1 + halo)
+    rx0, rx1 = max(0, x0 - halo), min(shape[1], x1 + halo)
+    inner = (slice(y0 - ry0, y1 - ry0), slice(x0 - rx0, x1 - rx0))
+    return (ry0, ry1, rx0, rx1), inner
+
+
+def to_uint8(image):
+    """
+    Mengubah gambar menjadi uint8 untuk operasi yang hanya menerima 8-bit
+    (Canny). uint16 diskalakan 255 / 65535 dengan pembulatan (bukan dipotong
+    modulo 256); dtype lain ditolak.
+    """
+    if image.dtype == np.uint8:
+        return image
+    if image.dtype == np.uint16:
+        return cv2.convertScaleAbs(np.ascontiguousarray(image), alpha=255 / 65535)
+    raise ValueError(f"Gambar harus uint8 atau uint16, bukan {image.dtype}")
+
+
+class Uint8Tiles:
+    """
+    Tampilan uint8 dari raster uint16 (misalnya memmap) yang dikonversi per
+    potongan dengan to_uint8. Fungsi tiled hanya memakai shape dan slicing,
+    sehingga yang dikonversi hanya tile yang sedang dibaca, bukan seluruh
+    raster.
+    """
+
+    dtype = np.dtype(np.uint8)
+
+    def __init__(self, image):
+        if image.dtype != np.uint16:
+            raise ValueError(f"Uint8Tiles membutuhkan raster uint16, bukan {image.dtype}")
+        self.image = image
+        self.shape = image.shape
+        self.ndim = image.ndim
+
+    def __getitem__(self, index):
+        return to_uint8(self.image[index])
+
+
+def uint8_tiles(image):
+    """
+    Raster uint8 dikembalikan apa adanya, uint16 dibungkus Uint8Tiles, dtype
+    lain ditolak sebelum ada tile yang diproses.
+    """
+    if image.dtype == np.uint8:
+        return image
+    if image.dtype == np.uint16:
+        return Uint8Tiles(image)
+    raise ValueError(f"Gambar harus uint8 atau uint16, bukan {image.dtype}")
+
+
+def open_output(path, shape, dtype=np.uint8):
+    """
+    Membuat array output .npy ter-memory-map yang bisa diisi per tile.
+    """
+    record_output(path)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+
+
+def apply_tiled(image, func, halo, out, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Menjalankan func(region) per tile dan menulis bagian tengahnya ke out.
+
+    Di tepi gambar halo dipotong sehingga func menerapkan mode border-nya
+    sendiri persis seperti pada frame penuh; di dalam gambar halo berisi
+    piksel asli. Hasilnya identik dengan func(image) untuk operasi lokal
+    dengan radius <= halo.
+    """
+    for bounds in iter_tiles(image.shape, tile_size):
+        (ry0, ry1, rx0, rx1), inner = _with_halo(bounds, halo, image.shape)
+        region = np.ascontiguousarray(image[ry0:ry1, rx0:rx1])
+        y0, y1, x0, x1 = bounds
+        out[y0:y1, x0:x1] = func(region)[inner]
+    return out
+
+
+def tiled_gaussian(image, ksize, out, tile_size=DEFAULT_TILE_SIZE):
+    """
+    cv2.GaussianBlur(image, (ksize, ksize), 0) per tile.
+    """
+    return apply_tiled(image, lambda region: cv2.GaussianBlur(region, (ksize, ksize), 0),
+                       ksize // 2, out, tile_size)
+
+
+def tiled_median(image, ksize, out, tile_size=DEFAULT_TILE_SIZE):
+    """
+    median_blur(image, ksize) per tile (common/median.py), sehingga raster
+    uint16 juga bisa difilter dengan kernel > 5.
+    """
+    return apply_tiled(image, lambda region: median_blur(region, ksize),
+                       ksize // 2, out, tile_size)
+
+
+def _sobel_tiles(image, ksize, tile_size):
+    """
+    Menghasilkan (bounds, sobel_x, sobel_y) CV_64F untuk setiap tile.
+    """
+    halo = ksize // 2
+    for bounds in iter_tiles(image.shape, tile_size):
+        (ry0, ry1, rx0, rx1), inner = _with_halo(bounds, halo, image.shape)
+        region = np.ascontiguousarray(image[ry0:ry1, rx0:rx1])
+        sobel_x = cv2.Sobel(region, cv2.CV_64F, 1, 0, ksize=ksize)[inner]
+        sobel_y = cv2.Sobel(region, cv2.CV_64F, 0, 1, ksize=ksize)[inner]
+        yield bounds, sobel_x, sobel_y
+
+
+def tiled_sobel_filtering(image, out_x, out_y, out_magnitude, ksize=3,
+                          tile_size=DEFAULT_TILE_SIZE):
+    """
+    Versi tiled dari Sobel di modul filtering: |Sobel X|, |Sobel Y|, dan
+    magnitude, masing-masing dinormalisasi np.uint8(255 * v / max(v)).
+
+    Normalisasi butuh maksimum global, jadi dikerjakan dua pass: pass pertama
+    hanya mengumpulkan maksimum, pass kedua menghitung ulang gradien per tile
+    dan menulis hasil ternormalisasi.
+    """
+    max_x = max_y = max_mag = 0.0
+    for _, sobel_x, sobel_y in _sobel_tiles(image, ksize, tile_size):
+        max_x = max(max_x, np.max(np.absolute(sobel_x)))
+        max_y = max(max_y, np.max(np.absolute(sobel_y)))
+        max_mag = max(max_mag, np.max(np.sqrt(sobel_x**2 + sobel_y**2)))
+
+    for (y0, y1, x0, x1), sobel_x, sobel_y in _sobel_tiles(image, ksize, tile_size):
+        out_x[y0:y1, x0:x1] = np.uint8(255 * np.absolute(sobel_x) / max_x)
+        out_y[y0:y1, x0:x1] = np.uint8(255 * np.absolute(sobel_y) / max_y)
+        out_magnitude[y0:y1, x0:x1] = np.uint8(255 * np.sqrt(sobel_x**2 + sobel_y**2) / max_mag)
+    return out_x, out_y, out_magnitude
+
+
+def tiled_sobel_minmax(image, ksize, out, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Versi tiled dari Sobel di modul edge: magnitude yang dinormalisasi seperti
+    cv2.normalize(..., 0, 255, cv2.NORM_MINMAX) dengan min/max global (dua pass).
+    """
+    min_mag, max_mag = np.inf, -np.inf
+    for _, sobel_x, sobel_y in _sobel_tiles(image, ksize, tile_size):
+        magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
+        min_mag = min(min_mag, magnitude.min())
+        max_mag = max(max_mag, magnitude.max())
+
+    # Modul edge memanggil cv2.normalize ke float64 lalu astype(np.uint8), jadi
+    # hasilnya dipotong (bukan dibulatkan)
+    for (y0, y1, x0, x1), sobel_x, sobel_y in _sobel_tiles(image, ksize, tile_size):
+        magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
+        normalized = normalize_minmax(magnitude, min_mag, max_mag)
+        out[y0:y1, x0:x1] = normalized.reshape(magnitude.shape).astype(np.uint8)
+    return out
+
+
+def tiled_canny(image, low_threshold, high_threshold, out, tile_size=DEFAULT_TILE_SIZE,
+                state=None):
+    """
+    cv2.Canny(image, low, high) per tile, identik dengan versi frame penuh.
+
+    Gradien dan NMS bersifat lokal (halo 2 piksel), tetapi hysteresis bersifat
+    global. Pass pertama menulis peta status (kandidat / tepi kuat) per tile.
+    Setelah itu hysteresis dijalankan per tile dengan halo 1 piksel dan
+    diulang sampai tidak ada piksel baru yang menjadi tepi, sehingga tepi yang
+    menyeberangi batas tile tetap tersambung.
+
+    state: array uint8 seukuran gambar untuk peta status (misalnya memmap);
+    jika None dibuat di memori.
+    """
+    if state is None:
+        state = np.zeros(image.shape[:2], dtype=np.uint8)
+
+    for bounds in iter_tiles(image.shape, tile_size):
+        (ry0, ry1, rx0, rx1), inner = _with_halo(bounds, CANNY_HALO, image.shape)
+        region = np.ascontiguousarray(image[ry0:ry1, rx0:rx1])
+        gradients = (cv2.Sobel(region, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE),
+                     cv2.Sobel(region, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE))
+        candidates, strong = CannySweep(region, gradients).masks(low_threshold, high_threshold)
+        y0, y1, x0, x1 = bounds
+        state[y0:y1, x0:x1] = (candidates.view(np.uint8) + strong.view(np.uint8))[inner]
+
+    tiles = list(iter_tiles(image.shape, tile_size))
+    changed = True
+    while changed:
+        changed = False
+        for bounds in tiles:
+            (ry0, ry1, rx0, rx1), inner = _with_halo(bounds, 1, image.shape)
+            region = np.array(state[ry0:ry1, rx0:rx1])
+            num_labels, labels = cv2.connectedComponents((region != _NOT_EDGE).view(np.uint8),
+                                                          connectivity=8)
+            keep = np.zeros(num_labels, dtype=bool)
+            keep[labels[region == _EDGE]] = True
+            keep[0] = False
+            promoted = keep[labels][inner] & (region[inner] == _CANDIDATE)
+            if promoted.any():
+                y0, y1, x0, x1 = bounds
+                tile_state = region[inner]
+                tile_state[promoted] = _EDGE
+                state[y0:y1, x0:x1] = tile_state
+                changed = True
+        # Arah sapuan dibalik agar tepi yang merambat ke atas/kiri cepat konvergen
+        tiles.reverse()
+
+    for y0, y1, x0, x1 in iter_tiles(image.shape, tile_size):
+        out[y0:y1, x0:x1] = np.where(state[y0:y1, x0:x1] == _EDGE, 255, 0).astype(np.uint8)
+    return out
+
+
+def tiled_downsample2(image, out, tile_size=DEFAULT_TILE_SIZE):
+    """
+    cv2.resize(image, (cols // 2, rows // 2), interpolation=cv2.INTER_AREA)
+    per tile. Untuk dimensi genap INTER_AREA dengan faktor 2 adalah rata-rata
+    blok 2x2 sehingga hasilnya identik; untuk dimensi ganjil baris/kolom
+    terakhir diabaikan (faktor tepat 2), sedikit berbeda dari resize penuh.
+    """
+    rows, cols = (image.shape[0] // 2) * 2, (image.shape[1] // 2) * 2
+    tile_size = max(2, tile_size - tile_size % 2)
+    for y0, y1, x0, x1 in iter_tiles((rows, cols), tile_size):
+        tile = np.ascontiguousarray(image[y0:y1, x0:x1])
+        out[y0 // 2:y1 // 2, x0 // 2:x1 // 2] = cv2.resize(
+            tile, ((x1 - x0) // 2, (y1 - y0) // 2), interpolation=cv2.INTER_AREA)
+    return out
+
+
+def _translation(tx, ty):
+    return np.array([[1, 0, tx], [0, 1, ty], [0, 0, 1]], dtype=np.float64)
+
+
+def tiled_warp(image, matrix, out, tile_size=DEFAULT_TILE_SIZE, margin=2):
+    """
+    cv2.warpPerspective (matriks 3x3) atau cv2.warpAffine (matriks 2x3) per
+    tile output. Untuk setiap tile, sudut-sudutnya dipetakan balik ke gambar
+    sumber untuk mencari bounding box yang dibutuhkan (ditambah margin untuk
+    interpolasi), sehingga hanya bagian sumber itu yang dibaca.
+
+    Karena matriks per tile mengandung translasi, pembulatan fixed-point
+    OpenCV bisa berbeda sedikit; selisih terhadap warp frame penuh paling
+    banyak 1 level keabuan pada sebagian kecil piksel.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    affine = matrix.shape == (2, 3)
+    full = np.vstack([matrix, [0, 0, 1]]) if affine else matrix
+    inverse = np.linalg.inv(full)
+    rows, cols = image.shape[:2]
+
+    for y0, y1, x0, x1 in iter_tiles(out.shape, tile_size):
+        corners = np.array([[x0, y0, 1], [x1 - 1, y0, 1], [x0, y1 - 1, 1], [x1 - 1, y1 - 1, 1]],
+                           dtype=np.float64).T
+        mapped = inverse @ corners
+        if np.any(mapped[2] <= 0):
+            # Tile melewati garis tak hingga proyeksi, baca seluruh sumber
+            sx0, sy0, sx1, sy1 = 0, 0, cols, rows
+        else:
+            src = mapped[:2] / mapped[2]
+            sx0 = max(0, int(np.floor(src[0].min())) - margin)
+            sy0 = max(0, int(np.floor(src[1].min())) - margin)
+            sx1 = min(cols, int(np.ceil(src[0].max())) + margin + 1)
+            sy1 = min(rows, int(np.ceil(src[1].max())) + margin + 1)
+
+        if sx0 >= sx1 or sy0 >= sy1:
+            # Tile seluruhnya berada di luar gambar sumber
+            out[y0:y1, x0:x1] = 0
+            continue
+
+        roi = np.ascontiguousarray(image[sy0:sy1, sx0:sx1])
+        tile_inverse = _translation(-sx0, -sy0) @ inverse @ _translation(x0, y0)
+        size = (x1 - x0, y1 - y0)
+        flags = cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP
+        if affine:
+            out[y0:y1, x0:x1] = cv2.warpAffine(roi, tile_inverse[:2], size, flags=flags)
+        else:
+            out[y0:y1, x0:x1] = cv2.warpPerspective(roi, tile_inverse, size, flags=flags)
+    return out
@@ -0,0 +1,240 @@
+# common/trace.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Tracing per stage (decode, setiap filter/detektor, imwrite, CSV)
+#        dengan waktu wall, waktu CPU, dan opsional memori yang dialokasikan
+#        (tracemalloc, terpisah karena memperlambat alokasi). Event
+#        dari semua proses (modul dan worker) digabung menjadi satu file
+#        Chrome trace (chrome://tracing atau ui.perfetto.dev) dan tabel
+#        ringkasan per stage.
+
+import atexit
+import contextlib
+import glob
+import json
+import os
+import shutil
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Folder tempat setiap proses menulis event-nya. Disimpan di environment agar
+# ikut diwariskan ke proses modul dan worker; tracing aktif jika diisi.
+TRACE_ENV = "CV_TRACE_DIR"
+
+# Isi "1" untuk mengukur memori (tracemalloc) saat tracing. Tidak aktif
+# secara bawaan: tracemalloc memperlambat setiap alokasi Python/NumPy
+# (misalnya decode semua input 2.1 detik vs 0.35 detik), sehingga waktu
+# dan memori sebaiknya diukur pada run terpisah.
+TRACE_MEMORY_ENV = "CV_TRACE_MEMORY"
+
+_events = []
+_local = threading.local()
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _reset_after_fork():
+    # Proses anak hasil fork mewarisi buffer induk; event itu milik induk
+    _events.clear()
+    _local.__dict__.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def tracing_enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def set_trace_output(path, memory=False):
+    """
+    Mengaktifkan tracing untuk proses ini dan turunannya. Saat proses ini
+    selesai, event semua proses digabung ke file Chrome trace di path dan
+    tabel ringkasan per stage ditampilkan. path None berarti tracing mati.
+    memory: jika True, memori per stage juga diukur dengan tracemalloc
+    (waktu menjadi lebih lambat).
+    """
+    if memory:
+        os.environ[TRACE_MEMORY_ENV] = "1"
+    else:
+        os.environ.pop(TRACE_MEMORY_ENV, None)
+    if not path:
+        os.environ.pop(TRACE_ENV, None)
+        return
+    parts_dir = f"{os.path.abspath(path)}.parts"
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir)
+    os.environ[TRACE_ENV] = parts_dir
+    atexit.register(_export_at_exit, path, parts_dir)
+
+
+def _memory_enabled():
+    # Memori hanya diukur di thread utama: tracemalloc menghitung alokasi
+    # seluruh proses, jadi angka per span hanya bermakna di thread pemroses
+    return (os.environ.get(TRACE_MEMORY_ENV) == "1"
+            and threading.current_thread() is threading.main_thread())
+
+
+class _Span:
+    """
+    Satu interval waktu. Memori yang dicatat: selisih alokasi bersih
+    (alloc_mb) dan puncak alokasi di atas titik awal (peak_mb), termasuk
+    span di dalamnya. tracemalloc hanya melihat alokasi Python/NumPy
+    (termasuk array hasil OpenCV), bukan buffer sementara di dalam OpenCV.
+    Waktu CPU adalah waktu thread pemanggil; thread internal OpenCV tidak
+    ikut terhitung.
+    """
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.track_memory = _memory_enabled()
+
+    def __enter__(self):
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            stack = _local.__dict__.setdefault("stack", [])
+            current, peak = tracemalloc.get_traced_memory()
+            # Puncak sejauh ini milik span induk, simpan sebelum di-reset
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = current
+            self.max_peak = current
+            stack.append(self)
+        self.start_cpu = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        args = dict(self.args, cpu_ms=round((time.thread_time_ns() - self.start_cpu) / 1e6, 3))
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self.max_peak, peak)
+            stack = _local.stack
+            stack.pop()
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            args["alloc_mb"] = round((current - self.start_memory) / 2**20, 3)
+            args["peak_mb"] = round((peak - self.start_memory) / 2**20, 3)
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        _events.append({
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": self.start / 1000, "dur": (end - self.start) / 1000,
+            "pid": os.getpid(), "tid": threading.get_native_id(), "args": args,
+        })
+        return False
+
+
+def span(name, category="stage", **args):
+    """
+    Context manager yang mencatat satu stage jika tracing aktif; tanpa
+    tracing hanya berupa context kosong.
+
+        with span("gaussian", ksize=5):
+            ...
+    """
+    if not tracing_enabled():
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def flush_trace():
+    """
+    Menulis event proses ini ke folder trace. Dipanggil setelah setiap task
+    di proses worker, karena proses pool berhenti tanpa menjalankan atexit.
+    """
+    parts_dir = os.environ.get(TRACE_ENV)
+    if not parts_dir or not _events:
+        return
+    path = os.path.join(parts_dir, f"{os.getpid()}.jsonl")
+    with open(path, "a", encoding="utf-8") as f:
+        for event in _events:
+            f.write(json.dumps(event) + "\n")
+    _events.clear()
+
+
+def collect_events():
+    """
+    Semua event yang sudah di-flush oleh semua proses, urut waktu.
+    """
+    flush_trace()
+    parts_dir = os.environ.get(TRACE_ENV)
+    events = []
+    for path in sorted(glob.glob(os.path.join(parts_dir or "", "*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    return sorted(events, key=lambda event: event["ts"])
+
+
+def summarize(events):
+    """
+    Statistik per (kategori, stage): jumlah panggilan, total dan rata-rata
+    waktu wall, total waktu CPU, serta puncak memori maksimum (None jika
+    memori tidak diukur). Diurutkan dari total waktu terbesar. Waktu bersifat
+    inklusif (span di dalamnya ikut).
+    """
+    groups = defaultdict(list)
+    for event in events:
+        groups[(event["cat"], event["name"])].append(event)
+    rows = []
+    for (category, name), group in groups.items():
+        total_ms = sum(event["dur"] for event in group) / 1000
+        rows.append({
+            "category": category,
+            "name": name,
+            "count": len(group),
+            "total_ms": total_ms,
+            "mean_ms": total_ms / len(group),
+            "max_ms": max(event["dur"] for event in group) / 1000,
+            "cpu_ms": sum(event["args"].get("cpu_ms", 0.0) for event in group),
+            "peak_mb": max((event["args"]["peak_mb"] for event in group if "peak_mb" in event["args"]),
+                           default=None),
+        })
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def format_summary(rows):
+    lines = [f"{'Kategori':<10} {'Stage':<24} {'Jumlah':>7} {'Total (ms)':>11} {'Rata2 (ms)':>11} "
+             f"{'Maks (ms)':>10} {'CPU (ms)':>10} {'Puncak (MB)':>12}",
+             "-" * 101]
+    for row in rows:
+        peak = "-" if row["peak_mb"] is None else f"{row['peak_mb']:.1f}"
+        lines.append(f"{row['category']:<10} {row['name']:<24} {row['count']:>7} {row['total_ms']:>11.1f} "
+                     f"{row['mean_ms']:>11.2f} {row['max_ms']:>10.1f} {row['cpu_ms']:>10.1f} "
+                     f"{peak:>12}")
+    return "\n".join(lines)
+
+
+def export_trace(path, events):
+    """
+    Menulis event sebagai file JSON format Chrome trace, dengan nama proses
+    (modul yang dijalankan di proses itu) sebagai metadata agar mudah
+    dibaca di viewer.
+    """
+    process_names = defaultdict(list)
+    for event in events:
+        if event["cat"] == "module" and event["name"] not in process_names[event["pid"]]:
+            process_names[event["pid"]].append(event["name"])
+    metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": ", ".join(names)}}
+                for pid, names in process_names.items() if names]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+
+def _export_at_exit(path, parts_dir):
+    if os.environ.get(TRACE_ENV) != parts_dir:
+        return
+    events = collect_events()
+    export_trace(path, events)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    print(f"\nRingkasan waktu per stage ({len(events)} event):")
+    print(format_summary(summarize(events)))
+    print(f"Trace disimpan di: '{path}' (buka di chrome://tracing atau ui.perfetto.dev)")
@@ -0,0 +1,135 @@
+# common/writer.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Penulis gambar asinkron. Encoding PNG dan penulisan file dikerjakan
+#        thread di latar belakang (cv2.imencode melepas GIL) dengan antrian
+#        terbatas sehingga pemakaian memori tetap terkendali.
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import cv2
+
+from common.trace import span
+
+# Daftar path output yang sedang dicatat di proses ini (None = tidak mencatat)
+_recorded_outputs = None
+
+
+def record_output(path):
+    """
+    Mencatat file output yang ditulis oleh fungsi proses gambar. Dipanggil
+    oleh setiap titik penulisan (AsyncImageWriter, CompactStore, output .npy
+    tiled, file teks parameter) agar cache run tahu persis file milik
+    gambar mana.
+    """
+    if _recorded_outputs is not None:
+        _recorded_outputs.append(os.path.abspath(path))
+
+
+@contextmanager
+def recording_outputs():
+    """
+    Mengumpulkan path yang dicatat record_output() selama blok with.
+    """
+    global _recorded_outputs
+    previous, _recorded_outputs = _recorded_outputs, []
+    try:
+        yield _recorded_outputs
+    finally:
+        _recorded_outputs = previous
+
+
+class AsyncImageWriter:
+    """
+    Menulis gambar ke disk lewat thread pool di latar belakang.
+
+    write() langsung kembali selama antrian belum penuh. Jika antrian sudah
+    berisi max_pending gambar, write() menunggu sampai ada slot kosong
+    (backpressure). Array yang dikirim ke write() tidak boleh diubah lagi
+    oleh pemanggil sampai flush() selesai.
+    """
+
+    def __init__(self, max_pending=16, num_threads=None):
+        if num_threads is None:
+            num_threads = max(1, min(4, cv2.getNumThreads()))
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True)
+                         for _ in range(num_threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, image, params = item
+                with span("imwrite", category="io", file=os.path.basename(path)):
+                    ext = os.path.splitext(path)[1] or ".png"
+                    ok, encoded = cv2.imencode(ext, image, params)
+                    if not ok:
+                        raise IOError(f"Gagal mengenkode gambar: {path}")
+                    with open(path, "wb") as f:
+                        f.write(encoded.tobytes())
+            except Exception as e:
+                with self._lock:
+                    self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _raise_pending_error(self):
+        with self._lock:
+            if self._errors:
+                error = self._errors[0]
+                self._errors.clear()
+                raise error
+
+    def write(self, path, image, params=None):
+        """
+        Menjadwalkan penulisan gambar. Signature sama dengan cv2.imwrite
+        sehingga keduanya bisa saling menggantikan. Selalu mengembalikan True;
+        error penulisan dilaporkan oleh write() berikutnya atau flush().
+        """
+        if self._closed:
+            raise RuntimeError("AsyncImageWriter sudah ditutup")
+        self._raise_pending_error()
+        record_output(path)
+        self._queue.put((path, image, params if params is not None else []))
+        return True
+
+    def flush(self):
+        """
+        Menunggu sampai semua gambar di antrian selesai ditulis ke disk.
+        """
+        self._queue.join()
+        self._raise_pending_error()
+
+    def close(self):
+        """
+        Menulis semua sisa antrian lalu menghentikan thread.
+        """
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -8,37 +8,121 @@ import os
 import sys
 import time
 import importlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
-def run_module(module_name, script_path):
+from common.cli import apply_common_args, build_parser
+from common.image_source import preload_images
+from common.parallel import init_worker, opencv_threads_per_worker, resolve_workers
+from common.run_cache import run_cache_enabled
+from common.stream import DEFAULT_QUEUE_SIZE, stream_video
+from common.trace import collect_events, flush_trace, format_summary, span, summarize, tracing_enabled
+
+# Daftar modul: nama -> (nama import, path script, dependensi)
+# Keempat modul saling independen sehingga semuanya bisa berjalan bersamaan.
+MODULES = {
+    "filtering": ("01_filtering.filtering", "01_filtering/filtering.py", []),
+    "edge": ("02_edge.edge", "02_edge/edge.py", []),
+    "featurepoints": ("03_featurepoints.featurepoints", "03_featurepoints/featurepoints.py", []),
+    "geometry": ("04_geometry.geometry", "04_geometry/geometry.py", []),
+}
+
+def run_module(module_name, script_path, workers=1, render=True):
     """
     Menjalankan modul tertentu dan menangani error.
+    Mengembalikan tuple (berhasil, durasi dalam detik).
+    render: False untuk mode statistik (--no-render).
     """
     print(f"\n{'='*60}")
     print(f"Menjalankan modul: {module_name}")
     print(f"{'='*60}")
     
+    start = time.perf_counter()
     try:
         # Import dan jalankan modul
-        if module_name == "filtering":
-            module = importlib.import_module("01_filtering.filtering")
-            module.main()
-        elif module_name == "edge":
-            module = importlib.import_module("02_edge.edge")
-            module.main()
-        elif module_name == "featurepoints":
-            module = importlib.import_module("03_featurepoints.featurepoints")
-            module.main()
-        elif module_name == "geometry":
-            module = importlib.import_module("04_geometry.geometry")
-            module.main()
+        import_name = MODULES[module_name][0]
+        module = importlib.import_module(import_name)
+        with span(module_name, category="module", module=module_name):
+            module.main(workers=workers, render=render)
         
-        print(f"✓ Modul {module_name} berhasil dijalankan")
-        return True
+        duration = time.perf_counter() - start
+        print(f"✓ Modul {module_name} berhasil dijalankan ({duration:.2f} detik)")
+        return True, duration
         
     except Exception as e:
+        duration = time.perf_counter() - start
         print(f"✗ Error dalam modul {module_name}: {str(e)}")
-        return False
+        return False, duration
+    finally:
+        # Proses pool berhenti tanpa atexit, jadi event modul ditulis di sini
+        flush_trace()
+
+def schedule_modules(module_names, jobs=None, workers=1, render=True):
+    """
+    Menjalankan modul sebagai graf dependensi (DAG). Modul yang semua
+    dependensinya sudah berhasil langsung dikirim ke process pool, sehingga
+    modul independen berjalan paralel. Modul yang dependensinya gagal
+    ditandai gagal tanpa dijalankan.
+
+    Mengembalikan dict {nama modul: (berhasil, durasi detik)}.
+    """
+    results = {}
+    pending = []
+    for name in module_names:
+        script_path = MODULES[name][1]
+        if os.path.exists(script_path):
+            pending.append(name)
+        else:
+            print(f"✗ Script tidak ditemukan: {script_path}")
+            results[name] = (False, 0.0)
+
+    jobs = min(resolve_workers(jobs), max(1, len(pending)))
+
+    # Mode berurutan tanpa process pool
+    if jobs == 1:
+        for name in pending:
+            deps = [d for d in MODULES[name][2] if d in module_names]
+            if all(results.get(d, (False, 0))[0] for d in deps):
+                results[name] = run_module(name, MODULES[name][1], workers, render)
+            else:
+                print(f"✗ Modul {name} dilewati karena dependensi gagal")
+                results[name] = (False, 0.0)
+        return results
+
+    # Bagi core ke setiap modul (dan worker per gambar di dalamnya)
+    threads = opencv_threads_per_worker(jobs * resolve_workers(workers))
+    running = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(threads,)) as executor:
+        while pending or running:
+            for name in list(pending):
+                deps = [d for d in MODULES[name][2] if d in module_names]
+                if any(d in results and not results[d][0] for d in deps):
+                    print(f"✗ Modul {name} dilewati karena dependensi gagal")
+                    results[name] = (False, 0.0)
+                    pending.remove(name)
+                elif all(d in results for d in deps):
+                    future = executor.submit(run_module, name, MODULES[name][1], workers, render)
+                    running[future] = name
+                    pending.remove(name)
+
+            if not running:
+                # Sisa modul tidak bisa dijadwalkan (dependensi melingkar)
+                for name in pending:
+                    print(f"✗ Modul {name} tidak dapat dijadwalkan")
+                    results[name] = (False, 0.0)
+                pending = []
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"✗ Proses modul {name} berhenti tidak normal: {str(e)}")
+                    results[name] = (False, 0.0)
+    return results
 
 def create_summary_report():
     """
@@ -68,7 +152,8 @@ def create_summary_report():
             f.write("-" * 20 + "\n")
             
             if os.path.exists(output_dir):
-                files = os.listdir(output_dir)
+                # File tersembunyi (manifest cache run, file sementara) tidak dihitung
+                files = [file for file in os.listdir(output_dir) if not file.startswith(".")]
                 f.write(f"  Output directory: {output_dir}\n")
                 f.write(f"  Jumlah file: {len(files)}\n")
                 f.write(f"  File yang dihasilkan:\n")
@@ -77,6 +162,12 @@ def create_summary_report():
             else:
                 f.write(f"  Output directory tidak ditemukan: {output_dir}\n")
             f.write("\n")
+
+        # Tabel waktu per stage dari semua proses (hanya jika --trace dipakai)
+        if tracing_enabled():
+            f.write("Profil Per Stage (--trace):\n")
+            f.write("-" * 20 + "\n")
+            f.write(format_summary(summarize(collect_events())) + "\n\n")
         
         f.write("CATATAN:\n")
         f.write("- Pastikan semua gambar standar diproses dengan benar\n")
@@ -85,37 +176,39 @@ def create_summary_report():
     
     print(f"✓ Laporan ringkasan disimpan di: {summary_file}")
 
-def main():
+def main(only=None, jobs=None, workers=1, render=True):
     """
     Fungsi utama untuk menjalankan seluruh pipeline Computer Vision.
+
+    only: daftar nama modul yang dijalankan (default semua modul).
+    jobs: jumlah modul yang berjalan bersamaan (default semua modul sekaligus).
+    workers: jumlah proses paralel per gambar di dalam setiap modul.
+    render: jika False, modul hanya menulis statistik dan array ringkas
+    tanpa overlay dan PNG (mode --no-render).
     """
     print(f"Dimulai pada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Daftar modul yang akan dijalankan
-    modules = [
-        ("filtering", "01_filtering/filtering.py"),
-        ("edge", "02_edge/edge.py"),
-        ("featurepoints", "03_featurepoints/featurepoints.py"),
-        ("geometry", "04_geometry/geometry.py")
-    ]
+    module_names = list(MODULES) if not only else list(only)
+    unknown = [name for name in module_names if name not in MODULES]
+    if unknown:
+        raise ValueError(f"Modul tidak dikenal: {', '.join(unknown)}. "
+                         f"Pilihan: {', '.join(MODULES)}")
     
-    successful_modules = []
-    failed_modules = []
-    
-    # Jalankan setiap modul
-    for module_name, script_path in modules:
-        if os.path.exists(script_path):
-            success = run_module(module_name, script_path)
-            if success:
-                successful_modules.append(module_name)
-            else:
-                failed_modules.append(module_name)
-        else:
-            print(f"✗ Script tidak ditemukan: {script_path}")
-            failed_modules.append(module_name)
-        
-        # Jeda singkat antar modul
-        time.sleep(1)
+    start = time.perf_counter()
+    if not run_cache_enabled():
+        # Dekode semua input sekali; proses modul mewarisi cache ini. Dengan
+        # cache run aktif, modul memeriksa cache lebih dulu dan hanya
+        # mendekode gambar yang berubah, jadi input tidak didekode di sini.
+        with span("preload", category="pipeline", modules=module_names):
+            preload_images()
+
+    # Jalankan modul sesuai graf dependensi
+    results = schedule_modules(module_names, jobs, workers, render)
+    total_duration = time.perf_counter() - start
+
+    successful_modules = [name for name in module_names if results[name][0]]
+    failed_modules = [name for name in module_names if not results[name][0]]
     
     # Buat laporan ringkasan
     create_summary_report()
@@ -131,6 +224,12 @@ def main():
     print(f"Modul gagal: {len(failed_modules)}")
     for module in failed_modules:
         print(f"{module}")
+
+    print("\nWaktu eksekusi per modul:")
+    for name in module_names:
+        success, duration = results[name]
+        print(f"  {'✓' if success else '✗'} {name:<15} {duration:7.2f} detik")
+    print(f"  Total waktu: {total_duration:.2f} detik")
     
     if len(failed_modules) == 0:
         print("\nSemua modul berhasil dijalankan!")
@@ -141,6 +240,33 @@ def main():
         print("Periksa error message di atas untuk troubleshooting")
     
     print(f"\nSelesai pada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return results
 
 if __name__ == "__main__":
-    main()
+    parser = build_parser("Menjalankan seluruh pipeline Computer Vision")
+    parser.add_argument("--only", type=str, default=None,
+                        help="Modul yang dijalankan, dipisah koma (contoh: filtering,edge)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Jumlah modul yang berjalan bersamaan (default semua, 1 = berurutan)")
+    parser.add_argument("--stream", type=str, default=None, metavar="SOURCE",
+                        help="Mode streaming: file video, pola urutan gambar (img_%%04d.png), "
+                             "folder frame, atau indeks kamera")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Mode streaming: panjang antrian antar stage (default 4)")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Mode streaming: berhenti setelah sejumlah frame")
+    parser.add_argument("--save-every", type=int, default=0,
+                        help="Mode streaming: simpan PNG hasil setiap N frame (default 0 = hanya CSV)")
+    parser.add_argument("--early-exit-fraction", type=float, default=None,
+                        help="Mode streaming: lewati Canny resolusi penuh pada frame yang hampir tanpa tepi")
+    args = parser.parse_args()
+    apply_common_args(args)
+    only = [name.strip() for name in args.only.split(",") if name.strip()] if args.only else None
+    if only and any(name not in MODULES for name in only):
+        parser.error(f"--only harus berisi nama modul dari: {', '.join(MODULES)}")
+    if args.stream:
+        stream_video(args.stream, stages=only or list(MODULES), queue_size=args.queue_size,
+                     max_frames=args.max_frames, save_every=args.save_every,
+                     early_exit_fraction=args.early_exit_fraction)
+        sys.exit(0)
+    main(only=only, jobs=args.jobs, workers=args.workers, render=not args.no_render)
@@ -28,7 +28,7 @@ def verify_outputs():
     
     for folder in required_folders:
         if os.path.exists(folder):
-            files = os.listdir(folder)
+            files = [file for file in os.listdir(folder) if not file.startswith(".")]
             print(f"{folder}: {len(files)} file(s)")
             if len(files) == 0:
                 print(f"Folder kosong")
@@ -0,0 +1,61 @@
+# test_calibration.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kalibrasi multi-view (common/calibration.py) pada view papan
+#        catur sintetis dengan kamera yang diketahui.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.calibration import calibrate_directory, detect_view
+
+PATTERN_SIZE = (9, 6)
+IMAGE_SIZE = (960, 540)
+CAMERA_MATRIX = np.array([[1050.0, 0, 480], [0, 1050.0, 270], [0, 0, 1]])
+
+
+def _write_views(directory, count, seed=0):
+    rng = np.random.default_rng(seed)
+    square = 48
+    cols, rows = PATTERN_SIZE[0] + 1, PATTERN_SIZE[1] + 1
+    cells = (np.indices((rows, cols)).sum(axis=0) % 2).astype(np.uint8) * 255
+    texture = np.full(((rows + 2) * square, (cols + 2) * square), 255, dtype=np.uint8)
+    texture[square:-square, square:-square] = np.kron(cells, np.ones((square, square), dtype=np.uint8))
+    world_to_texture = np.array([[square, 0, 2 * square - 0.5], [0, square, 2 * square - 0.5], [0, 0, 1]])
+    center = np.array([(PATTERN_SIZE[0] - 1) / 2, (PATTERN_SIZE[1] - 1) / 2, 0.0])
+    for i in range(count):
+        rotation, _ = cv2.Rodrigues(np.deg2rad([rng.uniform(-30, 30), rng.uniform(-30, 30), rng.uniform(-15, 15)]))
+        translation = np.array([rng.uniform(-1, 1), rng.uniform(-0.5, 0.5), rng.uniform(14, 18)]) - rotation @ center
+        homography = CAMERA_MATRIX @ np.column_stack([rotation[:, 0], rotation[:, 1], translation])
+        homography = homography @ np.linalg.inv(world_to_texture)
+        view = cv2.warpPerspective(texture, homography, IMAGE_SIZE, flags=cv2.INTER_AREA, borderValue=128)
+        cv2.imwrite(str(directory / f"view_{i:02d}.png"), cv2.GaussianBlur(view, (3, 3), 0))
+
+
+@pytest.fixture(scope="module")
+def views(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("views")
+    _write_views(directory, 8)
+    return directory
+
+
+def test_detect_view_corner_shape(views):
+    size, corners, _ = detect_view(str(views / "view_00.png"), PATTERN_SIZE)
+    assert size == IMAGE_SIZE
+    assert corners.shape == (PATTERN_SIZE[0] * PATTERN_SIZE[1], 1, 2)
+    assert corners.dtype == np.float32
+
+
+def test_view_errors_match_overall_rms(views):
+    result, report = calibrate_directory(str(views), PATTERN_SIZE)
+    assert all(found for _, found, _, _ in report)
+    assert result.rms < 0.5
+    # Error per view harus sebanding dengan RMS keseluruhan (dulu ratusan piksel
+    # karena selisih Nx1x2 - Nx2 ter-broadcast menjadi NxNx2)
+    assert len(result.view_errors) == len(result.views)
+    assert max(result.view_errors) < 3 * result.rms + 0.05
+    overall = np.sqrt(np.mean(np.square(result.view_errors)))
+    assert overall == pytest.approx(result.rms, rel=0.05, abs=0.01)
+    assert abs(result.camera_matrix[0, 0] - CAMERA_MATRIX[0, 0]) < 5
@@ -0,0 +1,38 @@
+# test_canny.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kesetaraan CannySweep (common/canny.py) dengan cv2.Canny,
+#        termasuk threshold pecahan dan pasangan low > high yang tertukar.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.canny import CannySweep
+
+THRESHOLDS = [(50, 150), (50, 100), (100, 200), (0, 0), (10.7, 99.5), (150, 50), (200.9, 30.2), (80, 80)]
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.integers(0, 256, (97, 131), dtype=np.uint8), (5, 5), 1.5)
+    checker = (np.indices((120, 120)).sum(axis=0) // 15 % 2 * 255).astype(np.uint8)
+    circle = cv2.circle(np.zeros((90, 110), dtype=np.uint8), (55, 45), 30, 200, -1)
+    return [noise, checker, cv2.GaussianBlur(circle, (3, 3), 0)]
+
+
+@pytest.mark.parametrize("image", _images())
+def test_sweep_matches_opencv(image):
+    results = CannySweep(image).sweep(THRESHOLDS)
+    assert len(results) == len(THRESHOLDS)
+    for (low, high), edges in zip(THRESHOLDS, results):
+        assert np.array_equal(edges, cv2.Canny(image, low, high)), (low, high)
+
+
+def test_edges_with_precomputed_gradients():
+    image = _images()[0]
+    gradients = (cv2.Sobel(image, cv2.CV_16S, 1, 0, borderType=cv2.BORDER_REPLICATE),
+                 cv2.Sobel(image, cv2.CV_16S, 0, 1, borderType=cv2.BORDER_REPLICATE))
+    edges = CannySweep(image, gradients).edges(120, 40)
+    assert np.array_equal(edges, cv2.Canny(image, 120, 40))
@@ -0,0 +1,52 @@
+# test_fast.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kesetaraan MultiThresholdFAST (common/fast.py) dengan
+#        cv2.FastFeatureDetector per threshold.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.fast import MultiThresholdFAST, detect_fast_multi
+
+THRESHOLDS = [5, 10, 17, 25, 40, 60, 100]
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.integers(0, 256, (160, 200), dtype=np.uint8), (3, 3), 0)
+    # Segitiga acak bertumpuk: sudut tajam dengan skor FAST yang bervariasi
+    shapes = np.zeros((150, 150), dtype=np.uint8)
+    for _ in range(80):
+        cv2.fillPoly(shapes, [rng.integers(0, 150, (3, 2)).astype(np.int32)], int(rng.integers(30, 255)))
+    return [noise, shapes]
+
+
+def _reference(image, threshold):
+    keypoints = cv2.FastFeatureDetector_create(threshold=threshold, nonmaxSuppression=True).detect(image, None)
+    return [(kp.pt[0], kp.pt[1], kp.response) for kp in keypoints]
+
+
+@pytest.mark.parametrize("image", _images())
+def test_detect_matches_opencv(image):
+    engine = MultiThresholdFAST(image, min(THRESHOLDS))
+    for threshold in THRESHOLDS:
+        points = engine.detect(threshold)
+        # Sama persis termasuk urutan keypoint
+        assert list(zip(points["x"].tolist(), points["y"].tolist(), points["response"].tolist())) \
+            == _reference(image, threshold), threshold
+        assert len(engine.cv_keypoints_for(threshold)) == len(points)
+
+
+def test_counts_and_shortcut_match_opencv():
+    image = _images()[0]
+    counts, keypoints = detect_fast_multi(image, THRESHOLDS)
+    for threshold in THRESHOLDS:
+        assert counts[threshold] == len(keypoints[threshold]) == len(_reference(image, threshold))
+
+
+def test_rejects_threshold_below_minimum():
+    with pytest.raises(ValueError):
+        MultiThresholdFAST(_images()[0], 20).detect(10)
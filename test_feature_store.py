@@ -0,0 +1,47 @@
+# test_feature_store.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test feature store (common/feature_store.py): deteksi ulang tidak
+#        membuat store tumbuh tanpa batas dan compact() menjaga isi data.
+
+import os
+
+import numpy as np
+
+from common.compact import KEYPOINT_RECORD_DTYPE
+from common.feature_store import AUTO_COMPACT_FRACTION, FeatureStore
+
+
+def _records(count, value):
+    records = np.zeros(count, dtype=KEYPOINT_RECORD_DTYPE)
+    records["x"] = value
+    return records
+
+
+def _write_all(store, value):
+    for name, count in (("a", 100), ("b", 60)):
+        store.append("sift", name, _records(count, value), np.full((count, 128), value, dtype=np.uint8))
+
+
+def test_auto_compact_bounds_growth(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    live_bytes = (100 + 60) * 128
+    for value in range(6):
+        _write_all(store, value)
+        assert store.dead_fraction() <= AUTO_COMPACT_FRACTION
+        assert os.path.getsize(tmp_path / "sift.descriptors") <= 2 * live_bytes + 100 * 128
+    assert np.all(store.descriptors("sift", "a") == 5)
+    assert np.all(store.keypoints("sift", "b")["x"] == 5)
+
+
+def test_manual_compact(tmp_path):
+    store = FeatureStore(str(tmp_path), auto_compact=None)
+    for value in range(3):
+        _write_all(store, value)
+    assert store.dead_fraction() > AUTO_COMPACT_FRACTION
+    store.compact()
+    assert store.dead_fraction() == 0
+    assert os.path.getsize(tmp_path / "sift.descriptors") == (100 + 60) * 128
+    assert store.images("sift") == ["a", "b"]
+    assert np.all(store.descriptors("sift", "b") == 2)
@@ -0,0 +1,45 @@
+# test_gaussian.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test toleransi GaussianBank.blur_sigmas (common/gaussian.py)
+#        terhadap cv2.GaussianBlur langsung.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.gaussian import GaussianBank
+
+SIGMAS = [float(sigma) for sigma in np.geomspace(1.0, 8.0, 10)]
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (256, 320), dtype=np.uint8)
+    checker = (np.indices((240, 240)).sum(axis=0) // 16 % 2 * 255).astype(np.uint8)
+    color = cv2.GaussianBlur(rng.integers(0, 256, (200, 160, 3), dtype=np.uint8), (0, 0), 2)
+    return [noise, checker, color]
+
+
+def _differences(image, decimate):
+    results = GaussianBank(image, decimate=decimate).blur_sigmas(SIGMAS[::-1])[::-1]
+    for sigma, result in zip(SIGMAS, results):
+        assert result.shape == image.shape and result.dtype == image.dtype
+        diff = np.abs(result.astype(np.int32) - cv2.GaussianBlur(image, (0, 0), sigma))
+        border = int(3 * sigma) + 4
+        yield diff, diff[border:-border, border:-border]
+
+
+@pytest.mark.parametrize("image", _images())
+def test_blur_sigmas_tolerance(image):
+    for diff, _ in _differences(image, decimate=False):
+        assert diff.max() <= 2
+        assert diff.mean() < 0.6
+
+
+@pytest.mark.parametrize("image", _images())
+def test_blur_sigmas_decimated_inner_tolerance(image):
+    # Pita border boleh berbeda lebih jauh (refleksi pada grid setengah resolusi)
+    for _, inner in _differences(image, decimate=True):
+        assert inner.max() <= 3
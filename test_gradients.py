@@ -0,0 +1,43 @@
+# test_gradients.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test cache gradien (common/gradients.py): hasil identik dengan
+#        cv2.Sobel, kunci berdasarkan identitas array, dan entri dihapus saat
+#        gambarnya dibebaskan.
+
+import gc
+
+import cv2
+import numpy as np
+
+from common.gradients import GradientCache
+
+
+def _image(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (64, 80), dtype=np.uint8)
+
+
+def test_matches_sobel_and_hits_by_identity():
+    cache = GradientCache()
+    image = _image()
+    for ddepth in (cv2.CV_16S, cv2.CV_32F, cv2.CV_64F):
+        dx, dy = cache.get(image, 3, ddepth)
+        assert np.array_equal(dx, cv2.Sobel(image, ddepth, 1, 0, ksize=3))
+        assert np.array_equal(dy, cv2.Sobel(image, ddepth, 0, 1, ksize=3))
+    # Satu Sobel float32 dasar, dtype lain diturunkan dari situ
+    assert cache.misses == 1
+    assert cache.get(image, 3, cv2.CV_32F)[0] is cache.get(image, 3, cv2.CV_32F)[0]
+    # Salinan dengan isi sama adalah gambar lain
+    cache.get(image.copy(), 3, cv2.CV_32F)
+    assert cache.misses == 2
+
+
+def test_entries_dropped_with_image():
+    cache = GradientCache()
+    image = _image(1)
+    cache.get(image, 5, cv2.CV_32F)
+    assert len(cache._entries) == 1
+    del image
+    gc.collect()
+    assert len(cache._entries) == 0
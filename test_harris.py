@@ -0,0 +1,44 @@
+# test_harris.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kesetaraan HarrisEngine (common/harris.py) dengan
+#        cv2.cornerHarris untuk grid (blockSize, ksize, k).
+
+import cv2
+import numpy as np
+import pytest
+
+from common.harris import HarrisEngine
+
+PARAMS = [(block_size, ksize, k) for block_size in (2, 3, 5) for ksize in (3, 5, 7) for k in (0.04, 0.06)]
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.integers(0, 256, (97, 131), dtype=np.uint8), (5, 5), 1.5)
+    checker = (np.indices((120, 120)).sum(axis=0) // 15 % 2 * 255).astype(np.uint8)
+    return [noise, checker]
+
+
+@pytest.mark.parametrize("image", _images())
+def test_sweep_matches_opencv(image):
+    engine = HarrisEngine(image)
+    for params, response in zip(PARAMS, engine.sweep(PARAMS)):
+        reference = cv2.cornerHarris(np.float32(image), *params)
+        assert response.dtype == np.float32
+        # Setara hingga pembulatan float32 (urutan operasi berbeda)
+        scale = np.abs(reference).max()
+        assert np.abs(response - reference).max() <= 1e-5 * scale, params
+        # Piksel sudut pada threshold relatif yang biasa dipakai harus sama
+        assert np.array_equal(response > 0.01 * response.max(), reference > 0.01 * reference.max()), params
+
+
+def test_count_corners_matches_opencv():
+    image = _images()[1]
+    params = [(2, 3, 0.04), (3, 5, 0.06)]
+    expected = []
+    for block_size, ksize, k in params:
+        reference = cv2.cornerHarris(np.float32(image), block_size, ksize, k)
+        expected.append(int(np.count_nonzero(reference > 0.01 * reference.max())))
+    assert HarrisEngine(image).count_corners(params) == expected
@@ -0,0 +1,76 @@
+# test_matching.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kesetaraan match_descriptors exact (common/matching.py) dengan
+#        cv2.BFMatcher knnMatch + ratio test dan BFMatcher crossCheck.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.matching import DEFAULT_RATIO, filter_matches, knn2_exact, match_descriptors
+
+
+def _descriptors(train_size, query_size, seed=0):
+    # Descriptor mirip SIFT; 70% query adalah salinan train yang diberi noise
+    rng = np.random.default_rng(seed)
+
+    def random_descriptors(count):
+        values = np.abs(rng.normal(0, 1, (count, 128))) ** 2
+        values *= 512 / np.linalg.norm(values, axis=1, keepdims=True)
+        return np.clip(np.round(values), 0, 255).astype(np.uint8)
+
+    train = random_descriptors(train_size)
+    inliers = int(query_size * 0.7)
+    noisy = train[rng.integers(0, train_size, inliers)] + rng.normal(0, 6, (inliers, 128))
+    query = np.concatenate([np.clip(np.round(noisy), 0, 255).astype(np.uint8),
+                            random_descriptors(query_size - inliers)])
+    return query, train
+
+
+def _pairs(matches):
+    return set(zip(matches["query"].tolist(), matches["train"].tolist()))
+
+
+def _bf_ratio(query, train, ratio):
+    knn = cv2.BFMatcher(cv2.NORM_L2).knnMatch(np.float32(query), np.float32(train), k=2)
+    return {(m[0].queryIdx, m[0].trainIdx): m[0].distance for m in knn
+            if len(m) == 2 and m[0].distance < ratio * m[1].distance}
+
+
+def _bf_cross_check(query, train):
+    matcher = cv2.BFMatcher(cv2.NORM_L2, crossCheck=True)
+    return {(m.queryIdx, m.trainIdx): m.distance for m in matcher.match(np.float32(query), np.float32(train))}
+
+
+@pytest.mark.parametrize("ratio", [DEFAULT_RATIO, 0.6, 0.9])
+@pytest.mark.parametrize("sizes", [(500, 300), (64, 200)])
+def test_ratio_matches_bfmatcher(ratio, sizes):
+    query, train = _descriptors(*sizes)
+    matches = match_descriptors(query, train, ratio)
+    expected = _bf_ratio(query, train, ratio)
+    assert _pairs(matches) == set(expected)
+    distances = [expected[(q, t)] for q, t in zip(matches["query"].tolist(), matches["train"].tolist())]
+    assert np.allclose(matches["distance"], distances, rtol=1e-5)
+
+
+@pytest.mark.parametrize("sizes", [(500, 300), (64, 200)])
+def test_cross_check_matches_bfmatcher(sizes):
+    query, train = _descriptors(*sizes)
+    assert _pairs(match_descriptors(query, train, None, cross_check=True)) == set(_bf_cross_check(query, train))
+
+
+def test_small_blocks_give_same_result():
+    query, train = _descriptors(300, 250, seed=1)
+    indices, distances, reverse_indices = knn2_exact(query, train, block_rows=7, reverse=True)
+    blocked = filter_matches(indices, distances, DEFAULT_RATIO, reverse_indices)
+    assert np.array_equal(blocked, match_descriptors(query, train, DEFAULT_RATIO, cross_check=True))
+
+
+def test_degenerate_inputs():
+    query, train = _descriptors(1, 10)
+    # Satu descriptor train: tidak ada tetangga kedua, ratio test menolak semua
+    assert len(match_descriptors(query, train)) == len(_bf_ratio(query, train, DEFAULT_RATIO)) == 0
+    assert len(match_descriptors(query[:0], train)) == 0
+    assert len(match_descriptors(query, train[:0], None)) == 0
@@ -0,0 +1,70 @@
+# test_median.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test median filter common/median.py terhadap cv2.medianBlur (uint8)
+#        dan terhadap median NumPy per jendela (uint16 dengan kernel > 5).
+
+import cv2
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from common.median import check_median, median_blur
+
+
+def _reference(image, ksize):
+    # Median jendela ksize x ksize dengan border replicate
+    padded = np.pad(image, ksize // 2, mode="edge")
+    return np.median(sliding_window_view(padded, (ksize, ksize)), axis=(2, 3)).astype(image.dtype)
+
+
+@pytest.mark.parametrize("ksize", [3, 7, 15, 51])
+def test_uint8_matches_opencv(ksize):
+    image = np.random.default_rng(0).integers(0, 256, (120, 90, 3), dtype=np.uint8)
+    assert np.array_equal(median_blur(image, ksize), cv2.medianBlur(image, ksize))
+
+
+@pytest.mark.parametrize("ksize", [7, 15])
+@pytest.mark.parametrize("shape", [(37, 53), (5, 9), (20, 30, 3)])
+def test_uint16_full_range_matches_reference(ksize, shape):
+    # Lebih dari 256 nilai unik: jalur np.median per jendela
+    image = np.random.default_rng(ksize).integers(0, 65536, shape, endpoint=False).astype(np.uint16)
+    expected = _reference(image, ksize) if image.ndim == 2 else \
+        np.dstack([_reference(image[..., c], ksize) for c in range(image.shape[2])])
+    assert np.array_equal(median_blur(image, ksize), expected)
+
+
+def test_uint16_few_values_matches_reference():
+    # <= 256 nilai unik sembarang (bukan kelipatan 257): jalur rank + cv2.medianBlur
+    rng = np.random.default_rng(2)
+    values = np.sort(rng.choice(65536, 200, replace=False)).astype(np.uint16)
+    image = values[rng.integers(0, 200, (41, 57))]
+    assert np.array_equal(median_blur(image, 9), _reference(image, 9))
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.float32, np.float64])
+def test_rejects_other_dtypes_with_large_kernel(dtype):
+    image = np.zeros((16, 16), dtype=dtype)
+    with pytest.raises(ValueError):
+        median_blur(image, 7)
+    with pytest.raises(ValueError):
+        check_median(dtype, 7)
+
+
+def test_small_kernel_uses_opencv_dtypes():
+    image = np.random.default_rng(3).normal(0, 1000, (30, 40)).astype(np.float32)
+    assert np.array_equal(median_blur(image, 5), cv2.medianBlur(image, 5))
+
+
+def test_uint16_scaled_matches_uint8():
+    # Median komutatif dengan skala monoton: median(x * 257) = median(x) * 257
+    image = np.random.default_rng(1).integers(0, 256, (64, 80), dtype=np.uint8)
+    scaled = image.astype(np.uint16) * np.uint16(257)
+    expected = cv2.medianBlur(image, 25).astype(np.uint16) * np.uint16(257)
+    assert np.array_equal(median_blur(scaled, 25), expected)
+
+
+def test_rejects_even_ksize():
+    with pytest.raises(ValueError):
+        median_blur(np.zeros((8, 8), dtype=np.uint8), 4)
@@ -0,0 +1,61 @@
+# test_run_cache.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test cache run (common/run_cache.py): manifest hanya mencatat file
+#        yang benar-benar ditulis sebuah gambar, dan gambar yang gagal
+#        didekode tidak ikut di hasil.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.image_source import ImageRef
+from common.run_cache import MANIFEST_NAME, map_images_cached
+
+
+# Nama gambar yang benar-benar diproses (workers=1, satu proses)
+CALLS = []
+
+
+def _process(image, image_name, output_dir, writer=None):
+    CALLS.append(image_name)
+    filename = f"{image_name}_output.png"
+    writer.write(os.path.join(output_dir, filename), image)
+    return pd.DataFrame([{'Image Source': image_name, 'Output Filename': filename}])
+
+
+def _images():
+    return [("coins", np.full((8, 8), 10, dtype=np.uint8)),
+            ("coins_big", np.full((16, 16), 20, dtype=np.uint8))]
+
+
+def test_manifest_records_exact_outputs(tmp_path):
+    output_dir = str(tmp_path)
+    map_images_cached(_process, _images(), output_dir)
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        entries = json.load(f)["entries"]
+    assert list(entries["coins"]["files"]) == ["coins_output.png"]
+    assert list(entries["coins_big"]["files"]) == ["coins_big_output.png"]
+
+    # Mengubah output coins_big tidak membatalkan cache coins
+    with open(os.path.join(output_dir, "coins_big_output.png"), "ab") as f:
+        f.write(b"\0")
+    CALLS.clear()
+
+    results = map_images_cached(_process, _images(), output_dir)
+    assert CALLS == ["coins_big"]
+    assert [df['Image Source'][0] for df in results] == ["coins", "coins_big"]
+
+
+def test_failed_decode_is_not_counted(tmp_path):
+    broken_path = tmp_path / "rusak.png"
+    broken_path.write_bytes(b"bukan gambar")
+    images = _images() + [("rusak", ImageRef(str(broken_path)))]
+
+    results = map_images_cached(_process, images, str(tmp_path / "output"))
+    assert len(results) == 2
+    assert all(df is not None for df in results)
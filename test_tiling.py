@@ -0,0 +1,114 @@
+# test_tiling.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test kesetaraan operasi tiled (common/tiling.py) dengan versi frame
+#        penuh, memakai ukuran tile yang tidak membagi ukuran gambar.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.tiling import (open_output, tiled_canny, tiled_downsample2, tiled_gaussian, tiled_median,
+                           tiled_sobel_filtering, tiled_sobel_minmax, tiled_warp, to_uint8, uint8_tiles)
+
+TILE_SIZES = [17, 37, 64]
+
+
+@pytest.fixture(scope="module")
+def image():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (101, 143), dtype=np.uint8)
+    shapes = cv2.circle(np.zeros((101, 143), dtype=np.uint8), (70, 50), 35, 200, -1)
+    return cv2.addWeighted(cv2.GaussianBlur(noise, (5, 5), 1.5), 0.5, shapes, 0.5, 0)
+
+
+def _sobel(image, ksize=3):
+    return (cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=ksize),
+            cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=ksize))
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+@pytest.mark.parametrize("ksize", [3, 7])
+def test_gaussian_and_median(image, tile_size, ksize):
+    out = np.empty_like(image)
+    assert np.array_equal(tiled_gaussian(image, ksize, out, tile_size), cv2.GaussianBlur(image, (ksize, ksize), 0))
+    assert np.array_equal(tiled_median(image, ksize, out, tile_size), cv2.medianBlur(image, ksize))
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+def test_sobel_filtering(image, tile_size):
+    outputs = [np.empty_like(image) for _ in range(3)]
+    sobel_x, sobel_y = _sobel(image)
+    magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
+    expected = [np.uint8(255 * np.absolute(v) / np.max(np.absolute(v))) for v in (sobel_x, sobel_y, magnitude)]
+    for result, reference in zip(tiled_sobel_filtering(image, *outputs, tile_size=tile_size), expected):
+        assert np.array_equal(result, reference)
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+def test_sobel_minmax(image, tile_size):
+    sobel_x, sobel_y = _sobel(image)
+    expected = cv2.normalize(np.sqrt(sobel_x**2 + sobel_y**2), None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    assert np.array_equal(tiled_sobel_minmax(image, 3, np.empty_like(image), tile_size), expected)
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+@pytest.mark.parametrize("thresholds", [(30, 90), (100, 40)])
+def test_canny(image, tile_size, thresholds):
+    result = tiled_canny(image, *thresholds, np.empty_like(image), tile_size)
+    assert np.array_equal(result, cv2.Canny(image, *thresholds))
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+def test_downsample2_even(image, tile_size):
+    even = np.ascontiguousarray(image[:100, :142])
+    out = np.empty((50, 71), dtype=np.uint8)
+    expected = cv2.resize(even, (71, 50), interpolation=cv2.INTER_AREA)
+    assert np.array_equal(tiled_downsample2(even, out, tile_size), expected)
+
+
+@pytest.mark.parametrize("tile_size", TILE_SIZES)
+def test_warp_within_one_level(image, tile_size):
+    rows, cols = image.shape
+    homography = np.array([[0.9, 0.1, 8], [-0.05, 1.05, 4], [1e-4, 2e-4, 1]])
+    affine = cv2.getRotationMatrix2D((cols / 2, rows / 2), 17, 0.9)
+    for matrix, warp in ((homography, cv2.warpPerspective), (affine, cv2.warpAffine)):
+        diff = np.abs(tiled_warp(image, matrix, np.empty_like(image), tile_size).astype(np.int16)
+                      - warp(image, matrix, (cols, rows)))
+        assert diff.max() <= 1
+        assert np.count_nonzero(diff) <= 0.01 * diff.size
+
+
+def test_memmap_output(image, tmp_path):
+    out = open_output(str(tmp_path / "blur.npy"), image.shape)
+    tiled_gaussian(image, 5, out, 37)
+    out.flush()
+    assert np.array_equal(np.load(tmp_path / "blur.npy"), cv2.GaussianBlur(image, (5, 5), 0))
+
+
+def test_uint16_converted_per_tile(image, tmp_path):
+    raster = open_output(str(tmp_path / "raster16.npy"), image.shape, np.uint16)
+    raster[:] = image.astype(np.uint16) * 257 + 100
+    expected = to_uint8(np.array(raster))
+    # Diskalakan 255 / 65535, bukan dipotong modulo 256
+    assert np.abs(expected.astype(np.int16) - image).max() <= 1
+    tiles = uint8_tiles(raster)
+    assert tiles.dtype == np.uint8 and tiles.shape == image.shape
+    assert np.array_equal(tiled_canny(tiles, 30, 90, np.empty_like(image), 37), cv2.Canny(expected, 30, 90))
+
+
+def test_uint8_tiles_rejects_other_dtypes(image):
+    with pytest.raises(ValueError):
+        uint8_tiles(image.astype(np.float32))
+
+
+@pytest.mark.parametrize("ksize", [3, 7])
+def test_uint16_filters_keep_dtype(image, tmp_path, ksize):
+    raster = image.astype(np.uint16) * 257
+    gaussian = tiled_gaussian(raster, ksize, open_output(str(tmp_path / "g.npy"), raster.shape, raster.dtype), 37)
+    assert gaussian.dtype == np.uint16
+    assert np.array_equal(gaussian, cv2.GaussianBlur(raster, (ksize, ksize), 0))
+    median = tiled_median(raster, ksize, np.empty_like(raster), 37)
+    # Median komutatif dengan skala monoton x * 257
+    assert np.array_equal(median, cv2.medianBlur(image, ksize).astype(np.uint16) * 257)
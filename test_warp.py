@@ -0,0 +1,65 @@
+# test_warp.py
+
+# Nama: Rayendra Althaf Taraka Noor
+# NIM: 13522107
+# Fitur: Test selisih peta remap (common/warp.py) terhadap
+#        cv2.warpPerspective/cv2.warpAffine untuk kedua format peta.
+
+import cv2
+import numpy as np
+import pytest
+
+from common.warp import DEFAULT_MAP_TYPE, WarpMaps, warp, warp_batch
+
+ROWS, COLS = 240, 320
+
+
+def _image():
+    coarse = np.random.default_rng(0).integers(0, 256, (ROWS // 8, COLS // 8), dtype=np.uint8)
+    return cv2.resize(coarse, (COLS, ROWS), interpolation=cv2.INTER_CUBIC)
+
+
+def _matrices():
+    src = np.float32([[0, 0], [COLS - 1, 0], [0, ROWS - 1], [COLS - 1, ROWS - 1]])
+    dst = np.float32([[COLS * 0.15, ROWS * 0.15], [COLS * 0.85, ROWS * 0.1],
+                      [COLS * 0.05, ROWS * 0.9], [COLS * 0.95, ROWS * 0.85]])
+    return [cv2.getPerspectiveTransform(src, dst), cv2.getRotationMatrix2D((COLS // 2, ROWS // 2), 30, 1.0)]
+
+
+def _reference(image, matrix):
+    if matrix.shape == (2, 3):
+        return cv2.warpAffine(image, matrix, (COLS, ROWS))
+    return cv2.warpPerspective(image, matrix, (COLS, ROWS))
+
+
+def _difference(map_type, matrix):
+    image = _image()
+    diff = np.abs(WarpMaps(matrix, image.shape, map_type).apply(image).astype(np.int16)
+                  - _reference(image, matrix))
+    return int(diff.max()), np.count_nonzero(diff) / diff.size
+
+
+def test_default_is_float():
+    assert DEFAULT_MAP_TYPE == "float"
+
+
+@pytest.mark.parametrize("matrix", _matrices())
+def test_float_maps_match_opencv(matrix):
+    max_diff, changed = _difference("float", matrix)
+    assert max_diff <= 1
+    assert changed < 0.001
+
+
+@pytest.mark.parametrize("matrix", _matrices())
+def test_fixed_maps_documented_tolerance(matrix):
+    # Posisi sub-piksel dibulatkan ke 1/32 piksel (lihat MAP_TYPES)
+    max_diff, changed = _difference("fixed", matrix)
+    assert max_diff <= 4
+    assert changed < 0.15
+
+
+def test_batch_matches_single():
+    frames = [_image(), np.ascontiguousarray(_image()[::-1]), np.ascontiguousarray(_image()[:, ::-1])]
+    matrix = _matrices()[0]
+    batch = warp_batch(frames, matrix)
+    assert all(np.array_equal(b, warp(f, matrix)) for f, b in zip(frames, batch))